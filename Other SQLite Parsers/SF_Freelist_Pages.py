@@ -33,6 +33,10 @@ def setup_logger(filename):
     logging.basicConfig(filename=filename, level=logging.INFO, format='%(asctime)s - %(levelname)s: %(message)s', datefmt='%Y-%m-%d %H:%M:%S %Z (UTC %z)')
     return logging.getLogger()
 
+#This function checks if every byte of the data is zero by comparing it with a zero filled bytes object of the same length
+def is_zero_page(data):
+    return bytes(data) == bytes(len(data))
+
 #This function iterates through freelist trunk pages, extracts the page numbers from the freelist array.
 #It also checks the unallocated space at the bottom of the trunk page.
 def extract_freelist_pages(file, first_freelist_trunk, page_size):
@@ -107,7 +111,7 @@ def read_page(file, freelist_pages, page_size):
             page_type = "B-tree Index Interior Page"
         elif page_flag == 0:
             # If the page flag is 0 then the page could either be an overflow page or the page has been secure deleted
-            if all(byte == 0 for byte in page_data):
+            if is_zero_page(page_data):
                 page_type = "Unknown"
             else:
                 page_type = "Payload Overflow Page" 
@@ -185,7 +189,7 @@ def extract_freelist_pageinfo(file, freelist_pages, page_size):
             freeblocks = 'N/A'
             freeblock_counter = "N/A"
             has_unallocated = f'N/A'
-            if all(byte == 0 for byte in unallocatedspace):
+            if is_zero_page(unallocatedspace):
                 page_unallocatedspace = "Secure_Deleted"
             else: page_unallocatedspace = "First four bytes store the pointer to next overflow page, all bytes after would have been used to store the overflow for a record"
         else:
@@ -37,6 +37,10 @@ def setup_logger(filename):
     )
     return logging.getLogger()
 
+#This function checks if every byte of the data is zero by comparing it with a zero filled bytes object of the same length
+def is_zero_page(data):
+    return bytes(data) == bytes(len(data))
+
 def print_table_console(rows):
     """ This function formats the table in the console"""
 
@@ -81,7 +85,7 @@ def read_page(file, page_size, auto_vacuum, first_freelist_trunk, freelist_trunk
         #Checks to see if the page number is in the list of freelist_pages
         elif page_number in freelist_pages:
             #Checks to see if the page has data. This would be in the scenario where secure_delete is enabled causing the whole page to be zero'd before the page is moved to the freelist
-            if all(byte == 0 for byte in pagedata):
+            if is_zero_page(pagedata):
                 page_type = "Freelist Leaf Page: Secure_Deleted"
             else:
             #If the page is in the list of freelist pages then determine the previous use of the page by reading the flag
@@ -115,7 +119,7 @@ def read_page(file, page_size, auto_vacuum, first_freelist_trunk, freelist_trunk
         #Checks to see if the page flag is 0 
         elif page_flag == 0:
             #Checks to see if all bytes are zero, if it is then sets the page type as Unknown: Empty Page. This is to account for empty pages that have been observed at the end of the database file. 
-            if all(byte == 0 for byte in pagedata):
+            if is_zero_page(pagedata):
                 page_type = "Unknown: Empty Page"
             #If there is data then set page type as payload overflow page
             else:        
@@ -0,0 +1,74 @@
+from Modules.varints import single_varint, multi_varint
+from Modules.pageheader import parse_page_header, INDEXINTERIOR_PAGE_TYPE, INDEXLEAF_PAGE_TYPE
+from Modules.btreeleafpage_processing import read_payload, decode_payload
+
+def parse_index_cell(page_data, cell_offset, page_size, page_source, interior=False):
+    """
+    Parses a single index b-tree cell (index leaf or index interior) starting at cell_offset of page_data.
+    Index cells have no rowid: interior cells start with the 4-byte left child page, then the payload length and payload.
+    Overflow is read through page_source with the index page thresholds, and the record header is decoded
+    from the reassembled payload so wide keys are handled.
+    Returns the list of decoded key columns; only the columns available in an incomplete payload are decoded.
+    """
+    offset = cell_offset + 4 if interior else cell_offset
+    payload_length, length = single_varint(page_data, offset)
+    payload_start = offset + length
+
+    cell_data = read_payload(page_data, payload_start, payload_length, page_size, page_source, index_page=True)
+
+    header_length, header_varint_len = single_varint(cell_data, 0)
+    column_types, _ = multi_varint(cell_data, header_varint_len, header_length)
+
+    return decode_payload(column_types, cell_data, header_length, payload_length, f"Index cell at page offset {cell_offset}")
+
+def parse_index_page(page_source, page_data, current_page, page_size, page_header=None):
+    """
+    Extracts the keys of every cell on an index leaf or index interior page (Main Database or WAL).
+    Overflow pages are read through page_source (the main database page source or a WAL page view).
+    Returns a list of [cell_offset, *columns].
+    """
+    rows = []
+
+    if len(page_data) < 8:
+        return rows
+
+    if page_header is None:
+        page_header = parse_page_header(page_data)
+
+    if page_header.page_type != INDEXLEAF_PAGE_TYPE and page_header.page_type != INDEXINTERIOR_PAGE_TYPE:
+        return rows
+
+    interior = page_header.page_type == INDEXINTERIOR_PAGE_TYPE
+    for pointer in page_header.cell_pointers:
+        if pointer < 0 or pointer >= len(page_data):  # Ensure valid pointer
+            continue
+        try:
+            columns = parse_index_cell(page_data, pointer, page_size, page_source, interior)
+            rows.append([pointer, *columns])
+        except Exception as e:
+            print(f" [-] Page {current_page}: Error parsing index record at page offset {pointer}: {str(e).encode('ascii', errors='ignore').decode('ascii')}")
+            continue
+
+    return rows
+
+def index_record_row(layout, columns):
+    """
+    Maps the columns of an index b-tree record to (row_id, values) for the output table.
+    layout is (row_id_position, column_order) from SchemaCatalog.index_record_layouts(), or None when the
+    index columns are not known, in which case the record columns are returned as they are.
+    Record columns beyond the layout are kept at the end so schema mismatches are still visible.
+    """
+    if layout is None:
+        return None, columns
+
+    row_id_position, column_order = layout
+    row_id = None
+    record_length = len(column_order)
+    if row_id_position is not None:
+        record_length += 1
+        if row_id_position < len(columns):
+            row_id = columns[row_id_position]
+
+    values = [columns[i] if i < len(columns) else None for i in column_order]
+    values.extend(columns[record_length:])
+    return row_id, values
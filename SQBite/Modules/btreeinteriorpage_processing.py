@@ -1,42 +1,29 @@
 import struct
-from Modules.varints import single_varint, multi_varint
+from Modules.pageheader import parse_page_header, TABLEINTERIOR_PAGE_TYPE, INDEXINTERIOR_PAGE_TYPE
 
-def parse_interior_page(page_data, page_size, is_page_1=False):
+_CHILD_POINTER_STRUCT = struct.Struct(">I")
+
+def parse_interior_page(page_data, page_size, is_page_1=False, page_header=None):
     """
-    Parses an interior B-tree page and extracts child page numbers.
+    Parses an interior B-tree page (table or index) and extracts child page numbers.
+    Both interior page types start every cell with the 4-byte left child page number.
     """
-    if page_data[0] != 5:  # Ensure it is an interior B-tree page
+    if page_data[0] != TABLEINTERIOR_PAGE_TYPE and page_data[0] != INDEXINTERIOR_PAGE_TYPE:  # Ensure it is an interior B-tree page
         raise ValueError("Page is not an interior B-tree page.")
 
     # Adjust pointer base for Page 1
-    pointer_base = 100 if is_page_1 else 0
-
-    # Number of cells on the page
-    num_cells = struct.unpack(">H", page_data[3:5])[0]
-
-    # Calculate cell pointers
-    if is_page_1:
-        cell_pointers = [
-            struct.unpack(">H", page_data[12 + i * 2:14 + i * 2])[0] - pointer_base
-            for i in range(num_cells)
-        ]
-    else:
-        cell_pointers = [
-            struct.unpack(">H", page_data[12 + i * 2:14 + i * 2])[0]
-            for i in range(num_cells)
-        ]
+    if page_header is None:
+        page_header = parse_page_header(page_data, 100 if is_page_1 else 0)
 
     child_pages = []
-    for pointer in cell_pointers:
+    for pointer in page_header.cell_pointers:
         if pointer < 0 or pointer >= len(page_data):  # Ensure valid pointer
             print(f" [-] Invalid cell pointer {pointer}. Skipping.")
             continue
-        cell_data = page_data[pointer:]
-        child_page_number = struct.unpack(">I", cell_data[:4])[0]
+        child_page_number = _CHILD_POINTER_STRUCT.unpack_from(page_data, pointer)[0]
         child_pages.append(child_page_number)
 
     # Rightmost pointer for interior pages
-    rightmost_page = struct.unpack(">I", page_data[8:12])[0]
-    child_pages.append(rightmost_page)
+    child_pages.append(page_header.rightmost_pointer)
 	
     return child_pages
@@ -10,4 +10,10 @@ def calculate_pointer_pages(auto_vacuum, page_size, total_pages):
                 break
             pointer_pages.append(pointer_number)
             pointer_counter += 1
-    return pointer_pages
\ No newline at end of file
+    return pointer_pages
+
+def is_pointer_map_page(page_number, page_size):
+    """
+    Returns True if page_number is a pointer map page of an auto_vacuum database (page 2 and every page_size // 5 + 1 pages after it).
+    """
+    return page_number >= 2 and (page_number - 2) % (page_size // 5 + 1) == 0
@@ -1,11 +1,4 @@
-import struct
 import re
-from Modules.btreeinteriorpage_processing import parse_interior_page
-from Modules.btreeleafpage_processing import mainparse_leaf_page
-
-# Constants for page types
-TABLEINTERIOR_PAGE_TYPE = 5
-TABLELEAF_PAGE_TYPE = 13
 
 def extract_columns_and_types_from_sql(sql_statement):
     """
@@ -41,46 +34,93 @@ def extract_columns_and_types_from_sql(sql_statement):
     
     return columns
 
-def extract_table_definitions_from_schema(db_file, page_size):
+def _strip_identifier(name):
+    return name.strip().strip("`\"[]'")
+
+def extract_primary_key_columns(sql_statement):
     """
-    Extracts table definitions from sqlite_master, ensuring no duplicate columns.
+    Extracts the PRIMARY KEY column names, in key order, from a CREATE TABLE statement.
+    Handles both a PRIMARY KEY column constraint and a PRIMARY KEY (...) table constraint.
     """
-    db_file.seek(100)  # Start of Page 1
-    page_data = db_file.read(page_size)
+    match = re.search(r"CREATE\s+TABLE\s+\S+\s*\((.+)\)", sql_statement, re.S | re.I)
+    if not match:
+        return []
 
-    rows = []
-    page_type = page_data[0]
-    
-    if page_type == TABLEINTERIOR_PAGE_TYPE:  # Interior B-tree page
-        child_pages = parse_interior_page(page_data, page_size, is_page_1=True)
-        for child_page in child_pages:
-            child_offset = (child_page - 1) * page_size
-            db_file.seek(child_offset)
-            child_data = db_file.read(page_size)
-            if child_data[0] == TABLELEAF_PAGE_TYPE:  # Leaf page check
-                rows.extend(mainparse_leaf_page(db_file, child_data, child_page, page_size))
-    elif page_type == TABLELEAF_PAGE_TYPE:
-        rows = mainparse_leaf_page(db_file, page_data, 1, page_size, is_page_1=True)
-    else:
-        print(f"[-] Page 1 is not a recognized B-tree page type: {page_type}")
-
-    tables = []
-    for row in rows:
-        try:
-            if len(row) >= 6 and (row[2] == b"table" or (isinstance(row[2], bytes) and row[2].decode('utf-8') == "table")):
-                table_name = row[3].decode("utf-8", errors="ignore").strip()
-                sql_statement = row[6].decode("utf-8", errors="ignore").strip()
-
-                # Skip invalid SQL statements
-                if not sql_statement.lower().startswith("create table"):
-                    print(f" [!] Skipping table {table_name}, invalid SQL: {repr(sql_statement)}")
-                    continue
-
-                columns = list(dict.fromkeys(extract_columns_and_types_from_sql(sql_statement)))
-
-                tables.append({"name": table_name, "columns": columns})
-
-        except Exception as e:
-            print(f"[-] Error parsing row: {e}")
-
-    return tables
+    parts = re.findall(r'(?:[^,(]|\([^)]*\))+', match.group(1))
+    for col_def in parts:
+        col_def = col_def.strip()
+        key_match = re.match(r"(?:CONSTRAINT\s+\S+\s+)?PRIMARY\s+KEY\s*\((.+)\)", col_def, re.S | re.I)
+        if key_match:
+            return [_strip_identifier(column.split()[0]) for column in key_match.group(1).split(",") if column.strip()]
+
+    for col_def in parts:
+        col_def = col_def.strip()
+        if col_def.upper().startswith(("CONSTRAINT", "PRIMARY", "UNIQUE", "FOREIGN", "CHECK")):
+            continue
+        if re.search(r"\bPRIMARY\s+KEY\b", col_def, re.I):
+            return [_strip_identifier(col_def.split()[0])]
+
+    return []
+
+def extract_autoindex_columns(sql_statement):
+    """
+    Returns the column lists of the indexes SQLite creates automatically (sqlite_autoindex_<table>_<N>) for the
+    PRIMARY KEY and UNIQUE constraints of a CREATE TABLE statement, in N order: column constraints in column order,
+    then table constraints. Constraints on the same columns share one index and an INTEGER PRIMARY KEY (the rowid)
+    has none.
+    """
+    match = re.search(r"CREATE\s+TABLE\s+\S+\s*\((.+)\)", sql_statement, re.S | re.I)
+    if not match:
+        return []
+
+    column_types = dict(extract_columns_and_types_from_sql(sql_statement))
+    column_constraints = []
+    table_constraints = []
+    for col_def in re.findall(r'(?:[^,(]|\([^)]*\))+', match.group(1)):
+        col_def = col_def.strip()
+        table_match = re.match(r"(?:CONSTRAINT\s+\S+\s+)?(PRIMARY\s+KEY|UNIQUE)\s*\((.+)\)", col_def, re.S | re.I)
+        if table_match:
+            columns = [_strip_identifier(column.split()[0]) for column in table_match.group(2).split(",") if column.strip()]
+            is_rowid = (table_match.group(1).upper().startswith("PRIMARY") and len(columns) == 1
+                        and column_types.get(columns[0], "").upper() == "INTEGER")
+            if not is_rowid:
+                table_constraints.append(columns)
+            continue
+        if not col_def or col_def.upper().startswith(("CONSTRAINT", "PRIMARY", "UNIQUE", "FOREIGN", "CHECK")):
+            continue
+
+        col_parts = col_def.split(None, 1)
+        column_name = _strip_identifier(col_parts[0])
+        # String literals (e.g. DEFAULT values) are blanked so they are not mistaken for constraints
+        constraint_text = re.sub(r"'(?:[^']|'')*'", "''", col_parts[1]) if len(col_parts) > 1 else ""
+        for constraint in re.finditer(r"\b(?:UNIQUE|PRIMARY\s+KEY(\s+DESC)?)\b", constraint_text, re.I):
+            # INTEGER PRIMARY KEY is the rowid, except for the INTEGER PRIMARY KEY DESC quirk
+            is_rowid = (constraint.group(0).upper().startswith("PRIMARY") and not constraint.group(1)
+                        and column_types.get(column_name, "").upper() == "INTEGER")
+            if not is_rowid:
+                column_constraints.append([column_name])
+
+    autoindex_columns = []
+    for columns in column_constraints + table_constraints:
+        if columns not in autoindex_columns:
+            autoindex_columns.append(columns)
+    return autoindex_columns
+
+def extract_index_columns(sql_statement):
+    """
+    Extracts the indexed column names from a CREATE INDEX statement.
+    Indexed expressions are named Expression_N. Returns None if the statement cannot be parsed.
+    """
+    match = re.search(r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+.+?\bON\s+\S+?\s*\((.+)\)", sql_statement, re.S | re.I)
+    if not match:
+        return None
+
+    column_block = re.split(r"\)\s*WHERE\b", match.group(1), flags=re.I)[0]
+    columns = []
+    for i, column in enumerate(re.findall(r'(?:[^,(]|\([^)]*\))+', column_block)):
+        tokens = re.split(r"\s+(?:COLLATE|ASC|DESC)\b", column.strip(), flags=re.I)[0].split()
+        if len(tokens) == 1 and "(" not in tokens[0]:
+            columns.append(_strip_identifier(tokens[0]))
+        else:
+            columns.append(f"Expression_{i+1}")
+    return columns
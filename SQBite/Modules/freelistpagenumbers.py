@@ -1,6 +1,6 @@
 import struct
 
-def extract_freelist_pagenumbers(db_file, page_size, first_freelist_trunk): 
+def extract_freelist_pagenumbers(page_source, first_freelist_trunk):
     freelist_pages = []
     freelist_trunk_pages = []
 
@@ -8,24 +8,25 @@ def extract_freelist_pagenumbers(db_file, page_size, first_freelist_trunk):
         freelist_trunk_pages.append(first_freelist_trunk)
 
     freelist_trunk = first_freelist_trunk
+    max_entries = (page_source.page_size - 8) // 4
 
     while freelist_trunk != 0:
-        db_file.seek((freelist_trunk - 1) * page_size)
+        if not page_source.is_valid_page(freelist_trunk):
+            print(f"[-] Freelist trunk page {freelist_trunk} is outside the database file")
+            break
 
-        next_trunk_page = db_file.read(4)
-        next_trunk_page_number = struct.unpack(">I", next_trunk_page)[0]
+        trunk_data = page_source.page(freelist_trunk)
+
+        next_trunk_page_number, num_entries = struct.unpack_from(">II", trunk_data, 0)
 
         if next_trunk_page_number != 0:
             freelist_trunk_pages.append(next_trunk_page_number)
 
-        num_entries = struct.unpack(">I", db_file.read(4))[0]
-
-        for _ in range(num_entries):
-            entry_page_number = struct.unpack(">I", db_file.read(4))[0]
+        num_entries = min(num_entries, max_entries)
+        for entry_page_number in struct.unpack_from(f">{num_entries}I", trunk_data, 8):
             if entry_page_number != 0:
                 freelist_pages.append(entry_page_number)
 
         freelist_trunk = next_trunk_page_number
 
     return freelist_pages, freelist_trunk_pages
-
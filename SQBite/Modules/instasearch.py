@@ -7,7 +7,7 @@ def insta_search(output_file, result_file, search_term):
     cursor = conn.cursor()
 
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-    table_names = [row[0] for row in cursor.fetchall()]
+    table_names = [row[0] for row in cursor.fetchall() if row[0] != "WAL_Frames"]
 
     print(f"\n[+] Searching for keyword: '{search_term}' in {len(table_names)} tables...\n")
     write_txt(f"Search Results for keyword: {search_term}\n", result_file)
@@ -1,57 +1,180 @@
+import os
 import sqlite3
-from Modules.extracttabledefinitions import extract_table_definitions_from_schema
-from Modules.parsesqliteheader import parse_sqlite_header
 
 def clean_row(row):
     """
-    Decodes byte strings with handling for BOM and invalid characters,
-    but preserves raw bytes for potential BLOB columns.
-    """
-    cleaned_row = []
-    for value in row:
-        if isinstance(value, bytes):
-            try:
-                decoded = value.decode("utf-8-sig").replace("\ufeff", "").replace("ï»¿", "")
-                cleaned_row.append(decoded)
-            except UnicodeDecodeError:
-                cleaned_row.append(value)
-        else:
-            cleaned_row.append(value)
-    return cleaned_row
+    Returns the row as a list for the bulk loader. TEXT values are already decoded by the record decoder,
+    so bytes values are BLOBs (or TEXT that is not valid UTF-8) and are written unchanged.
+    """
+    return list(row)
+
+# Number of rows buffered per table before they are bulk inserted with executemany
+BULK_INSERT_BATCH_SIZE = 10000
+
+# user_version of an output database whose bulk load was committed in full
+LOAD_COMPLETE_MARKER = 1
+
+SQLITE_INTERNAL_TABLES = {
+    "sqlite_master", "sqlite_sequence", "sqlite_temp_master", "sqlite_stat1", 
+    "sqlite_stat2", "sqlite_stat3", "sqlite_stat4"
+}
+
+BASE_HEADERS = ["Record_ID", "Source_File", "Frame_Number", "Page_Number", "Record_Status", "Table_Name", "File_Offset", "Row_ID"]
+
+RECOVERED_COLUMN_NAMES = [
+    "Record_ID", "Source_File", "Frame_Number", "Page_Number",
+    "Page_Type", "Table_Name", "Record_Status", "File_Offset", "Recovered Data"
+]
+
+RECOVERED_COLUMN_DEFS = [
+    '"Record_ID" INTEGER PRIMARY KEY',
+    '"Source_File" TEXT',
+    '"Frame_Number" INTEGER',
+    '"Page_Number" INTEGER',
+    '"Page_Type" TEXT',
+    '"Table_Name" TEXT',
+    '"Record_Status" TEXT',
+    '"File_Offset" INTEGER',
+    '"Recovered Data" TEXT'
+]
+
+def output_table_name(table_name):
+    """
+    Returns the output table of a table or index. Names starting with sqlite_ are reserved by SQLite, so the keys of
+    automatic indexes (sqlite_autoindex_*) go to a table named without the prefix.
+    """
+    return table_name[len("sqlite_"):] if table_name.lower().startswith("sqlite_") else table_name
 
-def write_to_sqlite(output_file, db_file_path, combined_records, combined_recoveredrecords):
+def build_insert_statement(table_name, insert_columns):
     """
-    Writes extracted records to a SQLite database, preserving column types.
+    Builds the INSERT statement used for every row of a table.
     """
-    if not combined_records:
-        print("\n[!] No Records were Extracted")
-        return
+    placeholders = ", ".join(["?"] * len(insert_columns))
+    quoted_columns = ", ".join([f'"{col}"' for col in insert_columns])
+    return f'INSERT INTO "{table_name}" ({quoted_columns}) VALUES ({placeholders})'
 
-    print("\n[+] Adding Extracted Records to SQLite Database")
+class BulkLoader:
+    """
+    Buffers rows per output table and bulk inserts them with one cached INSERT statement per table.
+    """
 
-    with open(db_file_path, "rb") as db_file:
-        header = parse_sqlite_header(db_file)
-        page_size = header["page_size"]
-        tables = extract_table_definitions_from_schema(db_file, page_size)
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.statements = {}
+        self.pending = {}
+
+    def register(self, table_name, insert_columns):
+        """
+        Caches the INSERT statement and column count for a table. Pending rows are flushed first so
+        they are inserted with the definition they were planned for.
+        """
+        if table_name in self.pending:
+            self.flush(table_name)
+        self.statements[table_name] = (build_insert_statement(table_name, insert_columns), len(insert_columns))
+
+    def add(self, table_name, row):
+        rows = self.pending.setdefault(table_name, [])
+        rows.append(row)
+        if len(rows) >= BULK_INSERT_BATCH_SIZE:
+            self.flush(table_name)
+
+    def flush(self, table_name):
+        rows = self.pending.pop(table_name, None)
+        if not rows:
+            return
+        insert_query, expected_column_count = self.statements[table_name]
+        padded_rows = [
+            row[:expected_column_count] + [''] * (expected_column_count - len(row))
+            for row in rows
+        ]
+        # The batch runs in a savepoint so the rows executemany inserted before a failing row can be undone
+        self.cursor.execute("SAVEPOINT bulk_batch")
+        try:
+            self.cursor.executemany(insert_query, padded_rows)
+        except (sqlite3.Error, OverflowError):
+            # Fall back to row by row inserts so a single bad row does not drop the whole batch
+            self.cursor.execute("ROLLBACK TO bulk_batch")
+            for padded_row in padded_rows:
+                try:
+                    self.cursor.execute(insert_query, padded_row)
+                except (sqlite3.Error, OverflowError) as e:
+                    print(f"[-] Error inserting into {table_name}: {e}")
+        self.cursor.execute("RELEASE bulk_batch")
+
+    def flush_all(self):
+        for table_name in list(self.pending):
+            self.flush(table_name)
+
+def write_to_sqlite(output_file, schema_catalog, record_batches):
+    """
+    Writes extracted records to a SQLite database, preserving column types.
+    record_batches is an iterable of (records, recovered_records) batches that is consumed as the parsers produce it.
+    Every table schema is planned up front and rows are bulk loaded inside a single transaction.
+    If the parsers or the load fail the transaction is rolled back and the error is raised again.
+    Returns the number of records written.
+    """
+    print("\n[+] Adding Extracted Records to SQLite Database")
 
+    tables = schema_catalog.table_definitions()
     table_columns = {table["name"]: table["columns"] for table in tables}
 
-    conn = sqlite3.connect(output_file)
+    conn = sqlite3.connect(output_file, isolation_level=None)
     cursor = conn.cursor()
 
-    sqlite_internal_tables = {
-        "sqlite_master", "sqlite_sequence", "sqlite_temp_master", "sqlite_stat1", 
-        "sqlite_stat2", "sqlite_stat3", "sqlite_stat4"
-    }
+    # Bulk load pragmas, restored once the load is over. The journal is kept in memory (not OFF) so a failed
+    # load can still be rolled back; pages appended to the file are not journaled, so this costs little.
+    journal_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+    synchronous = cursor.execute("PRAGMA synchronous").fetchone()[0]
+    cursor.execute("PRAGMA journal_mode = MEMORY")
+    cursor.execute("PRAGMA synchronous = OFF")
+
+    try:
+        cursor.execute("BEGIN")
+        record_count = _load_records(cursor, table_columns, record_batches)
+        cursor.execute("COMMIT")
+        # Marked in a transaction of its own so the marker is only written once the load itself is on disk
+        cursor.execute(f"PRAGMA user_version = {LOAD_COMPLETE_MARKER}")
+    except Exception as e:
+        print(f"[-] Error adding Extracted Records to SQLite Database, rolling back: {e}")
+        raise
+    finally:
+        try:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            cursor.execute(f"PRAGMA journal_mode = {journal_mode}")
+            cursor.execute(f"PRAGMA synchronous = {synchronous}")
+        finally:
+            conn.close()
+
+    print("[+] Extracted Records succesfully added to SQLite Database")
+    return record_count
 
-    base_headers = ["Record_ID", "Source_File", "Frame_Number", "Page_Number", "Record_Status", "Table_Name", "File_Offset", "Row_ID"]
-    recovered_headers = ["Source_File", "Frame_Number", "Page_Number", "Page_Type", "Table_Name", "Record_Status", "File_Offset", "Recovered Data"]
+def load_completed(output_file):
+    """
+    Returns True if the output database exists and its bulk load was committed in full (see LOAD_COMPLETE_MARKER).
+    """
+    if not os.path.exists(output_file):
+        return False
+    try:
+        conn = sqlite3.connect(output_file)
+        try:
+            return conn.execute("PRAGMA user_version").fetchone()[0] == LOAD_COMPLETE_MARKER
+        finally:
+            conn.close()
+    except sqlite3.DatabaseError:
+        return False
+
+def _load_records(cursor, table_columns, record_batches):
+    """
+    Creates the output tables and bulk loads the record batches into them. Returns the number of records written.
+    """
+    loader = BulkLoader(cursor)
 
     for table_name, extracted_columns in table_columns.items():
-        if table_name.lower() in sqlite_internal_tables:
+        if table_name.lower() in SQLITE_INTERNAL_TABLES:
             continue  
 
-        column_headers = base_headers + [col[0] for col in extracted_columns]
+        column_headers = BASE_HEADERS + [col[0] for col in extracted_columns]
         unique_column_headers = []
         added = set()
         for col in column_headers:
@@ -82,132 +205,112 @@ def write_to_sqlite(output_file, db_file_path, combined_records, combined_recove
             print(f"[!] Skipping creation of Table '{table_name}' due to missing valid columns. Definitions: {column_definitions}")
             continue
 
-        create_table = f'CREATE TABLE IF NOT EXISTS "{table_name}" ({", ".join(column_definitions)})'
+        create_table = f'CREATE TABLE IF NOT EXISTS "{output_table_name(table_name)}" ({", ".join(column_definitions)})'
 
         cursor.execute(create_table)
 
-    conn.commit()
-    # Track max columns for dynamic/freelist/unknown
-    max_columns = max((len(clean_row(row)) + 1 - len(base_headers)) for row in combined_records)
-    #print(f"[DEBUG] Max columns calculated for dynamic columns: {max_columns}")
-    dynamic_columns = [f"Column_{i+1}" for i in range(max_columns)]
-
-    for row in combined_records:
-        cleaned_row = clean_row(row)
+        insert_columns = [col for col in BASE_HEADERS if col != "Record_ID"] + [col[0].strip("'\"") for col in extracted_columns]
+        loader.register(output_table_name(table_name), insert_columns)
 
-        if len(cleaned_row) < 5:
-            print(f"[!] Skipping row (not enough data): {cleaned_row}")
-            continue
+    recovered_definitions_str = ", ".join(RECOVERED_COLUMN_DEFS)
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS "Recovered_Records" ({recovered_definitions_str})')
+    loader.register("Recovered_Records", [col for col in RECOVERED_COLUMN_NAMES if col != "Record_ID"])
 
-        table_name = str(cleaned_row[4])
+    # Freelist and Unknown rows have no declared schema. Their tables are sized for the widest
+    # declared table and are only widened when a wider record arrives.
+    planned_columns = max((len(columns) for columns in table_columns.values()), default=0)
+    dynamic_tables = {}
 
-        if table_name.lower() in sqlite_internal_tables:
-            continue
+    def dynamic_table(table_name, column_count):
+        current_columns = dynamic_tables.get(table_name)
+        if current_columns is not None and column_count <= current_columns:
+            return
 
-        # Special handling for "freelist" table
-        if table_name.lower() == "freelist":
-            column_headers = base_headers + dynamic_columns
+        if current_columns is None:
+            current_columns = max(planned_columns, column_count)
+            column_headers = BASE_HEADERS + [f"Column_{i+1}" for i in range(current_columns)]
             column_definitions = '"Record_ID" INTEGER PRIMARY KEY, ' + ", ".join([f'"{col}" TEXT' for col in column_headers if col != "Record_ID"])
-            cursor.execute(f'CREATE TABLE IF NOT EXISTS "Freelist" ({column_definitions})')
+            cursor.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({column_definitions})')
+        else:
+            loader.flush(table_name)
+            for i in range(current_columns, column_count):
+                cursor.execute(f'ALTER TABLE "{table_name}" ADD COLUMN "Column_{i+1}" BLOB')
+            current_columns = column_count
 
-            # Add missing columns dynamically
-            cursor.execute(f'PRAGMA table_info("Freelist")')
-            existing_columns = {row[1] for row in cursor.fetchall()}
-            missing_columns = set(column_headers) - existing_columns
-            for column in missing_columns:
-                cursor.execute(f'ALTER TABLE "Freelist" ADD COLUMN "{column}" BLOB')
+        dynamic_tables[table_name] = current_columns
+        insert_columns = [col for col in BASE_HEADERS if col != "Record_ID"] + [f"Column_{i+1}" for i in range(current_columns)]
+        loader.register(table_name, insert_columns)
 
-        # Special handling of unknown table or mismatched schema
-        elif table_name not in table_columns or len(cleaned_row) > len(table_columns[table_name]) + len(base_headers):   
-            table_name = "unknown"
-            column_headers = base_headers + dynamic_columns
+    record_count = 0
 
-            column_definitions = '"Record_ID" INTEGER PRIMARY KEY, ' + ", ".join([f'"{col}" TEXT' for col in column_headers if col != "Record_ID"])
-            cursor.execute(f'CREATE TABLE IF NOT EXISTS "Unknown" ({column_definitions})')
+    for records, recovered_records in record_batches:
+        for row in records:
+            cleaned_row = clean_row(row)
 
-            cursor.execute(f'PRAGMA table_info("Unknown")')
-            existing_columns = {row[1] for row in cursor.fetchall()}
-            missing_columns = set(column_headers) - existing_columns
-            for column in missing_columns:
-                cursor.execute(f'ALTER TABLE "Unknown" ADD COLUMN "{column}" BLOB')
-
-        else:
-            extracted_columns = table_columns[table_name]
-            column_headers = base_headers + extracted_columns
+            if len(cleaned_row) < 5:
+                print(f"[!] Skipping row (not enough data): {cleaned_row}")
+                continue
 
-        insert_columns = [col[0] if isinstance(col, tuple) else col for col in column_headers if col != "Record_ID"]
-        insert_columns = [col.strip("'\"") for col in insert_columns]
+            table_name = str(cleaned_row[4])
 
-        expected_column_count = len(insert_columns)
-        padded_row = cleaned_row[:expected_column_count] 
-        padded_row += [''] * (expected_column_count - len(padded_row)) 
+            if table_name.lower() in SQLITE_INTERNAL_TABLES:
+                continue
 
-        placeholders = ", ".join(["?"] * expected_column_count)
-        quoted_columns = ", ".join([f'"{col}"' for col in insert_columns])
-        table_target = table_name
-        insert_query = f'INSERT INTO "{table_target}" ({quoted_columns}) VALUES ({placeholders})'
+            # Special handling for "freelist" table
+            if table_name.lower() == "freelist":
+                table_name = "Freelist"
+                dynamic_table(table_name, len(cleaned_row) + 1 - len(BASE_HEADERS))
 
-        try:
-            cursor.execute(insert_query, padded_row)
-        except sqlite3.ProgrammingError as e:
-            print(f"[-] Error inserting into {table_name}: {e}")
-            continue
+            # Special handling of unknown table or mismatched schema
+            elif table_name not in table_columns or len(cleaned_row) > len(table_columns[table_name]) + len(BASE_HEADERS):   
+                table_name = "Unknown"
+                dynamic_table(table_name, len(cleaned_row) + 1 - len(BASE_HEADERS))
 
-    recovered_column_names = [
-        "Record_ID", "Source_File", "Frame_Number", "Page_Number",
-        "Page_Type", "Table_Name", "Record_Status", "File_Offset", "Recovered Data"
-    ]
-
-    recovered_column_defs = [
-        '"Record_ID" INTEGER PRIMARY KEY',
-        '"Source_File" TEXT',
-        '"Frame_Number" INTEGER',
-        '"Page_Number" INTEGER',
-        '"Page_Type" TEXT',
-        '"Table_Name" TEXT',
-        '"Record_Status" TEXT',
-        '"File_Offset" INTEGER',
-        '"Recovered Data" TEXT'
-    ]
-
-    recovered_definitions_str = ", ".join(recovered_column_defs)
-    cursor.execute(f'CREATE TABLE IF NOT EXISTS "Recovered_Records" ({recovered_definitions_str})')
+            loader.add(output_table_name(table_name), cleaned_row)
 
-    # Insert records into Recovered_Records table
-    for row in combined_recoveredrecords:
-        cleaned_row = clean_row(row)
+        # Insert records into Recovered_Records table
+        for row in recovered_records:
+            cleaned_row = clean_row(row)
 
-        if len(cleaned_row) < 5:
-            print(f"[!] Skipping recovered row (not enough data): {cleaned_row}")
-            continue
+            if len(cleaned_row) < 5:
+                print(f"[!] Skipping recovered row (not enough data): {cleaned_row}")
+                continue
 
-        table_name = cleaned_row[3]  
+            table_name = cleaned_row[3]  
 
-        if table_name.lower() in sqlite_internal_tables:
-            continue
+            if table_name.lower() in SQLITE_INTERNAL_TABLES:
+                continue
 
-        insert_columns = [col for col in recovered_column_names if col != "Record_ID"]  
-        insert_columns = [col.strip("'\"") for col in insert_columns]
+            loader.add("Recovered_Records", cleaned_row)
 
-        expected_column_count = len(insert_columns)
-        padded_row = cleaned_row[:expected_column_count] 
-        padded_row += [''] * (expected_column_count - len(padded_row)) 
+        record_count += len(records)
 
-        placeholders = ", ".join(["?"] * expected_column_count)
-        quoted_columns = ", ".join([f'"{col}"' for col in insert_columns])
-        insert_query = f'INSERT INTO "Recovered_Records" ({quoted_columns}) VALUES ({placeholders})'
+    loader.flush_all()
+    return record_count
 
-        try:
-            cursor.execute(insert_query, padded_row)
-        except sqlite3.ProgrammingError as e:
-            print(f"[-] Error inserting into Recovered_Records: {e}")
-            continue
+WAL_FRAMES_COLUMN_DEFS = [
+    '"Frame_Number" INTEGER PRIMARY KEY',
+    '"Source_File" TEXT',
+    '"Page_Number" INTEGER',
+    '"Commit_Frame" INTEGER',
+    '"Salt1" INTEGER',
+    '"Salt2" INTEGER',
+    '"Frame_Status" TEXT'
+]
 
+def write_wal_frames(output_file, source_file, transaction_index):
+    """
+    Writes the WAL_Frames table: every WAL frame with the commit frame of its transaction and its validation status
+    (see WalTransactionIndex). Record classification reads the transaction boundaries from it.
+    """
+    conn = sqlite3.connect(output_file)
+    cursor = conn.cursor()
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS "WAL_Frames" ({", ".join(WAL_FRAMES_COLUMN_DEFS)})')
+    cursor.executemany(
+        'INSERT OR REPLACE INTO "WAL_Frames" ("Frame_Number", "Source_File", "Page_Number", "Commit_Frame", "Salt1", "Salt2", "Frame_Status") VALUES (?, ?, ?, ?, ?, ?, ?)',
+        ((frame_number, source_file, page_number, commit_frame, salt1, salt2, status)
+         for frame_number, page_number, commit_frame, salt1, salt2, status in transaction_index.frame_rows()),
+    )
     conn.commit()
-    print("[+] Extracted Records succesfully added to SQLite Database")
     conn.close()
-
-
-
-
-
+    print(f"[+] WAL Frame Status written to the WAL_Frames table ({transaction_index.frame_count} frames)")
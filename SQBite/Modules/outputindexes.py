@@ -0,0 +1,97 @@
+import sqlite3
+import time
+
+# Columns that can be indexed in the output database (--indexes value -> column)
+INDEX_COLUMNS = {
+    "row_id": "Row_ID",
+    "page_number": "Page_Number",
+    "frame_number": "Frame_Number",
+    "record_status": "Record_Status",
+    "source_file": "Source_File",
+}
+DEFAULT_INDEX_COLUMNS = tuple(INDEX_COLUMNS)
+
+def parse_index_columns(value):
+    """
+    Parses the --indexes value: "all", "none" or a comma separated list of INDEX_COLUMNS keys.
+    Returns the tuple of keys; raises ValueError for unknown columns.
+    """
+    value = value.strip().lower()
+    if value == "all":
+        return DEFAULT_INDEX_COLUMNS
+    if value == "none":
+        return ()
+    keys = tuple(dict.fromkeys(key.strip() for key in value.split(",") if key.strip()))
+    unknown = [key for key in keys if key not in INDEX_COLUMNS]
+    if unknown:
+        raise ValueError(f"unknown index column(s) {', '.join(unknown)} (choose from {', '.join(INDEX_COLUMNS)}, all or none)")
+    return keys
+
+def index_name(table_name, column):
+    return f"sqbite_{table_name}_{column}"
+
+def _index_pages_size(cursor, index_names, page_size, pages_before):
+    """
+    Returns the bytes used by the given indexes, from dbstat where SQLite has it compiled in,
+    otherwise from the growth of the database.
+    """
+    try:
+        placeholders = ", ".join(["?"] * len(index_names))
+        size = cursor.execute(f"SELECT SUM(pgsize) FROM dbstat WHERE name IN ({placeholders})", index_names).fetchone()[0]
+        return size or 0
+    except sqlite3.OperationalError:
+        pages_after = cursor.execute("PRAGMA page_count").fetchone()[0]
+        return max(pages_after - pages_before, 0) * page_size
+
+def build_output_indexes(output_file, index_columns=DEFAULT_INDEX_COLUMNS):
+    """
+    Indexes the output tables after the bulk load so classification, Insta Search and analyst queries
+    filtering on Row_ID, Page_Number, Frame_Number, Record_Status or Source_File do not scan whole tables.
+    index_columns are INDEX_COLUMNS keys. The indexes of a table are built in one transaction, columns a table
+    does not have (or holds as its INTEGER PRIMARY KEY) are skipped, and ANALYZE is run once they are built.
+    Returns the names of the indexes built.
+    """
+    if not index_columns:
+        print("\n[!] Output Database Indexes Disabled")
+        return []
+
+    print("\n[+] Building Output Database Indexes")
+    start_time = time.perf_counter()
+
+    conn = sqlite3.connect(output_file, isolation_level=None)
+    cursor = conn.cursor()
+    page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+    pages_before = cursor.execute("PRAGMA page_count").fetchone()[0]
+
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+    table_names = [row[0] for row in cursor.fetchall()]
+
+    built_indexes = []
+    for table_name in table_names:
+        table_info = cursor.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+        table_columns = {col[1] for col in table_info if not col[5]}  # The primary key is already indexed
+        existing_indexes = {row[1] for row in cursor.execute(f'PRAGMA index_list("{table_name}")')}
+
+        columns = [INDEX_COLUMNS[key] for key in index_columns if INDEX_COLUMNS[key] in table_columns]
+        new_columns = [column for column in columns if index_name(table_name, column) not in existing_indexes]
+        if not new_columns:
+            continue
+
+        cursor.execute("BEGIN")
+        for column in new_columns:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS "{index_name(table_name, column)}" ON "{table_name}" ("{column}")')
+            built_indexes.append(index_name(table_name, column))
+        cursor.execute("COMMIT")
+
+    if not built_indexes:
+        conn.close()
+        print("[+] Output Database Indexes already built")
+        return built_indexes
+
+    cursor.execute("ANALYZE")
+    index_size = _index_pages_size(cursor, built_indexes, page_size, pages_before)
+    conn.close()
+
+    elapsed_time = time.perf_counter() - start_time
+    print(f"[+] Built {len(built_indexes)} indexes ({', '.join(INDEX_COLUMNS[key] for key in index_columns)}) and ran ANALYZE in {elapsed_time:.2f}s ({index_size / 1024:.1f} KB)")
+    return built_indexes
@@ -0,0 +1,73 @@
+import struct
+from collections import OrderedDict
+
+# Upper bound on the bytes of reassembled overflow chains kept in memory
+OVERFLOW_CACHE_BYTES = 64 * 1024 * 1024
+
+_NEXT_PAGE_STRUCT = struct.Struct(">I")
+
+class OverflowReader:
+    """
+    Follows overflow page chains through a page source (any object with page(n)) and reassembles them.
+
+    Chain pages are collected into a list and joined once, so reassembly is linear in the payload size.
+    Reassembled chains are cached by (first overflow page, length) because freelist, WAL and duplicate
+    copies of a record often point into the same chain.
+    """
+
+    def __init__(self, page_source, page_size, cache_bytes=OVERFLOW_CACHE_BYTES):
+        self.page_source = page_source
+        self.usable_size = page_size - 4  # Each overflow page starts with the 4-byte next page pointer
+        self.cache_bytes = cache_bytes
+        self._cached_bytes = 0
+        self._cache = OrderedDict()
+
+    def read_chain(self, first_page, length, cache_key=None, page_source=None):
+        """
+        Returns up to length bytes of overflow content starting at first_page.
+        The result is shorter than length if the chain ends early, loops or leaves the file.
+        cache_key replaces first_page in the cache key when the same page number can hold different content,
+        and page_source replaces the reader's page source for that chain (e.g. a WAL page view).
+        """
+        if page_source is None:
+            page_source = self.page_source
+        key = (first_page if cache_key is None else cache_key, length)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        chunks = []
+        remaining = length
+        page_number = first_page
+        seen_pages = set()
+        while page_number and remaining > 0:
+            if page_number in seen_pages:
+                print(f" [!] Overflow chain starting at page {first_page} loops back to page {page_number}")
+                break
+            seen_pages.add(page_number)
+
+            page_data = page_source.page(page_number)
+            if len(page_data) < 4:
+                break
+            chunk = page_data[4:4 + min(remaining, self.usable_size)]
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            page_number = _NEXT_PAGE_STRUCT.unpack_from(page_data, 0)[0]
+
+        overflow_data = b"".join(chunks)
+        self._store(key, overflow_data)
+        return overflow_data
+
+    def _store(self, key, overflow_data):
+        if len(overflow_data) > self.cache_bytes:
+            return
+        self._cache[key] = overflow_data
+        self._cached_bytes += len(overflow_data)
+        while self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted)
+
+    def clear(self):
+        self._cache.clear()
+        self._cached_bytes = 0
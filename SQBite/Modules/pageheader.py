@@ -0,0 +1,54 @@
+import struct
+from collections import namedtuple
+from functools import lru_cache
+
+# Constants for page types
+INDEXINTERIOR_PAGE_TYPE = 2
+TABLEINTERIOR_PAGE_TYPE = 5
+INDEXLEAF_PAGE_TYPE = 10
+TABLELEAF_PAGE_TYPE = 13
+BTREE_PAGE_TYPES = {INDEXINTERIOR_PAGE_TYPE, TABLEINTERIOR_PAGE_TYPE, INDEXLEAF_PAGE_TYPE, TABLELEAF_PAGE_TYPE}
+
+LEAF_HEADER_SIZE = 8
+INTERIOR_HEADER_SIZE = 12
+
+_HEADER_STRUCT = struct.Struct(">BHHHB")
+_RIGHTMOST_STRUCT = struct.Struct(">I")
+
+PageHeader = namedtuple("PageHeader", [
+    "page_type",            # b-tree page type flag
+    "first_freeblock",      # offset of the first freeblock, 0 if none
+    "cell_count",           # number of cells on the page
+    "cell_content_start",   # start of the cell content area as stored (0 means 65536)
+    "fragmented_bytes",     # number of fragmented free bytes in the cell content area
+    "rightmost_pointer",    # right-most child page for interior pages, None for leaf pages
+    "header_size",          # 8 for leaf pages, 12 for interior pages
+    "cell_pointers",        # tuple of cell offsets, already adjusted by pointer_adjust
+])
+
+@lru_cache(maxsize=None)
+def _cell_pointer_struct(cell_count):
+    return struct.Struct(f">{cell_count}H")
+
+def parse_page_header(page_data, pointer_adjust=0):
+    """
+    Decodes a b-tree page header and its whole cell pointer array in one unpack.
+    pointer_adjust is subtracted from every cell pointer (100 when page_data is page 1 without the database header).
+    The cell count is clamped to the pointers that fit on the page.
+    """
+    page_type, first_freeblock, cell_count, cell_content_start, fragmented_bytes = _HEADER_STRUCT.unpack_from(page_data, 0)
+
+    if page_type == TABLEINTERIOR_PAGE_TYPE or page_type == INDEXINTERIOR_PAGE_TYPE:
+        header_size = INTERIOR_HEADER_SIZE
+        rightmost_pointer = _RIGHTMOST_STRUCT.unpack_from(page_data, 8)[0]
+    else:
+        header_size = LEAF_HEADER_SIZE
+        rightmost_pointer = None
+
+    pointer_count = min(cell_count, max(len(page_data) - header_size, 0) // 2)
+    cell_pointers = _cell_pointer_struct(pointer_count).unpack_from(page_data, header_size)
+    if pointer_adjust:
+        cell_pointers = tuple(pointer - pointer_adjust for pointer in cell_pointers)
+
+    return PageHeader(page_type, first_freeblock, cell_count, cell_content_start, fragmented_bytes,
+                      rightmost_pointer, header_size, cell_pointers)
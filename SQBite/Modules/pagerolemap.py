@@ -0,0 +1,129 @@
+from array import array
+from Modules.freelistpagenumbers import extract_freelist_pagenumbers
+from Modules.calculate_pointermappages import calculate_pointer_pages
+from Modules.pointermap import PTRMAP_OVERFLOW1, PTRMAP_OVERFLOW2
+
+# Page roles stored in PageRoleMap.roles
+PAGE_ROLE_UNKNOWN = 0
+PAGE_ROLE_TABLE_BTREE = 1
+PAGE_ROLE_INDEX_BTREE = 2
+PAGE_ROLE_FREELIST_TRUNK = 3
+PAGE_ROLE_FREELIST_LEAF = 4
+PAGE_ROLE_POINTER_MAP = 5
+PAGE_ROLE_LOCK_BYTE = 6
+PAGE_ROLE_OVERFLOW = 7
+
+# The lock-byte page is the page holding file offset 1073741824 (1 GiB); it is never used for content
+LOCK_BYTE_OFFSET = 1073741824
+
+def lock_byte_page(page_size):
+    return LOCK_BYTE_OFFSET // page_size + 1
+
+class PageRoleMap:
+    """
+    Role and owning object of every page of the Main Database file, indexed by page number.
+
+    roles  - bytearray of PAGE_ROLE_* values
+    owners - array of owner IDs, an index into owner_names (0 means no owner)
+    Both are computed once per run and are small enough to hand to the page scan workers.
+    """
+
+    def __init__(self, total_pages):
+        self.total_pages = total_pages
+        self.roles = bytearray(total_pages + 1)
+        self.owners = array("I", bytes(4 * (total_pages + 1)))
+        self.owner_names = [None]
+        self._owner_ids = {}
+
+    def owner_id(self, owner_name):
+        """
+        Returns the owner ID for a table or index name, registering it if needed.
+        """
+        owner_id = self._owner_ids.get(owner_name)
+        if owner_id is None:
+            owner_id = self._owner_ids[owner_name] = len(self.owner_names)
+            self.owner_names.append(owner_name)
+        return owner_id
+
+    def set_role(self, page_number, role, owner_id=0):
+        if 1 <= page_number <= self.total_pages:
+            self.roles[page_number] = role
+            self.owners[page_number] = owner_id
+
+    def role(self, page_number):
+        if 1 <= page_number <= self.total_pages:
+            return self.roles[page_number]
+        return PAGE_ROLE_UNKNOWN
+
+    def owner(self, page_number):
+        """
+        Returns the name of the table or index owning the page, or None.
+        """
+        if 1 <= page_number <= self.total_pages:
+            return self.owner_names[self.owners[page_number]]
+        return None
+
+def build_page_role_map(page_source, schema_catalog):
+    """
+    Builds the PageRoleMap of the Main Database file from the schema catalog, the pointer map (auto_vacuum only),
+    the freelist and the file geometry.
+    Later roles take precedence: b-tree pages, then freelist pages, then pointer map and lock-byte pages.
+    """
+    header = page_source.header
+    page_size = page_source.page_size
+    total_pages = page_source.total_pages
+    role_map = PageRoleMap(total_pages)
+
+    # Table b-tree pages (leaf and interior) and their owning table (index pages for WITHOUT ROWID tables)
+    for table in schema_catalog.tables:
+        owner_id = role_map.owner_id(table["name"])
+        if table["root_page"]:
+            role_map.set_role(table["root_page"], PAGE_ROLE_TABLE_BTREE, owner_id)
+        for page_number in table["interior_pages"]:
+            role_map.set_role(page_number, PAGE_ROLE_TABLE_BTREE, owner_id)
+        for page_number in table["pages"]:
+            role_map.set_role(page_number, PAGE_ROLE_TABLE_BTREE, owner_id)
+
+    # Index b-tree pages (leaf and interior) and their owning index
+    for index in schema_catalog.indexes:
+        owner_id = role_map.owner_id(index["name"])
+        for page_number in [index["root_page"], *index["interior_pages"], *index["pages"]]:
+            if page_number and role_map.role(page_number) == PAGE_ROLE_UNKNOWN:
+                role_map.set_role(page_number, PAGE_ROLE_INDEX_BTREE, owner_id)
+
+    # With a pointer map every b-tree and overflow page resolves to its root page directly
+    pointer_map = schema_catalog.pointer_map
+    if pointer_map is not None:
+        root_owners = {table["root_page"]: (PAGE_ROLE_TABLE_BTREE, table["name"]) for table in schema_catalog.tables if table["root_page"]}
+        for index in schema_catalog.indexes:
+            if index["root_page"]:
+                root_owners.setdefault(index["root_page"], (PAGE_ROLE_INDEX_BTREE, index["name"]))
+
+        for page_number in range(1, total_pages + 1):
+            entry_type = pointer_map.types[page_number]
+            if not entry_type or role_map.roles[page_number]:
+                continue
+            root_owner = root_owners.get(pointer_map.root_page(page_number))
+            if root_owner is None:
+                continue
+            role, owner_name = root_owner
+            if entry_type == PTRMAP_OVERFLOW1 or entry_type == PTRMAP_OVERFLOW2:
+                role = PAGE_ROLE_OVERFLOW
+            role_map.set_role(page_number, role, role_map.owner_id(owner_name))
+
+    # Freelist trunk and leaf pages
+    freelist_pages, freelist_trunk_pages = extract_freelist_pagenumbers(page_source, header["first_freelist_trunk_page"])
+    for page_number in freelist_pages:
+        role_map.set_role(page_number, PAGE_ROLE_FREELIST_LEAF)
+    for page_number in freelist_trunk_pages:
+        role_map.set_role(page_number, PAGE_ROLE_FREELIST_TRUNK)
+
+    # Pointer map pages (page 2 and every page_size // 5 + 1 pages after it) when auto_vacuum is enabled
+    if header["auto_vacuum"] > 0:
+        role_map.set_role(2, PAGE_ROLE_POINTER_MAP)
+        for page_number in calculate_pointer_pages(header["auto_vacuum"], page_size, total_pages):
+            role_map.set_role(page_number, PAGE_ROLE_POINTER_MAP)
+
+    role_map.set_role(lock_byte_page(page_size), PAGE_ROLE_LOCK_BYTE)
+
+    return role_map
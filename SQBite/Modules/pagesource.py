@@ -0,0 +1,145 @@
+import errno
+import mmap
+import os
+from Modules.parsesqliteheader import parse_sqlite_header
+from Modules.overflowreader import OverflowReader
+
+# Preallocated zero buffers by length that page data is compared against
+_ZERO_BUFFERS = {}
+
+def is_zero_page(page_data):
+    """
+    Returns True if every byte of page_data is zero.
+    A memoryview is compared item by item in Python, so the page is copied to bytes first:
+    comparing two bytes objects is a single memcmp.
+    """
+    size = len(page_data)
+    zero_buffer = _ZERO_BUFFERS.get(size)
+    if zero_buffer is None:
+        zero_buffer = _ZERO_BUFFERS[size] = bytes(size)
+    return bytes(page_data) == zero_buffer
+
+class PageSource:
+    """
+    Memory maps the SQLite Main Database file and hands out zero-copy memoryview slices by page number.
+    """
+
+    def __init__(self, db_path):
+        self.path = db_path
+        self._file = open(db_path, "rb")
+        try:
+            self.header = parse_sqlite_header(self._file)
+            self.page_size = self.header["page_size"]
+            self.file_size = os.fstat(self._file.fileno()).st_size
+            self.total_pages = self.file_size // self.page_size
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._view = memoryview(self._mmap)
+        self.overflow_reader = OverflowReader(self, self.page_size)
+
+        # Current data extent (start, end) found with SEEK_DATA/SEEK_HOLE, used to skip sparse regions
+        self._data_extent = (0, 0)
+        self._sparse_supported = hasattr(os, "SEEK_DATA") and hasattr(os, "SEEK_HOLE")
+        self._readahead_supported = hasattr(mmap, "MADV_WILLNEED")
+
+    def page(self, page_number):
+        """
+        Returns a memoryview of the page (1-based). Pages outside the file return an empty view.
+        """
+        if page_number < 1:
+            return self._view[0:0]
+        page_offset = (page_number - 1) * self.page_size
+        return self._view[page_offset:page_offset + self.page_size]
+
+    def page_offset(self, page_number):
+        """
+        Returns the physical file offset of the page.
+        """
+        return (page_number - 1) * self.page_size
+
+    def page_origin(self, page_number):
+        """
+        Returns (source file, frame number, physical file offset) of the page; pages of the Main Database file have no frame ("N/A").
+        """
+        return os.path.basename(self.path), "N/A", (page_number - 1) * self.page_size
+
+    def is_valid_page(self, page_number):
+        return 1 <= page_number <= self.total_pages
+
+    def readahead(self, page_numbers):
+        """
+        Advises the kernel to read the given pages (sorted page numbers) ahead, one request per contiguous run.
+        Does nothing where madvise is not available.
+        """
+        if not self._readahead_supported:
+            return
+        run_first = run_last = None
+        for page_number in page_numbers:
+            if run_last is not None and page_number == run_last + 1:
+                run_last = page_number
+                continue
+            if run_first is not None:
+                self._advise_willneed(run_first, run_last)
+            run_first = run_last = page_number
+        if run_first is not None:
+            self._advise_willneed(run_first, run_last)
+
+    def _advise_willneed(self, first_page, last_page):
+        start = max(first_page - 1, 0) * self.page_size
+        end = min(last_page * self.page_size, self.file_size)
+        start -= start % mmap.PAGESIZE  # madvise needs an offset aligned to the memory page size
+        if end <= start:
+            return
+        try:
+            self._mmap.madvise(mmap.MADV_WILLNEED, start, end - start)
+        except (OSError, ValueError):
+            self._readahead_supported = False
+
+    def next_data_page(self, page_number):
+        """
+        Returns the first page at or after page_number that is not entirely inside a sparse hole of the file.
+        Returns total_pages + 1 if only holes remain, and page_number itself if the file system cannot report holes.
+        """
+        if not self._sparse_supported:
+            return page_number
+
+        page_offset = (page_number - 1) * self.page_size
+        extent_start, extent_end = self._data_extent
+        if extent_start <= page_offset < extent_end:
+            return page_number
+
+        try:
+            data_start = os.lseek(self._file.fileno(), page_offset, os.SEEK_DATA)
+            data_end = os.lseek(self._file.fileno(), data_start, os.SEEK_HOLE)
+        except OSError as e:
+            if e.errno == errno.ENXIO:  # No data after page_offset
+                return self.total_pages + 1
+            self._sparse_supported = False
+            return page_number
+
+        self._data_extent = (data_start, data_end)
+        return max(page_number, data_start // self.page_size + 1)
+
+    def read_overflow_chain(self, first_page, length):
+        """
+        Returns up to length bytes of the overflow chain starting at first_page.
+        """
+        return self.overflow_reader.read_chain(first_page, length)
+
+    def close(self):
+        self.overflow_reader.clear()
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Slices handed out are still referenced; the map is released once they are collected
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
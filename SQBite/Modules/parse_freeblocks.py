@@ -1,14 +1,17 @@
 import struct
-import string
+from Modules.pageheader import parse_page_header
+from Modules.printableruns import extract_printable_runs
 
-def extract_printable_from_freeblock(page_data, page_number, frame_number, file_offset_for_page):
+def extract_printable_from_freeblock(page_data, page_number, frame_number, file_offset_for_page, page_header=None):
     """
-    Extracts printable data from the freeblocks
+    Extracts printable runs from the freeblocks
+    Returns a list of (file_offset, printable_run)
     """
     freeblocks = []
     # Extract the freeblock offset (2 bytes from position 1 to 3)
-    freeblock_offset = struct.unpack(">H", page_data[1:3])[0]
-    freeblock_pointer = freeblock_offset
+    if page_header is None:
+        page_header = parse_page_header(page_data)
+    freeblock_pointer = page_header.first_freeblock
 
     # Process freeblocks until the pointer is 0 (end of the freeblocks list)
     while freeblock_pointer != 0:
@@ -30,14 +33,11 @@ def extract_printable_from_freeblock(page_data, page_number, frame_number, file_
         # Extract the freeblock data
         freeblock_data = page_data[next_freeblock_offset + 4: next_freeblock_offset + 4 + freeblock_length]
 
-        # Filter for printable characters only
-        printable_data = ''.join(ch for ch in freeblock_data.decode(errors="replace") if ch in string.printable)
+        # Calculate the absolute offset of the freeblock data in the file
+        absolute_freeblock_offset = file_offset_for_page + next_freeblock_offset + 4
 
-        # Calculate the absolute offset for this freeblock in the WAL file
-        absolute_freeblock_offset = file_offset_for_page + next_freeblock_offset
-
-        # Append the freeblock's offset and printable data to the list
-        freeblocks.append((absolute_freeblock_offset, printable_data))
+        # Append each printable run with its own offset
+        freeblocks.extend(extract_printable_runs(freeblock_data, absolute_freeblock_offset))
 
         # Move to the next freeblock pointer
         freeblock_pointer = next_freeblock
@@ -1,12 +1,17 @@
-import struct
 import os
-from Modules.parsesqliteheader import parse_sqlite_header
-from Modules.findtable import parse_db_for_tables
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from Modules.pagesource import is_zero_page
+from Modules.snapshotpagesource import open_page_source
 from Modules.btreeleafpage_processing import mainparse_leaf_page
+from Modules.btreeindexpage_processing import parse_index_page, index_record_row
+from Modules.pageheader import parse_page_header
 from Modules.parse_unallocated import extract_printable_from_unallocated, extract_printable_from_freelisttrunk
 from Modules.parse_freeblocks import extract_printable_from_freeblock
-from Modules.freelistpagenumbers import extract_freelist_pagenumbers
-from Modules.calculate_pointermappages import calculate_pointer_pages
+from Modules.pagerolemap import (
+    build_page_role_map, PAGE_ROLE_TABLE_BTREE, PAGE_ROLE_INDEX_BTREE, PAGE_ROLE_FREELIST_TRUNK, PAGE_ROLE_FREELIST_LEAF,
+    PAGE_ROLE_POINTER_MAP, PAGE_ROLE_LOCK_BYTE, PAGE_ROLE_OVERFLOW,
+)
 
 # Constants for page types
 TABLEINTERIOR_PAGE_TYPE = 5
@@ -15,173 +20,271 @@ INDEXINTERIOR_PAGE_TYPE = 2
 INDEXLEAF_PAGE_TYPE = 10
 MAINDBHEADER = 83
 
-def parse_sqlite_file(db_path):
+# Number of pages parsed per record batch
+PAGE_BATCH_SIZE = 256
+
+def parse_sqlite_file(db_path, schema_catalog, workers=1, role_map=None, wal_path=None, snapshot_frame=None, transaction_index=None):
     """
-    Parses the SQLite Main Database file
+    Parses the SQLite Main Database file using the schema catalog built for the run.
+    The page role map is built here unless one is passed in (e.g. from the sidecar index).
+    Yields (records, recovered_records) batches in page order so the output writer can consume them as they arrive.
+    With more than one worker the page batches are parsed in a process pool and merged back in page order.
+    With wal_path and snapshot_frame the database is parsed as it stood at that WAL commit frame (see SnapshotPageSource);
+    the schema catalog and role map must then be built from the same snapshot. transaction_index is the
+    WalTransactionIndex of the WAL, handed to every snapshot page source so it is not rebuilt per worker.
     """
-    with open(db_path, "rb") as db_file:
-        print(f"\nProcessing {os.path.basename(db_path)}...\n")
-        header = parse_sqlite_header(db_file)
-        page_size = header["page_size"]
-        auto_vacuum = header["auto_vacuum"]
-        first_freelist_trunk = header["first_freelist_trunk_page"]
-        total_pages = os.path.getsize(db_path) // page_size
+    with open_page_source(db_path, wal_path, snapshot_frame, transaction_index) as page_source:
+        if wal_path is None:
+            print(f"\nProcessing {os.path.basename(db_path)}...\n")
+        else:
+            print(f"\nProcessing {os.path.basename(db_path)} as of {os.path.basename(wal_path)} Commit Frame {snapshot_frame}...\n")
+        total_pages = page_source.total_pages
+
+        # Role and owner of every page (freelist, pointer map, lock-byte, table and index b-tree), computed once
+        if role_map is None:
+            role_map = build_page_role_map(page_source, schema_catalog)
+
+        page_maps = {
+            "role_map": role_map,
+            "index_layouts": schema_catalog.index_record_layouts(),
+        }
+
+        page_ranges = split_page_ranges(total_pages, PAGE_BATCH_SIZE)
+
+        if workers <= 1 or len(page_ranges) < 2:
+            for first_page, last_page in page_ranges:
+                yield parse_page_range(page_source, page_maps, first_page, last_page)
+            return
+
+    print(f"[+] Scanning {total_pages} pages with {workers} workers\n")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(db_path, page_maps, wal_path, snapshot_frame, transaction_index)) as executor:
+        # Results are taken in submission order so batches stay in page order.
+        # Only a few batches per worker are in flight to keep memory flat.
+        pending = deque()
+        for page_range in page_ranges:
+            pending.append(executor.submit(_parse_worker_range, page_range))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def split_page_ranges(total_pages, range_size):
+    """
+    Splits pages 1..total_pages into contiguous (first_page, last_page) ranges of at most range_size pages.
+    """
+    return [
+        (first_page, min(first_page + range_size - 1, total_pages))
+        for first_page in range(1, total_pages + 1, range_size)
+    ]
+
+# Per-process state for the page scan workers
+_worker_page_source = None
+_worker_page_maps = None
+
+def _init_worker(db_path, page_maps, wal_path=None, snapshot_frame=None, transaction_index=None):
+    global _worker_page_source, _worker_page_maps
+    _worker_page_source = open_page_source(db_path, wal_path, snapshot_frame, transaction_index)
+    _worker_page_maps = page_maps
+
+def _parse_worker_range(page_range):
+    first_page, last_page = page_range
+    return parse_page_range(_worker_page_source, _worker_page_maps, first_page, last_page)
+
+def parse_page_range(page_source, page_maps, first_page, last_page):
+    """
+    Parses pages first_page..last_page (inclusive) of the Main Database file (or of a database snapshot,
+    where pages held by the WAL are attributed to their WAL frame)
+    """
+    page_size = page_source.page_size
+    role_map = page_maps["role_map"]
+    index_layouts = page_maps["index_layouts"]
+    roles = role_map.roles
+
+    records = []
+    recovered_records = []
+    freetable_name = "freelist"
+
+    # Process each page in the range
+    skip_until = first_page
+    for page_number in range(first_page, last_page + 1):
+        # Pages inside sparse holes are all zeros and are skipped in bulk without being read
+        if page_number < skip_until:
+            continue
+        skip_until = page_source.next_data_page(page_number)
+        if skip_until > page_number:
+            print(f"[!] Skipping Pages {page_number}-{min(skip_until, last_page + 1) - 1}: Sparse Region (Empty Pages)")
+            continue
+
+        page_data = page_source.page(page_number)
+        if not page_data:
+            continue
+
+        page_role = roles[page_number]
+
+        # Skip pointer map pages if auto_vacuum is enabled
+        if page_role == PAGE_ROLE_POINTER_MAP:
+            print(f"[!] Skipping Page {page_number}: Pointer Map Page")
+            continue
+
+        # Skip the lock-byte page (databases larger than 1 GiB)
+        if page_role == PAGE_ROLE_LOCK_BYTE:
+            print(f"[!] Skipping Page {page_number}: Lock-Byte Page")
+            continue
+
+        source_file, frame_number, file_offset_for_page = page_source.page_origin(page_number)
+        page_type = page_data[0]
         
-        print(f"[+] Processing Database Schema")
-        all_table_pages = parse_db_for_tables(db_file, page_size)
+        # Parse unallocated space from freelist trunk pages
+        if page_role == PAGE_ROLE_FREELIST_TRUNK:
+            print(f"[!] Processing Page {page_number}: Freelist Trunk Page - Unallocated Space Only")
+            for unallocated_offset, unallocated in extract_printable_from_freelisttrunk(page_data, page_number, 0, file_offset_for_page):
+                recovered_records.append((source_file, frame_number, page_number, "Freelist Trunk Page", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))            
         
-        table_pages_map = {}
-        for table in all_table_pages:
-            for page in table["pages"]:
-                table_pages_map[page] = table["table_name"]
-                
-        print(F"[+] Finished Processing Database Schema\n")
-                
-        # Identify freelist pages
-        freelist_pages, freelist_trunk_pages = extract_freelist_pagenumbers(db_file, page_size, first_freelist_trunk)
-
-        # Identify freelist pages
-        pointer_pages = calculate_pointer_pages(auto_vacuum, page_size, total_pages)
-
-        records = []
-        recovered_records = []
-        freetable_name = "freelist"
-
-        # Process each page in the database file
-        for page_number in range(1, total_pages + 1):
-            db_file.seek((page_number - 1) * page_size)
-            page_data = db_file.read(page_size)
-            if not page_data:
-                continue
-
-            # Skip pointer map pages if auto_vacuum is enabled
-            if auto_vacuum > 0 and (page_number == 2 or page_number in pointer_pages):
-                print(f"[!] Skipping Page {page_number}: Pointer Map Page")
-                continue
-
-            file_offset_for_page = (page_number - 1) * page_size
-            page_type = page_data[0]
+        #Parses Freelist Pages
+        elif page_role == PAGE_ROLE_FREELIST_LEAF:
+            # Parse unallocated space from Table Interior freelist pages
+            if page_type == TABLEINTERIOR_PAGE_TYPE:
+                print(f"[!] Processing Page {page_number}: Freelist - Table Interior Page - Unallocated Space Only")
+                for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page):
+                    recovered_records.append((source_file, frame_number, page_number, "Freelist Table Interior", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))
             
-            # Parse unallocated space from freelist trunk pages
-            if page_number in freelist_trunk_pages:
-                print(f"[!] Processing Page {page_number}: Freelist Trunk Page - Unallocated Space Only")
-                unallocated, unallocated_offset = extract_printable_from_freelisttrunk(page_data, page_number, 0, file_offset_for_page)
-                if unallocated:
-                    recovered_records.append((os.path.basename(db_path), "N/A", page_number, "Freelist Trunk Page", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))            
-            
-            #Parses Freelist Pages
-            elif page_number in freelist_pages:
-                # Parse unallocated space from Table Interior freelist pages
-                if page_type == TABLEINTERIOR_PAGE_TYPE:
-                    print(f"[!] Processing Page {page_number}: Freelist - Table Interior Page - Unallocated Space Only")
-                    unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page)
-                    if unallocated:
-                        recovered_records.append((os.path.basename(db_path), "N/A", page_number, "Freelist Table Interior", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))
-                
-                # Parse unallocated space from Index Interior freelist pages
-                elif page_type == INDEXINTERIOR_PAGE_TYPE:
-                    print(f"[!] Processing Page {page_number}: Freelist - Index Interior Page - Unallocated Space Only")
-                    unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page)
-                    if unallocated:
-                        recovered_records.append((os.path.basename(db_path), "N/A", page_number, "Freelist Index Interior", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))
-
-                # Parse cells, freeblocks and Unallocated Space from Table Leaf Freelist Pages
-                elif page_type == TABLELEAF_PAGE_TYPE:
-                    print(f"[+] Processing Page {page_number}: Freelist Table Leaf Page")
-                    
-                    table_name = freetable_name
-
-                    if table_name:
-                        try:
-                            cells = mainparse_leaf_page(db_file, page_data, page_number, page_size)
-                            for cell in cells:
-                                cell_offset = file_offset_for_page + cell[0]
-                                records.append((os.path.basename(db_path), "N/A", page_number, "Freelist", freetable_name, cell_offset, *cell[1:]))
-
-                            # Extract unallocated and freeblock data from the page
-                            unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page)
-                            if unallocated:
-                                recovered_records.append((os.path.basename(db_path), "N/A", page_number, "Freelist Table Leaf", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))
-
-                            freeblocks = extract_printable_from_freeblock(page_data, page_number, 0, file_offset_for_page)
-                            for freeblock_offset, freeblock in freeblocks:
-                                recovered_records.append((os.path.basename(db_path), "N/A", page_number, "Freelist Table Leaf", freetable_name, "Freeblock", freeblock_offset, freeblock))
-
-                        except Exception as e:
-                            print(f" [-] Error parsing freelist leaf page {page_number}: {e}")
-
-                # Parse unallocated space from Index Leaf freelist pages
-                elif page_type == INDEXLEAF_PAGE_TYPE:
-                    print(f"[!] Processing Page {page_number}: Freelist - Index Leaf Page - Unallocated Space Only")
-                    unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page)
-                    if unallocated:
-                        recovered_records.append((os.path.basename(db_path), "N/A", page_number, "Freelist Index Leaf", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))
-                        
-                elif page_type == 0:
-                    if all(b == 0 for b in page_data):
-                        print(f"[!] Skipping Page {page_number}: Freelist Empty Page")
-                    else:
-                        print(f"[!] Skipping Page {page_number}: Freelist Overflow Page")
-
-            # Parse unallocated space from table interior pages
-            elif page_type == TABLEINTERIOR_PAGE_TYPE:
-                print(f"[!] Processing Page {page_number}: B-tree Table Interior Page - Unallocated Space Only")
-                unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page)
-                if unallocated:
-                    recovered_records.append((os.path.basename(db_path), "N/A", page_number, "B-tree Table Interior", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
-            
-            # Parse unallocated space from index interior pages
+            # Parse unallocated space from Index Interior freelist pages
             elif page_type == INDEXINTERIOR_PAGE_TYPE:
-                print(f"[!] Processing Page {page_number}: B-tree Index Interior Page - Unallocated Space Only")
-                unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page)
-                if unallocated:
-                    recovered_records.append((os.path.basename(db_path), "N/A", page_number, "B-tree Index Interior", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
+                print(f"[!] Processing Page {page_number}: Freelist - Index Interior Page - Unallocated Space Only")
+                for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page):
+                    recovered_records.append((source_file, frame_number, page_number, "Freelist Index Interior", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))
 
-            # Parse cells, freeblocks and Unallocated Space from Table Leaf Pages
+            # Parse cells, freeblocks and Unallocated Space from Table Leaf Freelist Pages
             elif page_type == TABLELEAF_PAGE_TYPE:
-                print(f"[+] Processing Page {page_number}: B-tree Table Leaf Page")
-
-                # Find the table name by checking if the page is part of the B-tree of any table
-                table_name = table_pages_map.get(page_number)
+                print(f"[+] Processing Page {page_number}: Freelist Table Leaf Page")
+                
+                table_name = freetable_name
 
                 if table_name:
                     try:
-                        cells = mainparse_leaf_page(db_file, page_data, page_number, page_size)
+                        # The page header is decoded once and shared by the cell, unallocated and freeblock parsers
+                        page_header = parse_page_header(page_data)
+                        cells = mainparse_leaf_page(page_source, page_data, page_number, page_size, page_header=page_header)
                         for cell in cells:
                             cell_offset = file_offset_for_page + cell[0]
-                            records.append((os.path.basename(db_path), "N/A", page_number, "Allocated", table_name, cell_offset, *cell[1:]))
+                            records.append((source_file, frame_number, page_number, "Freelist", freetable_name, cell_offset, *cell[1:]))
 
                         # Extract unallocated and freeblock data from the page
-                        unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page)
-                        if unallocated:
-                            recovered_records.append((os.path.basename(db_path), "N/A", page_number, "B-tree Table Leaf", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
+                        for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page, page_header):
+                            recovered_records.append((source_file, frame_number, page_number, "Freelist Table Leaf", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))
 
-                        freeblocks = extract_printable_from_freeblock(page_data, page_number, 0, file_offset_for_page)
+                        freeblocks = extract_printable_from_freeblock(page_data, page_number, 0, file_offset_for_page, page_header)
                         for freeblock_offset, freeblock in freeblocks:
-                            recovered_records.append((os.path.basename(db_path), "N/A", page_number, "B-tree Table Leaf", table_name, "Freeblock", freeblock_offset, freeblock))
+                            recovered_records.append((source_file, frame_number, page_number, "Freelist Table Leaf", freetable_name, "Freeblock", freeblock_offset, freeblock))
 
                     except Exception as e:
-                        print(f" [-]  Error parsing leaf page {page_number}: {e}")
+                        print(f" [-] Error parsing freelist leaf page {page_number}: {e}")
 
-            # Parse unallocated space from index leaf pages
+            # Parse cells, freeblocks and Unallocated Space from Index Leaf Freelist Pages
             elif page_type == INDEXLEAF_PAGE_TYPE:
-                print(f"[!] Processing Page {page_number}: B-tree Index Leaf Page - Unallocated Space Only")
-                unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page)
-                if unallocated:
-                    recovered_records.append((os.path.basename(db_path), "N/A", page_number, "B-tree Index Leaf", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
+                print(f"[+] Processing Page {page_number}: Freelist Index Leaf Page")
+                try:
+                    page_header = parse_page_header(page_data)
+                    for cell in parse_index_page(page_source, page_data, page_number, page_size, page_header):
+                        cell_offset = file_offset_for_page + cell[0]
+                        records.append((source_file, frame_number, page_number, "Freelist", freetable_name, cell_offset, None, *cell[1:]))
 
-            # Skipping unknown and overflow pages (Records with overflow are reconstructed for table leaf cells
+                    for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page, page_header):
+                        recovered_records.append((source_file, frame_number, page_number, "Freelist Index Leaf", freetable_name, "Page Unallocated Space", unallocated_offset, unallocated))
+
+                    freeblocks = extract_printable_from_freeblock(page_data, page_number, 0, file_offset_for_page, page_header)
+                    for freeblock_offset, freeblock in freeblocks:
+                        recovered_records.append((source_file, frame_number, page_number, "Freelist Index Leaf", freetable_name, "Freeblock", freeblock_offset, freeblock))
+
+                except Exception as e:
+                    print(f" [-] Error parsing freelist index leaf page {page_number}: {e}")
+                    
             elif page_type == 0:
-                if all(b == 0 for b in page_data):
-                    print(f"[!] Skipping Page {page_number}: Empty Page")
+                if is_zero_page(page_data):
+                    print(f"[!] Skipping Page {page_number}: Freelist Empty Page")
                 else:
-                    print(f"[!] Skipping Page {page_number}: Overflow Page")
+                    print(f"[!] Skipping Page {page_number}: Freelist Overflow Page")
+
+        # Parse unallocated space from table interior pages
+        elif page_type == TABLEINTERIOR_PAGE_TYPE:
+            print(f"[!] Processing Page {page_number}: B-tree Table Interior Page - Unallocated Space Only")
+            for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page):
+                recovered_records.append((source_file, frame_number, page_number, "B-tree Table Interior", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
+        
+        # Parse cells, freeblocks and Unallocated Space from Index Interior and Index Leaf Pages
+        # (index b-trees and WITHOUT ROWID tables; interior index cells hold keys as well)
+        elif page_type == INDEXINTERIOR_PAGE_TYPE or page_type == INDEXLEAF_PAGE_TYPE:
+            page_label = "B-tree Index Interior" if page_type == INDEXINTERIOR_PAGE_TYPE else "B-tree Index Leaf"
+
+            # Find the index or WITHOUT ROWID table name from the owner of the page in the role map
+            owner_name = role_map.owner(page_number) if page_role == PAGE_ROLE_INDEX_BTREE or page_role == PAGE_ROLE_TABLE_BTREE else None
 
-            # Skipping Page 1
-            elif page_type == MAINDBHEADER:
-                print(f"[!] Skipping Page {page_number}: Main Database File Header and Schema")
+            if owner_name:
+                print(f"[+] Processing Page {page_number}: {page_label} Page")
+                try:
+                    page_header = parse_page_header(page_data)
+                    layout = index_layouts.get(owner_name)
+                    for cell in parse_index_page(page_source, page_data, page_number, page_size, page_header):
+                        cell_offset = file_offset_for_page + cell[0]
+                        row_id, values = index_record_row(layout, cell[1:])
+                        records.append((source_file, frame_number, page_number, "Allocated", owner_name, cell_offset, row_id, *values))
 
+                    for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page, page_header):
+                        recovered_records.append((source_file, frame_number, page_number, page_label, "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
+
+                    freeblocks = extract_printable_from_freeblock(page_data, page_number, 0, file_offset_for_page, page_header)
+                    for freeblock_offset, freeblock in freeblocks:
+                        recovered_records.append((source_file, frame_number, page_number, page_label, owner_name, "Freeblock", freeblock_offset, freeblock))
+
+                except Exception as e:
+                    print(f" [-]  Error parsing index page {page_number}: {e}")
+            else:
+                print(f"[!] Processing Page {page_number}: {page_label} Page - Unallocated Space Only")
+                for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page):
+                    recovered_records.append((source_file, frame_number, page_number, page_label, "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
+
+        # Parse cells, freeblocks and Unallocated Space from Table Leaf Pages
+        elif page_type == TABLELEAF_PAGE_TYPE:
+            print(f"[+] Processing Page {page_number}: B-tree Table Leaf Page")
+
+            # Find the table name from the owner of the page in the role map
+            table_name = role_map.owner(page_number) if page_role == PAGE_ROLE_TABLE_BTREE else None
+
+            if table_name:
+                try:
+                    # The page header is decoded once and shared by the cell, unallocated and freeblock parsers
+                    page_header = parse_page_header(page_data)
+                    cells = mainparse_leaf_page(page_source, page_data, page_number, page_size, page_header=page_header)
+                    for cell in cells:
+                        cell_offset = file_offset_for_page + cell[0]
+                        records.append((source_file, frame_number, page_number, "Allocated", table_name, cell_offset, *cell[1:]))
+
+                    # Extract unallocated and freeblock data from the page
+                    for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, 0, file_offset_for_page, page_header):
+                        recovered_records.append((source_file, frame_number, page_number, "B-tree Table Leaf", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
+
+                    freeblocks = extract_printable_from_freeblock(page_data, page_number, 0, file_offset_for_page, page_header)
+                    for freeblock_offset, freeblock in freeblocks:
+                        recovered_records.append((source_file, frame_number, page_number, "B-tree Table Leaf", table_name, "Freeblock", freeblock_offset, freeblock))
+
+                except Exception as e:
+                    print(f" [-]  Error parsing leaf page {page_number}: {e}")
+
+        # Skipping unknown and overflow pages (Records with overflow are reconstructed for table and index cells)
+        elif page_type == 0:
+            if is_zero_page(page_data):
+                print(f"[!] Skipping Page {page_number}: Empty Page")
+            elif page_role == PAGE_ROLE_OVERFLOW:
+                print(f"[!] Skipping Page {page_number}: Overflow Page ({role_map.owner(page_number)})")
             else:
-                print(f"[!] Skipping Page {page_number} (Offset {file_offset_for_page}): Not a Table B-tree Page")
+                print(f"[!] Skipping Page {page_number}: Overflow Page")
+
+        # Skipping Page 1
+        elif page_type == MAINDBHEADER:
+            print(f"[!] Skipping Page {page_number}: Main Database File Header and Schema")
+
+        else:
+            print(f"[!] Skipping Page {page_number} (Offset {file_offset_for_page}): Not a Table B-tree Page")
 
     return records, recovered_records
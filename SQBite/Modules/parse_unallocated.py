@@ -1,52 +1,52 @@
 import struct
-import string
+from Modules.pageheader import parse_page_header, BTREE_PAGE_TYPES
+from Modules.printableruns import extract_printable_runs
 
-def extract_printable_from_unallocated(page_data, page_number, frame_number, file_offset_for_page):
+def extract_printable_from_unallocated(page_data, page_number, frame_number, file_offset_for_page, page_header=None):
     """
-    Extracts printable characters from unallocated space of B-tree pages.
-    Returns (printable_data, unallocated_offset)
+    Extracts printable runs from unallocated space of B-tree pages.
+    Returns a list of (file_offset, printable_run)
     """
     try:
         page_size = len(page_data)
         if page_size < 8:
-            return "", None
+            return []
 
         # Page header fields
-        page_type = page_data[0]
-        if page_type not in {2, 5, 10, 13}:  # Only B-tree pages
-            return "", None
+        if page_data[0] not in BTREE_PAGE_TYPES:  # Only B-tree pages
+            return []
 
-        cell_count = struct.unpack(">H", page_data[3:5])[0]
-        cell_content_offset = struct.unpack(">H", page_data[5:7])[0]
+        if page_header is None:
+            page_header = parse_page_header(page_data)
+        cell_count = page_header.cell_count
+        cell_content_offset = page_header.cell_content_start
 
-        # Calculate unallocated space boundaries
-        cell_pointers_end = 8 + cell_count * 2
+        # Calculate unallocated space boundaries (interior pages have a 12 byte header)
+        cell_pointers_end = page_header.header_size + cell_count * 2
         unallocated_start = cell_pointers_end
         unallocated_end = cell_content_offset if cell_content_offset > 0 else page_size
 
         if unallocated_start >= unallocated_end:
-            return "", None
-
-        unallocated_data = page_data[unallocated_start:unallocated_end]
-        printable_data = ''.join(ch for ch in unallocated_data.decode(errors="replace") if ch in string.printable)
+            return []
 
         # Calculate phyiscal offset 
         unallocated_offset = file_offset_for_page + unallocated_start
 
-        return printable_data, unallocated_offset
+        return extract_printable_runs(page_data[unallocated_start:unallocated_end], unallocated_offset)
 
     except Exception as e:
         print(f"[!] Error extracting from page {page_number} (frame {frame_number}): {e}")
-        return "", None
+        return []
         
 def extract_printable_from_freelisttrunk(page_data, page_number, frame_number, file_offset_for_page):
     """
-    Extracts printable characters from unallocated space of B-tree pages.
+    Extracts printable runs from the unused space of freelist trunk pages after the leaf page array.
+    Returns a list of (file_offset, printable_run)
     """
     try:
         page_size = len(page_data)
         if page_size < 8:
-            return "", None
+            return []
 
         # Calculate end of the freelist array
         num_entries = struct.unpack('>I', page_data[4:8])[0]
@@ -55,16 +55,13 @@ def extract_printable_from_freelisttrunk(page_data, page_number, frame_number, f
         unallocated_end = page_size
 
         if unallocated_start >= unallocated_end:
-            return "", None
-
-        unallocated_data = page_data[unallocated_start:unallocated_end]
-        printable_data = ''.join(ch for ch in unallocated_data.decode(errors="replace") if ch in string.printable)
+            return []
 
         # Calculate absolute offset
         unallocated_offset = file_offset_for_page + unallocated_start
 
-        return printable_data, unallocated_offset
+        return extract_printable_runs(page_data[unallocated_start:unallocated_end], unallocated_offset)
 
     except Exception as e:
         print(f" [!] Error extracting from page {page_number}: {e}")
-        return "", None
+        return []
@@ -1,14 +1,15 @@
-import struct
 import os
-import math
-from collections import defaultdict
-from Modules.findtable import parse_db_for_tables
-from Modules.btreeinteriorpage_processing import parse_interior_page
 from Modules.btreeleafpage_processing import walparse_leaf_page
-from Modules.parsewalheader import parse_wal_header
-from Modules.parsesqliteheader import parse_sqlite_header
+from Modules.btreeindexpage_processing import parse_index_page, index_record_row
+from Modules.pageheader import parse_page_header
+from Modules.walpagereader import WalPageReader
+from Modules.waltablemapping import WalTableMapper
+from Modules.pagesource import PageSource, is_zero_page
+from Modules.calculate_pointermappages import is_pointer_map_page
 from Modules.parse_unallocated import extract_printable_from_unallocated
 from Modules.parse_freeblocks import extract_printable_from_freeblock
+from Modules.printableruns import extract_printable_runs
+from Modules.waltransactions import FRAME_INVALID
 
 # Constants for page types
 TABLEINTERIOR_PAGE_TYPE = 5
@@ -17,124 +18,130 @@ INDEXINTERIOR_PAGE_TYPE = 2
 INDEXLEAF_PAGE_TYPE = 10
 MAINDBHEADER = 83
 
-def calculate_pointermappages(auto_vacuum, page_size, total_pages):
-    """ 
-    Calculates the page numbers for pointer map pages.
-    """
-    pointer_pages = []
-    
-    # Checks if auto_vacuum is enabled
-    if auto_vacuum > 0:
-        pointer_counter = 1
-        pointer_entries = math.floor(page_size / 5)
-        pointer_number = 0
-        while pointer_number <= total_pages:
-            pointer_number = ((pointer_entries * pointer_counter) + 2 + pointer_counter)
-            if pointer_number > total_pages:
-                break
-            pointer_pages.append(pointer_number)
-            pointer_counter += 1
-
-    return pointer_pages
-
-def parse_wal_file(wal_path, db_path):
+# Number of records collected before a batch is handed to the output writer
+RECORD_BATCH_SIZE = 5000
+
+def parse_wal_file(wal_path, db_path, schema_catalog, sidecar=None, shm_path=None, transaction_index=None):
     """
     Parses the SQLite WAL file and stores page number and offset for comparison.
+    Yields (records, recovered_records) batches in frame order.
+    With a sidecar index the WAL frame table is taken from it when present and stored in it otherwise.
+    With the WAL-index (-shm file) page to frame lookups are taken from its hash tables.
+    Frames failing the salt/checksum validation are only scanned for printable data. transaction_index is the
+    WalTransactionIndex of the WAL when it was already built; it is built by the page reader otherwise.
     """
     records = []
     recovered_records = []
-    wal_frames = [] 
 
-    # Parse information from the main database file header
-    with open(db_path, "rb") as db_file:
-        header = parse_sqlite_header(db_file)
-        auto_vacuum = header["auto_vacuum"]
-        page_size = header["page_size"]
-        total_pages = os.path.getsize(db_path) // page_size
-        pointer_pages = calculate_pointermappages(auto_vacuum, page_size, total_pages)
+    # Parse the WAL file and process frames (the WAL is opened and mapped once by the page reader)
+    # The main database stays open so WAL overflow chains can fall back to its pages
+    frame_columns = sidecar.frame_columns if sidecar is not None else None
+    with PageSource(db_path) as page_source, WalPageReader(wal_path, frame_columns=frame_columns, shm_path=shm_path, transaction_index=transaction_index) as wal_reader:
+        transaction_index = wal_reader.transaction_index
+        if sidecar is not None:
+            sidecar.frame_columns = wal_reader.frame_table.columns()
 
-        # Extract table page mappings before parsing WAL frames
-        all_table_pages = parse_db_for_tables(db_file, page_size)
+        # Parse information from the main database file header
+        auto_vacuum = page_source.header["auto_vacuum"]
 
-    # Parse the WAL file and process frames
-    with open(wal_path, "rb") as wal_file:
         print(f"\nProcessing {os.path.basename(wal_path)}...\n")
-        header = parse_wal_header(wal_file)
-        page_size = header["page_size"]
-
-        frame_number = 0
-        while True:
-            frame_header = wal_file.read(24)
-            if len(frame_header) < 24:
-                break
-            frame_number += 1
-
-            page_data = wal_file.read(page_size)
+        page_size = wal_reader.page_size
+        frame_table = wal_reader.frame_table
+        table_mapper = WalTableMapper(wal_reader, schema_catalog)
+        index_layouts = schema_catalog.index_record_layouts()
+
+        for frame_number in range(1, len(frame_table) + 1):
+            if len(records) + len(recovered_records) >= RECORD_BATCH_SIZE:
+                yield records, recovered_records
+                records = []
+                recovered_records = []
+
+            page_data = wal_reader.frame_page(frame_number)
             if not page_data:
                 continue
 
             # Extract page number and calculate file offset for the page
-            page_number = struct.unpack(">I", frame_header[0:4])[0]
-            file_offset_for_page = wal_file.tell() - page_size
+            page_number = frame_table.page_numbers[frame_number - 1]
+            file_offset_for_page = frame_table.page_offset(frame_number)
+
+            # Invalid frames are triaged: their page is not trusted enough to be parsed as a b-tree page
+            if transaction_index.frame_status(frame_number) == FRAME_INVALID:
+                print(f"[!] Triaging WAL Frame {frame_number} (Page {page_number}): Invalid Frame (Salt/Checksum Mismatch) - Printable Data Only")
+                for printable_offset, printable in extract_printable_runs(page_data, file_offset_for_page):
+                    recovered_records.append((os.path.basename(wal_path), frame_number, page_number, "Invalid WAL Frame", "Not Known", "Invalid Frame", printable_offset, printable))
+                continue
 
-            # Skip pointer map pages if auto-vacuum is enabled
-            if auto_vacuum > 0 and (page_number == 2 or page_number in pointer_pages):
-                print(f"[!] Skipping WAL Frame {frame_number} (Page {page_number}): Pointer Map Page")
+            # Pointer map pages only update the page ownership used for table assignment
+            if auto_vacuum > 0 and is_pointer_map_page(page_number, page_size):
+                print(f"[!] Processing WAL Frame {frame_number} (Page {page_number}): Pointer Map Page - Page Ownership Only")
+                table_mapper.add_pointer_map_frame(frame_number)
                 continue
 
             # Parse unallocated space from Table Interior pages
             if page_data[0] == TABLEINTERIOR_PAGE_TYPE:
-                wal_frames.append((page_number, file_offset_for_page))
                 print(f"[!] Processing WAL Frame {frame_number} (Page {page_number}): B-tree Table Interior Page - Unallocated Space Only")
-                unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, frame_number, file_offset_for_page)
-                if unallocated:
+                try:
+                    table_mapper.add_interior_frame(frame_number)
+                except Exception as e:
+                    print(f" [-] WAL Frame {frame_number}: Error parsing interior page {page_number}: {e}")
+                for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, frame_number, file_offset_for_page):
                     recovered_records.append((os.path.basename(wal_path), frame_number, page_number, "B-tree Table Interior", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
-            
-            # Parse unallocated space from Index Interior pages
-            elif page_data[0] == INDEXINTERIOR_PAGE_TYPE:
-                wal_frames.append((page_number, file_offset_for_page))
-                print(f"[!] Processing WAL Frame {frame_number} (Page {page_number}): B-tree Index Interior Page - Unallocated Space Only")
-                unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, frame_number, file_offset_for_page)
-                if unallocated:
-                   recovered_records.append((os.path.basename(wal_path), frame_number, page_number, "B-tree Table Interior", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
-
-            # Parse unallocated space from index leaf pages
-            elif page_data[0] == INDEXLEAF_PAGE_TYPE:
-                wal_frames.append((page_number, file_offset_for_page))
-                print(f"[!] Processing WAL Frame {frame_number} (Page {page_number}): B-tree Index Leaf Page - Unallocated Space Only")
-                unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, frame_number, file_offset_for_page)
-                if unallocated:
-                    recovered_records.append((os.path.basename(wal_path), frame_number, page_number, "Index Table Leaf", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
-
-            # Skipping unknown and overflow pages (Need to work on code to rebuild records with overflow pages in the wal)
+        
+            # Parse cells, freeblocks and Unallocated Space from Index Interior and Index Leaf pages
+            # (index b-trees and WITHOUT ROWID tables; interior index cells hold keys as well)
+            elif page_data[0] == INDEXINTERIOR_PAGE_TYPE or page_data[0] == INDEXLEAF_PAGE_TYPE:
+                page_label = "B-tree Index Interior" if page_data[0] == INDEXINTERIOR_PAGE_TYPE else "B-tree Index Leaf"
+                print(f"[+] Processing WAL Frame {frame_number} (Page {page_number}): {page_label} Page")
+
+                if page_data[0] == INDEXINTERIOR_PAGE_TYPE:
+                    try:
+                        table_mapper.add_interior_frame(frame_number)
+                    except Exception as e:
+                        print(f" [-] WAL Frame {frame_number}: Error parsing interior page {page_number}: {e}")
+
+                owner_name = table_mapper.resolve(page_number)
+                layout = index_layouts.get(owner_name)
+
+                page_header = parse_page_header(page_data)
+                page_view = wal_reader.page_view(frame_number, page_source)
+                for cell in parse_index_page(page_view, page_data, page_number, page_size, page_header):
+                    cell_offset = file_offset_for_page + cell[0]
+                    row_id, values = index_record_row(layout, cell[1:])
+                    records.append((os.path.basename(wal_path), frame_number, page_number, "Allocated", owner_name, cell_offset, row_id, *values))
+                for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, frame_number, file_offset_for_page, page_header):
+                    recovered_records.append((os.path.basename(wal_path), frame_number, page_number, page_label, "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
+
+                freeblocks = extract_printable_from_freeblock(page_data, page_number, frame_number, file_offset_for_page, page_header)
+                for freeblock_offset, freeblock in freeblocks:
+                    recovered_records.append((os.path.basename(wal_path), frame_number, page_number, page_label, owner_name, "Freeblock", freeblock_offset, freeblock))
+
+            # Skipping unknown and overflow pages (overflow pages are read when the records that own them are parsed)
             elif page_data[0] == 0:
-                wal_frames.append((page_number, file_offset_for_page))
 
-                if all(byte == 0 for byte in page_data):
+                if is_zero_page(page_data):
                     print(f"[!] Skipping WAL Frame {frame_number} (Page {page_number}): Unknown: Empty Page")
                     page_type = "Unknown: Empty Page"
                 else:
                     print(f"[!] Skipping WAL Frame {frame_number} (Page {page_number}): Overflow Page")
                     page_type = "Overflow Page"
-            
+        
             # Parse cells, freeblocks and Unallocated Space from Leaf Pages (This includes Freelist pages)
             elif page_data[0] == TABLELEAF_PAGE_TYPE:
                 print(f"[+] Processing WAL Frame {frame_number} (Page {page_number}): B-tree Table Leaf Page")
 
-                try:
-                    table_name, source = build_page_table_mapping(db_path, page_size, wal_path, wal_frames, target_page=page_number, all_table_pages=all_table_pages)
-                except ValueError:
-                    table_name, source = "Unknown", "Unknown"
+                table_name = table_mapper.resolve(page_number)
 
-                cells = walparse_leaf_page(wal_file, page_data, page_number, page_size)
+                # The page header is decoded once and shared by the cell, unallocated and freeblock parsers
+                page_header = parse_page_header(page_data)
+                page_view = wal_reader.page_view(frame_number, page_source)
+                cells = walparse_leaf_page(page_view, page_data, page_number, page_size, page_header=page_header)
                 for cell in cells:
                     cell_offset = file_offset_for_page + cell[0]
                     records.append((os.path.basename(wal_path), frame_number, page_number, "Allocated", table_name, cell_offset, *cell[1:]))
-                unallocated, unallocated_offset = extract_printable_from_unallocated(page_data, page_number, frame_number, file_offset_for_page)
-                if unallocated:
+                for unallocated_offset, unallocated in extract_printable_from_unallocated(page_data, page_number, frame_number, file_offset_for_page, page_header):
                     recovered_records.append((os.path.basename(wal_path), frame_number, page_number, "B-tree Table Leaf", "Not Known", "Page Unallocated Space", unallocated_offset, unallocated))
-                    
-                freeblocks = extract_printable_from_freeblock(page_data, page_number, frame_number, file_offset_for_page)
+                
+                freeblocks = extract_printable_from_freeblock(page_data, page_number, frame_number, file_offset_for_page, page_header)
                 for freeblock_offset, freeblock in freeblocks:
                     recovered_records.append((os.path.basename(db_path), frame_number, page_number, "B-tree Table Leaf", table_name, "Freeblock", freeblock_offset, freeblock))
 			
@@ -145,72 +152,5 @@ def parse_wal_file(wal_path, db_path):
             else:
                 print(f"[!] Skipping WAL Frame {frame_number} (Page {page_number}) (File Offset {file_offset_for_page}): Not a Table B-tree Page")
 
-    return records, recovered_records
-
-
-def build_page_table_mapping(db_path, page_size, wal_path, wal_frames, target_page, frame_number=None, all_table_pages=None):
-    """
-    Identifies the table name for a page by working backward through Interior pages in the WAL. 
-    If not found in WAL, it processes pages in the MainDB.
-    """
-    wal_frame_data = defaultdict(list)
-    for frame in wal_frames:
-        wal_frame_data[frame[0]].append(frame[1])
-
-    def read_page(page_number, is_wal=True):
-        """Reads a page from the WAL or DB based on the flag."""
-        if is_wal:
-            return read_walpage(page_number)
-        else:
-            return read_dbpage(page_number)
-
-    def read_walpage(page_number):
-        """Reads a page from the WAL file."""
-        with open(wal_path, "rb") as wal_file:
-            page_offset = (int(page_number) - 1) * page_size 
-            wal_file.seek(page_offset)
-            return wal_file.read(page_size)
-
-    def read_dbpage(page_number):
-        """Reads a page from the main database file."""
-        page_number = int(page_number)
-        page_offset = (page_number - 1) * page_size
-        with open(db_path, "rb") as db_file:
-            db_file.seek(0, os.SEEK_END)
-            db_file_size = db_file.tell()
-            if page_offset >= db_file_size or page_offset < 0:
-                raise ValueError(f" [-] Invalid page offset for page number {page_number}.")
-            db_file.seek(page_offset)
-            return db_file.read(page_size)
-
-    # Check if target page exists in the precomputed table pages list
-    for table in all_table_pages:
-        if target_page in table["pages"]:
-            return table["table_name"], "WAL"
-
-    # Backward traversal through WAL frames (if the page wasn't found in the root pages)
-    already_checked_pages = set()
-    index = len(wal_frames) - 1
-
-    while target_page not in all_table_pages and index >= 0:
-        page_number, offset = wal_frames[index]
-        index -= 1
-
-        if page_number in already_checked_pages:
-            continue
-        already_checked_pages.add(page_number)
-
-        page_data = read_page(page_number, is_wal=True)
-        if not page_data:
-            continue
-
-        page_type = page_data[0]
-
-        if page_type == TABLEINTERIOR_PAGE_TYPE:
-            child_pages = parse_interior_page(page_data, page_size)
-            if target_page in child_pages:
-                target_page = page_number
-                already_checked_pages.clear()
-                continue
-
-    return "Unknown", "Unknown"  # If no match is found
+    if records or recovered_records:
+        yield records, recovered_records
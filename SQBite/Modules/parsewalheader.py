@@ -1,5 +1,8 @@
 import struct
 
+WAL_MAGIC_LITTLE_ENDIAN = 0x377F0682
+WAL_MAGIC_BIG_ENDIAN = 0x377F0683
+
 def parse_wal_header(wal_file):
     """
     Parses the WAL header
@@ -8,13 +11,21 @@ def parse_wal_header(wal_file):
     if len(header) < 32:
         raise ValueError("[-] Error: File too small to be a valid WAL file.")
 
-    magic, format_version, page_size, checkpoint, salt1, salt2, checksum1, checksum2 = struct.unpack(
-        '>4s7i', header
+    magic_number, format_version, page_size, checkpoint, salt1, salt2, checksum1, checksum2 = struct.unpack(
+        '>8I', header
     )
 
-    magic_number = struct.unpack(">I", magic)[0]
-    if magic_number not in {0x377F0682, 0x377F0683}:  # Valid SQLite WAL magic numbers
+    if magic_number not in {WAL_MAGIC_LITTLE_ENDIAN, WAL_MAGIC_BIG_ENDIAN}:  # Valid SQLite WAL magic numbers
         raise ValueError(f"[-] Error: Invalid WAL file signature: {magic_number:#x}")
 
-    return {"page_size": page_size}
-
+    return {
+        "page_size": page_size,
+        "format_version": format_version,
+        "checkpoint_sequence": checkpoint,
+        "salt1": salt1,
+        "salt2": salt2,
+        "checksum1": checksum1,
+        "checksum2": checksum2,
+        # Frame checksums are computed on big-endian words for the big-endian magic number
+        "big_endian_checksum": magic_number == WAL_MAGIC_BIG_ENDIAN,
+    }
@@ -0,0 +1,133 @@
+import struct
+from array import array
+from Modules.calculate_pointermappages import calculate_pointer_pages
+
+# Pointer map entry types
+PTRMAP_ROOTPAGE = 1   # Root page of a b-tree (parent is 0)
+PTRMAP_FREEPAGE = 2   # Freelist page (parent is 0)
+PTRMAP_OVERFLOW1 = 3  # First page of an overflow chain (parent is the b-tree page holding the cell)
+PTRMAP_OVERFLOW2 = 4  # Later page of an overflow chain (parent is the previous overflow page)
+PTRMAP_BTREE = 5      # Non-root b-tree page (parent is the parent b-tree page)
+
+PTRMAP_ENTRY_SIZE = 5
+_ENTRY_STRUCT = struct.Struct(">BI")
+
+# Page types read to split b-tree pages into interior and leaf pages
+TABLEINTERIOR_PAGE_TYPE = 5
+TABLELEAF_PAGE_TYPE = 13
+INDEXINTERIOR_PAGE_TYPE = 2
+INDEXLEAF_PAGE_TYPE = 10
+
+def decode_pointer_map_page(page_data, pointer_map_page, page_size):
+    """
+    Decodes a pointer map page. Returns a list of (page_number, entry_type, parent_page) for the used entries.
+    The entries describe the page_size // 5 pages that follow the pointer map page.
+    """
+    entry_count = min(page_size // PTRMAP_ENTRY_SIZE, len(page_data) // PTRMAP_ENTRY_SIZE)
+    entries = []
+    for index, (entry_type, parent_page) in enumerate(_ENTRY_STRUCT.iter_unpack(page_data[:entry_count * PTRMAP_ENTRY_SIZE])):
+        if entry_type:
+            entries.append((pointer_map_page + 1 + index, entry_type, parent_page))
+    return entries
+
+class PointerMap:
+    """
+    Pointer map of an auto_vacuum database: the entry type and parent page of every page, indexed by page number.
+    Resolving the root page of any b-tree or overflow page is a walk up the parent pages, memoized per page.
+    """
+
+    def __init__(self, total_pages):
+        self.total_pages = total_pages
+        self.types = bytearray(total_pages + 1)
+        self.parents = array("I", bytes(4 * (total_pages + 1)))
+        self._roots = {}
+        self._pages_by_root = None
+
+    def add_entries(self, entries):
+        for page_number, entry_type, parent_page in entries:
+            if 1 <= page_number <= self.total_pages:
+                self.types[page_number] = entry_type
+                self.parents[page_number] = parent_page
+        self._roots.clear()
+        self._pages_by_root = None
+
+    def entry(self, page_number):
+        """
+        Returns (entry_type, parent_page) for a page, or (0, 0) if the page has no entry.
+        """
+        if 1 <= page_number <= self.total_pages:
+            return self.types[page_number], self.parents[page_number]
+        return 0, 0
+
+    def root_page(self, page_number):
+        """
+        Returns the root page of the b-tree a b-tree or overflow page belongs to, or None.
+        """
+        path = []
+        seen_pages = set()
+        current_page = page_number
+        root_page = None
+        while True:
+            if current_page in self._roots:
+                root_page = self._roots[current_page]
+                break
+            entry_type, parent_page = self.entry(current_page)
+            if entry_type == PTRMAP_ROOTPAGE:
+                root_page = current_page
+                path.append(current_page)
+                break
+            if entry_type not in (PTRMAP_BTREE, PTRMAP_OVERFLOW1, PTRMAP_OVERFLOW2) or current_page in seen_pages:
+                break
+            seen_pages.add(current_page)
+            path.append(current_page)
+            current_page = parent_page
+
+        for path_page in path:
+            self._roots[path_page] = root_page
+        return root_page
+
+    def btree_pages(self, root_page):
+        """
+        Returns every b-tree page (root and non-root, no overflow pages) whose root is root_page.
+        """
+        if self._pages_by_root is None:
+            self._pages_by_root = {}
+            for page_number, entry_type in enumerate(self.types):
+                if entry_type == PTRMAP_ROOTPAGE or entry_type == PTRMAP_BTREE:
+                    self._pages_by_root.setdefault(self.root_page(page_number), []).append(page_number)
+        return self._pages_by_root.get(root_page, [])
+
+    def btree_leaf_pages(self, page_source, root_page, parent_map=None):
+        """
+        Returns the leaf pages of a table or index b-tree using the pointer map instead of walking the b-tree.
+        If parent_map is given, it is filled with child page -> parent interior page entries.
+        """
+        leaf_pages = []
+        for page_number in self.btree_pages(root_page):
+            page_data = page_source.page(page_number)
+            if not page_data:
+                continue
+            page_type = page_data[0]
+            if page_type == TABLELEAF_PAGE_TYPE or page_type == INDEXLEAF_PAGE_TYPE:
+                leaf_pages.append(page_number)
+            elif page_type != TABLEINTERIOR_PAGE_TYPE and page_type != INDEXINTERIOR_PAGE_TYPE:
+                continue
+            if parent_map is not None and page_number != root_page:
+                parent_map[page_number] = self.parents[page_number]
+        return leaf_pages
+
+def parse_pointer_map(page_source):
+    """
+    Parses every pointer map page of the Main Database file. Returns None if auto_vacuum is not enabled.
+    """
+    header = page_source.header
+    if header["auto_vacuum"] == 0:
+        return None
+
+    page_size = page_source.page_size
+    pointer_map = PointerMap(page_source.total_pages)
+    pointer_map_pages = [2] + calculate_pointer_pages(header["auto_vacuum"], page_size, page_source.total_pages)
+    for pointer_map_page in pointer_map_pages:
+        if page_source.is_valid_page(pointer_map_page):
+            pointer_map.add_entries(decode_pointer_map_page(page_source.page(pointer_map_page), pointer_map_page, page_size))
+    return pointer_map
@@ -0,0 +1,25 @@
+import re
+
+# Shortest run of printable bytes reported as recovered data
+PRINTABLE_MIN_RUN = 4
+
+# The bytes of string.printable (ASCII letters, digits, punctuation and whitespace)
+_PRINTABLE_CLASS = rb"[\x20-\x7e\t\n\r\x0b\x0c]"
+
+_PRINTABLE_PATTERNS = {}
+
+def _printable_pattern(min_run):
+    pattern = _PRINTABLE_PATTERNS.get(min_run)
+    if pattern is None:
+        pattern = _PRINTABLE_PATTERNS[min_run] = re.compile(_PRINTABLE_CLASS + b"{%d,}" % min_run)
+    return pattern
+
+def extract_printable_runs(data, base_offset, min_run=PRINTABLE_MIN_RUN):
+    """
+    Scans raw bytes with a compiled bytes regex and returns a list of (offset, text) for every run of
+    at least min_run printable bytes. base_offset is the physical offset of data[0].
+    """
+    return [
+        (base_offset + match.start(), match.group().decode("ascii"))
+        for match in _printable_pattern(min_run).finditer(data)
+    ]
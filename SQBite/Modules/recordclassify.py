@@ -1,150 +1,154 @@
 import sqlite3
+from Modules.output_sqlite import output_table_name
+from Modules.waltransactions import FRAME_STATUS_LABELS, FRAME_VALID_CURRENT
 
-def classify_records(output_file):    
-	
-    conn = sqlite3.connect(output_file)
-    cursor = conn.cursor()
-	
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
-    tables = cursor.fetchall()
+# Tables without the SQBite record layout (or without a schema to compare records against)
+SKIPPED_TABLES = ["unknown", "freelist", "recovered_records", "wal_frames"]
 
-    print(f"\n[+] Classifying Records")
+# Columns every classified table needs
+REQUIRED_COLUMNS = {"record_id", "frame_number", "page_number", "record_status", "row_id"}
 
-    highest_frame_numbers = {}
+# Number of SQBite columns before the record columns (Record_ID ... Row_ID)
+RECORD_COLUMNS_START = 8
 
-    for table in tables:
-        table_name = table[0]
+def _value_expression(alias, column):
+    """
+    Returns the SQL expression a record column is compared with ("N/A" counts as 0, like the frame number).
+    """
+    return f"""(CASE WHEN {alias}."{column}" = 'N/A' THEN 0 ELSE {alias}."{column}" END)"""
 
-        if table_name.lower() in ["unknown", "freelist", "recovered_records"]:
-            continue
+def _frame_expression(column):
+    return f"(CASE WHEN {column} = 'N/A' THEN 0 ELSE CAST({column} AS INTEGER) END)"
 
-        cursor.execute(f"PRAGMA table_info('{table_name}')")
-        columns = [col[1].lower() for col in cursor.fetchall()] 
+def classify_records(output_file, record_keys=None):
+    """
+    Classifies the Record_Status of every record with a few set-based statements per table:
 
-        if "frame_number" not in columns or "page_number" not in columns:
-            print(f"[-] Table '{table_name}' does not have required columns (frame_number, page_number). Skipping.")
-            continue
-
-        cursor.execute(f"SELECT page_number, frame_number FROM {table_name}")
-        records = cursor.fetchall()
+    - The highest frame of every page (Main Database records count as frame 0) is taken across all tables.
+      When the WAL_Frames table exists only committed frames of the current WAL generation count.
+    - Records on the highest frame of their page are Active.
+    - Other records are matched by their key against the first Active record (lowest Record_ID) of the same page
+      and table: no match is Deleted, an equal payload is Duplicate (Active), otherwise Modified/Reused ID.
 
-        for page_number, frame_number in records:
-            frame_number = 0 if frame_number == "N/A" else int(frame_number)
+    record_keys maps table and index names to the columns that identify a record (see SchemaCatalog.record_keys),
+    e.g. the PRIMARY KEY of WITHOUT ROWID tables, whose Row_ID is NULL. Other tables are keyed by Row_ID.
+    """
+    output_keys = {output_table_name(name): key_columns for name, key_columns in (record_keys or {}).items()}
 
-            if page_number not in highest_frame_numbers:
-                highest_frame_numbers[page_number] = frame_number
-            else:
-                highest_frame_numbers[page_number] = max(highest_frame_numbers[page_number], frame_number)
-                
-    for table in tables:
-        table_name = table[0]
-
-        if table_name.lower() in ["unknown", "freelist", "recovered_records"]:
-            continue
-
-        cursor.execute(f"PRAGMA table_info('{table_name}')")
-        columns = [col[1].lower() for col in cursor.fetchall()] 
+    conn = sqlite3.connect(output_file)
+    cursor = conn.cursor()
 
-        if "record_status" not in columns or "frame_number" not in columns or "page_number" not in columns:
-            continue
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'")
+    table_names = [row[0] for row in cursor.fetchall()]
 
-        for page_number, highest_frame in highest_frame_numbers.items():
-            if highest_frame == 0:
-                cursor.execute(f"""
-                    SELECT record_id, frame_number FROM {table_name}
-                    WHERE page_number = ? AND frame_number = 'N/A'
-                """, (page_number,))
-            else:
-                cursor.execute(f"""
-                    SELECT record_id, frame_number FROM {table_name}
-                    WHERE page_number = ? AND frame_number = ?
-                """, (page_number, highest_frame))
-
-            rows_to_update = cursor.fetchall()
-
-            #print(f"[+] Found {len(rows_to_update)} records for page_number {page_number} with frame_number {highest_frame}")
-
-            for row in rows_to_update:
-                record_id = row[0]
-                #print(f'Updating record_id: {record_id} with record_status = Active')
-                cursor.execute(f"""
-                    UPDATE {table_name} SET record_status = ? WHERE record_id = ?
-                """, ("Active", record_id))
-    conn.commit()
-                
-    # Classify Records 
-    for table in tables:
-        table_name = table[0]
+    print(f"\n[+] Classifying Records")
 
-        if table_name.lower() in ["unknown", "freelist", "recovered_records"]:
+    # Only frames of committed transactions of the current WAL generation can hold the Active copy of a page
+    frame_filter = ""
+    if "WAL_Frames" in table_names:
+        excluded_frame_count = cursor.execute(
+            'SELECT COUNT(*) FROM "WAL_Frames" WHERE "Frame_Status" != ?', (FRAME_STATUS_LABELS[FRAME_VALID_CURRENT],)
+        ).fetchone()[0]
+        frame_filter = f""" AND "Frame_Number" NOT IN (SELECT "Frame_Number" FROM "WAL_Frames" WHERE "Frame_Status" != '{FRAME_STATUS_LABELS[FRAME_VALID_CURRENT]}')"""
+        print(f"[+] Using WAL Transaction Boundaries: {excluded_frame_count} frames outside the committed transactions of the current WAL generation")
+
+    # Record and key columns of every table that has the SQBite record layout (one PRAGMA per table)
+    tables = {}
+    for table_name in table_names:
+        if table_name.lower() in SKIPPED_TABLES:
             continue
 
-        cursor.execute(f"PRAGMA table_info('{table_name}')")
-        columns = [col[1].lower() for col in cursor.fetchall()] 
-
-        if "record_status" not in columns or "frame_number" not in columns or "page_number" not in columns:
+        columns = [col[1] for col in cursor.execute(f'PRAGMA table_info("{table_name}")').fetchall()]
+        if not REQUIRED_COLUMNS.issubset(column.lower() for column in columns):
+            print(f"[-] Table '{table_name}' does not have required columns (record_id, frame_number, page_number, record_status, row_id). Skipping.")
             continue
-
-        for page_number, highest_frame in highest_frame_numbers.items():
-            cursor.execute(f"""
-                SELECT * FROM {table_name}
-                WHERE page_number = ? AND frame_number = ?
-            """, (page_number, highest_frame))
-
-            highest_frame_records = cursor.fetchall() 
-
-            cursor.execute(f"""
-                SELECT * FROM {table_name}
-                WHERE page_number = ? AND frame_number != ? AND record_status != 'Active'
-            """, (page_number, highest_frame))
-
-            non_highest_frame_records = cursor.fetchall()
-
-            for non_highest in non_highest_frame_records:
-                non_highest_record_id = non_highest[0]
-                non_highest_row_id = non_highest[7]  
-                non_highest_data = non_highest[8:]  
-
-                corresponding_highest = next((rec for rec in highest_frame_records if rec[7] == non_highest_row_id), None)
-                if not corresponding_highest:
-                    cursor.execute(f"""
-                        UPDATE {table_name} SET record_status = ? WHERE record_id = ?
-                    """, ("Deleted", non_highest_record_id))
-
-                    #print(f"Updated record_id {non_highest_record_id} to 'Deleted' due to missing highest frame.")
-
-                    continue
-
-                highest_record_data = corresponding_highest[8:] 
-
-                differences = {}
-                for i, (non_highest_val, highest_val) in enumerate(zip(non_highest_data, highest_record_data)):
-                    column_name = columns[i + 8] 
-
-                    if non_highest_val == "N/A":
-                        non_highest_val = 0
-                    if highest_val == "N/A":
-                        highest_val = 0
-
-                    #print(f"Comparing column '{column_name}': {non_highest_val} vs {highest_val}")
-
-                    if non_highest_val != highest_val:
-                        differences[column_name] = (non_highest_val, highest_val)
-
-                if differences:
-                    cursor.execute(f"""
-                        UPDATE {table_name} SET record_status = ? WHERE record_id = ?
-                    """, ("Modified/Reused ID", non_highest_record_id)) 
-
-                    #print(f"Updated record_id {non_highest_record_id} to 'Modified/Reused ID' due to differences.")
-
-                else:
-                    cursor.execute(f"""
-                        UPDATE {table_name} SET record_status = ? WHERE record_id = ?
-                    """, ("Duplicate (Active)", non_highest_record_id))
-
-                    #print(f"Updated record_id {non_highest_record_id} to 'Duplicate (Active)' (no differences).")
+        key_columns = output_keys.get(table_name)
+        if not key_columns or not {column.lower() for column in key_columns}.issubset(column.lower() for column in columns):
+            key_columns = ["Row_ID"]
+        tables[table_name] = (columns[RECORD_COLUMNS_START:], key_columns)
+
+    if not tables:
+        conn.close()
+        print("[+] Record Classification Successfully Completed")
+        return
+
+    # Temporary indexes for the page / frame / key lookups, dropped once classification is done
+    for table_name, (_, key_columns) in tables.items():
+        index_columns = ", ".join(f'"{column}"' for column in ["Page_Number", "Frame_Number"] + key_columns)
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS "{table_name}_sqbite_classify" ON "{table_name}" ({index_columns})')
+
+    # Highest frame of every page across all tables
+    highest_frames = " UNION ALL ".join(
+        f'SELECT "Page_Number" AS page_number, {_frame_expression(chr(34) + "Frame_Number" + chr(34))} AS frame_number FROM "{table_name}" WHERE 1{frame_filter}'
+        for table_name in tables
+    )
+    cursor.execute("DROP TABLE IF EXISTS temp.page_highest_frames")
+    cursor.execute("CREATE TEMP TABLE page_highest_frames (page_number PRIMARY KEY, highest_frame INTEGER)")
+    cursor.execute(f"INSERT INTO temp.page_highest_frames SELECT page_number, MAX(frame_number) FROM ({highest_frames}) GROUP BY page_number")
+
+    # Records on the highest frame of their page (frame 0 is the Main Database file, stored as 'N/A')
+    for table_name in tables:
+        cursor.execute(f"""
+            UPDATE "{table_name}" SET "Record_Status" = 'Active'
+            WHERE "Record_ID" IN (
+                SELECT r."Record_ID" FROM "{table_name}" r
+                JOIN temp.page_highest_frames h ON r."Page_Number" = h.page_number
+                WHERE (h.highest_frame = 0 AND r."Frame_Number" = 'N/A')
+                   OR (h.highest_frame != 0 AND r."Frame_Number" = h.highest_frame)
+            )
+        """)
+
+    # Classify the other records against the first Active record with the same key on the page
+    for table_name, (record_columns, key_columns) in tables.items():
+        # The payload is compared column by column with the first Active record, looked up again by its Record_ID
+        payload_match = " AND ".join(
+            f"{_value_expression('a', column)} IS {_value_expression('r', column)}" for column in record_columns
+        ) or "1"
+        record_key = ", ".join(f'r."{column}"' for column in key_columns)
+        key_names = ", ".join(f"key_{i}" for i in range(len(key_columns)))
+        key_select = ", ".join(f'r."{column}" AS key_{i}' for i, column in enumerate(key_columns))
+        key_match = " AND ".join(f'm.key_{i} IS r."{column}"' for i, column in enumerate(key_columns))
+
+        cursor.execute("DROP TABLE IF EXISTS temp.highest_records")
+        cursor.execute(f"""
+            CREATE TEMP TABLE highest_records AS
+            SELECT page_number, {key_names}, record_id FROM (
+                SELECT r."Page_Number" AS page_number, {key_select}, r."Record_ID" AS record_id,
+                       ROW_NUMBER() OVER (PARTITION BY r."Page_Number", {record_key} ORDER BY r."Record_ID") AS match_order
+                FROM "{table_name}" r
+                JOIN temp.page_highest_frames h ON r."Page_Number" = h.page_number
+                WHERE r."Frame_Number" = h.highest_frame
+            ) WHERE match_order = 1
+        """)
+        cursor.execute(f"CREATE INDEX temp.highest_records_lookup ON highest_records (page_number, {key_names})")
+
+        cursor.execute("DROP TABLE IF EXISTS temp.record_classes")
+        cursor.execute("CREATE TEMP TABLE record_classes (record_id INTEGER PRIMARY KEY, record_status TEXT)")
+        cursor.execute(f"""
+            INSERT INTO temp.record_classes
+            SELECT r."Record_ID",
+                   CASE WHEN m.page_number IS NULL THEN 'Deleted'
+                        WHEN {payload_match} THEN 'Duplicate (Active)'
+                        ELSE 'Modified/Reused ID' END
+            FROM "{table_name}" r
+            JOIN temp.page_highest_frames h ON r."Page_Number" = h.page_number
+            LEFT JOIN temp.highest_records m ON m.page_number = r."Page_Number" AND {key_match}
+            LEFT JOIN "{table_name}" a ON a."Record_ID" = m.record_id
+            WHERE r."Frame_Number" != h.highest_frame AND r."Record_Status" != 'Active'
+        """)
+        cursor.execute(f"""
+            UPDATE "{table_name}" SET "Record_Status" = (
+                SELECT c.record_status FROM temp.record_classes c WHERE c.record_id = "{table_name}"."Record_ID"
+            )
+            WHERE "Record_ID" IN (SELECT record_id FROM temp.record_classes)
+        """)
+
+    for table_name in tables:
+        cursor.execute(f'DROP INDEX IF EXISTS "{table_name}_sqbite_classify"')
+    cursor.execute("DROP TABLE IF EXISTS temp.page_highest_frames")
+    cursor.execute("DROP TABLE IF EXISTS temp.highest_records")
+    cursor.execute("DROP TABLE IF EXISTS temp.record_classes")
 
     conn.commit()
     conn.close()
-    print("[+] Record Classification Successfully Completed")
\ No newline at end of file
+    print("[+] Record Classification Successfully Completed")
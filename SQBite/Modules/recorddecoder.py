@@ -0,0 +1,139 @@
+import struct
+from functools import lru_cache
+
+# Fixed width serial types: serial type -> (content size, struct or None)
+# Types 3 and 5 are 24-bit and 48-bit signed integers which struct cannot express directly.
+FIXED_SERIAL_TYPES = {
+    0: (0, None),                 # NULL
+    1: (1, struct.Struct(">b")),  # INTEGER 8-bit
+    2: (2, struct.Struct(">h")),  # INTEGER 16-bit
+    3: (3, None),                 # INTEGER 24-bit
+    4: (4, struct.Struct(">i")),  # INTEGER 32-bit
+    5: (6, None),                 # INTEGER 48-bit
+    6: (8, struct.Struct(">q")),  # INTEGER 64-bit
+    7: (8, struct.Struct(">d")),  # FLOAT
+    8: (0, None),                 # Integer 0
+    9: (0, None),                 # Integer 1
+}
+
+# Serial types that a whole-record struct can decode (zero width types are filled in afterwards)
+_STRUCT_CODES = {1: "b", 2: "h", 4: "i", 6: "q", 7: "d"}
+_CONSTANT_VALUES = {0: None, 8: 0, 9: 1}
+
+@lru_cache(maxsize=None)
+def overflow_thresholds(page_size, index_page=False):
+    """
+    Returns (X, M, U - 4) for a page size: the maximum payload kept on the page, the minimum
+    payload kept on the page when a record overflows, and the usable bytes of each overflow page.
+    """
+    U = page_size
+    if index_page:
+        X = ((U - 12) * 64 // 255) - 23
+    else:
+        X = U - 35
+    M = ((U - 12) * 32 // 255) - 23
+    return X, M, U - 4
+
+def local_payload_size(payload_length, page_size, index_page=False):
+    """
+    Returns the number of payload bytes stored on the b-tree page for a payload of payload_length.
+    """
+    X, M, overflow_usable = overflow_thresholds(page_size, index_page)
+    if payload_length <= X:
+        return payload_length
+    K = M + ((payload_length - M) % overflow_usable)
+    return K if K <= X else M
+
+def decode_text(raw):
+    """
+    Decodes a TEXT value as UTF-8, removing byte order marks. Invalid UTF-8 is kept as raw bytes.
+    """
+    try:
+        return str(raw, "utf-8-sig").replace("\ufeff", "").replace("ï»¿", "")
+    except UnicodeDecodeError:
+        return bytes(raw)
+
+def decode_column_value(col_type, data, offset):
+    """
+    Decodes a single column value based on the SQLite serial type.
+    """
+    if col_type >= 12:
+        if col_type & 1:  # Text
+            text_length = (col_type - 13) // 2
+            return decode_text(data[offset:offset + text_length]), text_length
+        blob_length = (col_type - 12) // 2  # BLOB
+        return bytes(data[offset:offset + blob_length]), blob_length
+
+    fixed = FIXED_SERIAL_TYPES.get(col_type)
+    if fixed is None:
+        raise ValueError(f"Unsupported column type: {col_type}")
+
+    size, unpacker = fixed
+    if unpacker is not None:
+        return unpacker.unpack_from(data, offset)[0], size
+    if size == 0:
+        return _CONSTANT_VALUES[col_type], 0
+
+    value_bytes = data[offset:offset + size]
+    if len(value_bytes) < size:
+        raise ValueError(f"Not enough data for column type {col_type}")
+    return int.from_bytes(value_bytes, "big", signed=True), size
+
+@lru_cache(maxsize=4096)
+def _fixed_record_plan(column_types):
+    """
+    Builds a single struct for a record header made only of struct-decodable and zero width types.
+    Returns (struct, constants) where constants lists (column index, value) for the zero width columns,
+    or None if the header needs the general decoder.
+    """
+    codes = []
+    constants = []
+    for index, col_type in enumerate(column_types):
+        code = _STRUCT_CODES.get(col_type)
+        if code is not None:
+            codes.append(code)
+        elif col_type in _CONSTANT_VALUES:
+            constants.append((index, _CONSTANT_VALUES[col_type]))
+        else:
+            return None
+    return struct.Struct(">" + "".join(codes)), tuple(constants)
+
+def decode_record(column_types, data, offset):
+    """
+    Decodes every column of a record body that starts at offset.
+    Record headers made only of fixed width types are decoded with one precompiled struct.
+    """
+    plan = _fixed_record_plan(tuple(column_types))
+    if plan is not None:
+        record_struct, constants = plan
+        columns = list(record_struct.unpack_from(data, offset))
+        for index, value in constants:
+            columns.insert(index, value)
+        return columns
+
+    columns = []
+    for col_type in column_types:
+        column_value, col_length = decode_column_value(col_type, data, offset)
+        columns.append(column_value)
+        offset += col_length
+    return columns
+
+def decode_available_columns(column_types, data, offset):
+    """
+    Decodes the columns of a record body that ends early (an incomplete overflow chain), stopping at the end of data.
+    A TEXT or BLOB value cut off by the end of data is kept truncated; the columns after it are dropped.
+    """
+    columns = []
+    for col_type in column_types:
+        size = (col_type - 12) // 2 if col_type >= 12 else FIXED_SERIAL_TYPES.get(col_type, (0, None))[0]
+        if size and offset >= len(data):
+            break
+        try:
+            column_value, col_length = decode_column_value(col_type, data, offset)
+        except (ValueError, struct.error):
+            break
+        columns.append(column_value)
+        offset += col_length
+        if offset > len(data):
+            break
+    return columns
@@ -0,0 +1,255 @@
+import re
+import struct
+from Modules.btreeleafpage_processing import mainparse_leaf_page
+from Modules.extracttabledefinitions import extract_columns_and_types_from_sql, extract_primary_key_columns, extract_index_columns, extract_autoindex_columns
+from Modules.findtable import BtreeWalker, traverse_table_btree
+
+# Constants for page types
+TABLEINTERIOR_PAGE_TYPE = 5
+TABLELEAF_PAGE_TYPE = 13
+
+WITHOUT_ROWID_PATTERN = re.compile(r"\)\s*WITHOUT\s+ROWID\s*;?\s*$", re.I)
+AUTOINDEX_PREFIX = "sqlite_autoindex_"
+
+def schema_text(value):
+    """
+    Returns a sqlite_master text value as a string.
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    if value is None:
+        return ""
+    return str(value)
+
+class SchemaCatalog:
+    """
+    The database schema parsed once from sqlite_master and shared by every stage of a run.
+
+    tables  - list of {"name", "root_page", "sql", "columns", "without_rowid", "primary_key", "pages", "interior_pages"}
+              "columns" is the list of (name, type) from the CREATE TABLE statement, or None when the
+              statement could not be used to rebuild the table (e.g. virtual tables).
+              "primary_key" is the list of PRIMARY KEY column names.
+              "pages" are the leaf pages, "interior_pages" the interior pages (index pages for WITHOUT ROWID tables).
+    indexes - list of {"name", "table_name", "root_page", "sql", "columns", "pages", "interior_pages"}
+              "columns" is the list of (name, type) of the indexed columns, or None when they are not known.
+              Indexes created automatically for UNIQUE and PRIMARY KEY constraints have no SQL; their columns
+              are taken from the constraints of the table definition.
+    parent_map - child page -> parent interior page for every table and index b-tree
+    pointer_map - the parsed PointerMap for auto_vacuum databases, otherwise None
+    """
+
+    def __init__(self, tables, indexes, parent_map, pointer_map=None):
+        self.tables = tables
+        self.indexes = indexes
+        self.parent_map = parent_map
+        self.pointer_map = pointer_map
+
+    def root_tables(self):
+        """
+        Returns root page -> table name for every table with a b-tree.
+        """
+        return {table["root_page"]: table["name"] for table in self.tables if table["root_page"]}
+
+    def root_owners(self):
+        """
+        Returns root page -> table or index name for every table and index b-tree.
+        """
+        root_owners = {index["root_page"]: index["name"] for index in self.indexes if index["root_page"]}
+        root_owners.update(self.root_tables())
+        return root_owners
+
+    def table_definitions(self):
+        """
+        Returns the tables that can be rebuilt in the output database as {"name", "columns"}.
+        Indexes with known columns are included so their keys are written to a table named after the index.
+        """
+        definitions = [
+            {"name": table["name"].strip(), "columns": table["columns"]}
+            for table in self.tables if table["columns"] is not None
+        ]
+        definitions.extend(
+            {"name": index["name"].strip(), "columns": index["columns"]}
+            for index in self.indexes if index["columns"] is not None
+        )
+        return definitions
+
+    def record_keys(self):
+        """
+        Returns owner name -> the columns that identify a record, for the b-trees whose records have no rowid:
+        WITHOUT ROWID tables and the indexes on them are keyed by the table's PRIMARY KEY columns.
+        Records of every other table and index are identified by their Row_ID.
+        """
+        tables = {table["name"]: table for table in self.tables}
+        keys = {}
+        for table in self.tables:
+            if table["without_rowid"] and table["primary_key"]:
+                keys[table["name"]] = list(table["primary_key"])
+        for index in self.indexes:
+            table = tables.get(index["table_name"])
+            if index["columns"] is not None and table is not None and table["without_rowid"] and table["primary_key"]:
+                keys[index["name"]] = list(table["primary_key"])
+        return keys
+
+    def index_record_layouts(self):
+        """
+        Returns owner name -> (row_id_position, column_order) for every b-tree whose records are index records:
+        WITHOUT ROWID tables and indexes with known columns.
+        row_id_position is the record column holding the table rowid (None if there is none) and column_order
+        lists the record column of each output column.
+        """
+        tables = {table["name"]: table for table in self.tables}
+        layouts = {}
+
+        for table in self.tables:
+            if not table["without_rowid"] or table["columns"] is None:
+                continue
+            # WITHOUT ROWID records store the PRIMARY KEY columns first, then the other columns in table order
+            column_names = [name for name, _ in table["columns"]]
+            record_order = table["primary_key"] + [name for name in column_names if name not in table["primary_key"]]
+            layouts[table["name"]] = (None, tuple(record_order.index(name) for name in column_names))
+
+        for index in self.indexes:
+            if index["columns"] is None:
+                continue
+            table = tables.get(index["table_name"])
+            if table is not None and table["without_rowid"]:
+                # Index records on WITHOUT ROWID tables end with the PRIMARY KEY columns instead of a rowid
+                layouts[index["name"]] = (None, tuple(range(len(index["columns"]))))
+            else:
+                layouts[index["name"]] = (len(index["columns"]), tuple(range(len(index["columns"]))))
+
+        return layouts
+
+def read_schema_rows(page_source, walker=None):
+    """
+    Returns every sqlite_master row, walking all interior levels of the sqlite_master b-tree.
+    """
+    page_size = page_source.page_size
+    if walker is None:
+        walker = BtreeWalker(page_source)
+    rows = []
+
+    for page_number in walker.walk(1):
+        is_page_1 = page_number == 1
+        page_data = page_source.page(page_number)
+        if is_page_1:
+            page_data = page_data[100:]  # Skip the SQLite header (page 1 starts after 100-byte header)
+
+        try:
+            rows.extend(mainparse_leaf_page(page_source, page_data, page_number, page_size, is_page_1=is_page_1))
+        except Exception as e:
+            print(f"[!] Error parsing sqlite_master page {page_number}: {e}")
+
+    if not rows:
+        page_type = page_source.page(1)[100]
+        if page_type != TABLELEAF_PAGE_TYPE and page_type != TABLEINTERIOR_PAGE_TYPE:
+            print(f"[-] sqlite_master page 1 is not a recognized B-tree page type: {page_type}")
+
+    return rows
+
+def autoindex_key_columns(index, table):
+    """
+    Returns the key columns of an automatic index (sqlite_autoindex_<table>_<N>) from the PRIMARY KEY and UNIQUE
+    constraints of its table, or None if they cannot be matched.
+    """
+    suffix = index["name"][len(AUTOINDEX_PREFIX) + len(index["table_name"]) + 1:]
+    if table is None or not table["sql"] or not suffix.isdigit():
+        return None
+    autoindex_columns = extract_autoindex_columns(table["sql"])
+    number = int(suffix)
+    return autoindex_columns[number - 1] if 1 <= number <= len(autoindex_columns) else None
+
+def index_columns(index, tables):
+    """
+    Returns the (name, type) list of an index's output columns, or None if the index columns are not known.
+    Column types are taken from the indexed table. Indexes on WITHOUT ROWID tables also store the
+    PRIMARY KEY columns that are not part of the index key.
+    """
+    table = tables.get(index["table_name"])
+    if index["sql"]:
+        key_columns = extract_index_columns(index["sql"])
+    elif index["name"].startswith(AUTOINDEX_PREFIX):
+        key_columns = autoindex_key_columns(index, table)
+    else:
+        key_columns = None
+    if not key_columns:
+        return None
+
+    column_types = dict(table["columns"]) if table is not None and table["columns"] is not None else {}
+    columns = [(name, column_types.get(name, "TEXT")) for name in key_columns]
+    if table is not None and table["without_rowid"]:
+        columns.extend((name, column_types.get(name, "TEXT")) for name in table["primary_key"] if name not in key_columns)
+    return list(dict.fromkeys(columns))
+
+def btree_pages(page_source, root_page, name, pointer_map, walker):
+    """
+    Returns (leaf pages, child page -> parent page) for a table or index b-tree.
+    """
+    parents = {}
+    if pointer_map is not None and root_page:
+        leaf_pages = pointer_map.btree_leaf_pages(page_source, root_page, parents)
+    else:
+        leaf_pages = traverse_table_btree(page_source, root_page, name, parents, walker)
+    return leaf_pages, parents
+
+def build_schema_catalog(page_source, pointer_map=None):
+    """
+    Parses sqlite_master and every table and index b-tree once and returns the SchemaCatalog.
+    With a pointer map (auto_vacuum databases) the b-tree pages are taken from it instead of walking the b-trees.
+    """
+    tables = []
+    indexes = []
+    parent_map = {}
+    walker = BtreeWalker(page_source)
+
+    for row in read_schema_rows(page_source, walker):
+        # Row layout: cell offset, rowid, type, name, tbl_name, rootpage, sql
+        if len(row) < 6:
+            continue
+        try:
+            object_type = schema_text(row[2])
+            name = schema_text(row[3])
+            root_page = row[5] if isinstance(row[5], int) else struct.unpack(">I", row[5])[0]
+            sql = schema_text(row[6]).strip() if len(row) > 6 else ""
+        except Exception as e:
+            print(f"[-] Error parsing row: {e}")
+            continue
+
+        if object_type == "index":
+            indexes.append({"name": name, "table_name": schema_text(row[4]), "root_page": root_page, "sql": sql})
+            continue
+
+        if object_type != "table":
+            continue
+
+        columns = None
+        if sql.lower().startswith("create table"):
+            columns = list(dict.fromkeys(extract_columns_and_types_from_sql(sql)))
+        else:
+            print(f" [!] Skipping table {name.strip()}, invalid SQL: {repr(sql)}")
+
+        table_pages, table_parents = btree_pages(page_source, root_page, name, pointer_map, walker)
+        parent_map.update(table_parents)
+
+        without_rowid = bool(WITHOUT_ROWID_PATTERN.search(sql))
+        tables.append({
+            "name": name,
+            "root_page": root_page,
+            "sql": sql,
+            "columns": columns,
+            "without_rowid": without_rowid,
+            "primary_key": extract_primary_key_columns(sql) if without_rowid else [],
+            "pages": table_pages,
+            "interior_pages": sorted(set(table_parents.values())),
+        })
+
+    # Index b-trees are walked once the tables are known so key columns can take the table column types
+    tables_by_name = {table["name"]: table for table in tables}
+    for index in indexes:
+        index["columns"] = index_columns(index, tables_by_name)
+        index_pages, index_parents = btree_pages(page_source, index["root_page"], index["name"], pointer_map, walker)
+        parent_map.update(index_parents)
+        index["pages"] = index_pages
+        index["interior_pages"] = sorted(set(index_parents.values()))
+
+    return SchemaCatalog(tables, indexes, parent_map, pointer_map)
@@ -0,0 +1,193 @@
+import base64
+import hashlib
+import json
+import os
+import sys
+from array import array
+from Modules.schemacatalog import SchemaCatalog
+from Modules.pointermap import PointerMap
+from Modules.pagerolemap import PageRoleMap
+from Modules.walframetable import FRAME_TABLE_COLUMNS, UINT32
+from Modules.output_sqlite import load_completed
+
+# Bump when the layout of the sidecar changes; sidecars of other versions are rebuilt
+SIDECAR_VERSION = 3
+SIDECAR_FILE_NAME = "SQBite_Index.json"
+
+_FRAME_COLUMN_TYPES = {name: ("Q" if name == "offsets" else UINT32) for name in FRAME_TABLE_COLUMNS}
+
+def file_fingerprint(path, page_size):
+    """
+    Returns the fingerprint of an evidence or output file: size, modification time and the hashes of its first and last page.
+    """
+    stat = os.stat(path)
+    page_hashes = []
+    with open(path, "rb") as file:
+        page_hashes.append(hashlib.sha256(file.read(page_size)).hexdigest())
+        file.seek(max(stat.st_size - page_size, 0))
+        page_hashes.append(hashlib.sha256(file.read(page_size)).hexdigest())
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "page_hashes": page_hashes}
+
+def _pack_array(values):
+    """
+    Encodes a bytearray or array as base64 text (arrays in little endian byte order).
+    """
+    if isinstance(values, array):
+        values = array(values.typecode, values)
+        if sys.byteorder == "big":
+            values.byteswap()
+        values = values.tobytes()
+    return base64.b64encode(bytes(values)).decode("ascii")
+
+def _unpack_array(text, typecode=None):
+    data = base64.b64decode(text)
+    if typecode is None:
+        return bytearray(data)
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+def _pack_schema_catalog(schema_catalog):
+    pointer_map = schema_catalog.pointer_map
+    return {
+        "tables": schema_catalog.tables,
+        "indexes": schema_catalog.indexes,
+        "parent_map": list(schema_catalog.parent_map.items()),
+        "pointer_map": None if pointer_map is None else {
+            "total_pages": pointer_map.total_pages,
+            "types": _pack_array(pointer_map.types),
+            "parents": _pack_array(pointer_map.parents),
+        },
+    }
+
+def _unpack_schema_catalog(data):
+    for obj in data["tables"] + data["indexes"]:
+        if obj["columns"] is not None:
+            obj["columns"] = [tuple(column) for column in obj["columns"]]
+
+    pointer_map = None
+    if data["pointer_map"] is not None:
+        pointer_map = PointerMap(data["pointer_map"]["total_pages"])
+        pointer_map.types[:] = _unpack_array(data["pointer_map"]["types"])
+        pointer_map.parents = _unpack_array(data["pointer_map"]["parents"], UINT32)
+
+    return SchemaCatalog(data["tables"], data["indexes"], dict(data["parent_map"]), pointer_map)
+
+def _pack_role_map(role_map):
+    return {
+        "total_pages": role_map.total_pages,
+        "roles": _pack_array(role_map.roles),
+        "owners": _pack_array(role_map.owners),
+        "owner_names": role_map.owner_names,
+    }
+
+def _unpack_role_map(data):
+    role_map = PageRoleMap(data["total_pages"])
+    for owner_name in data["owner_names"][1:]:
+        role_map.owner_id(owner_name)
+    role_map.roles[:] = _unpack_array(data["roles"])
+    role_map.owners = _unpack_array(data["owners"], "I")
+    return role_map
+
+class SidecarIndex:
+    """
+    Versioned sidecar index written to the output folder so repeat runs on the same evidence skip unchanged work.
+
+    Everything derived from the Main Database file (schema catalog, pointer map, page role map) is reused while the
+    database fingerprint matches, the WAL frame table while the WAL fingerprint matches, and the whole extraction
+    while the evidence and the output database are unchanged since the last run.
+    """
+
+    def __init__(self, path, database=None, wal=None):
+        self.path = path
+        self.database = database
+        self.wal = wal
+        self.schema_catalog = None
+        self.role_map = None
+        self.frame_columns = None
+        self.extraction = None
+
+    def extraction_matches(self, output_file, classify):
+        """
+        Returns True if the output database still holds the completed extraction recorded for this evidence.
+        A classified extraction is only reused when classification is requested again.
+        """
+        if self.extraction is None or not load_completed(output_file):
+            return False
+        if self.extraction["classified"] and not classify:
+            return False
+        return file_fingerprint(output_file, self.extraction["page_size"]) == self.extraction["output"]
+
+    def set_extraction(self, output_file, record_count, classified, page_size):
+        self.extraction = {
+            "record_count": record_count,
+            "classified": classified,
+            "page_size": page_size,
+            "output": file_fingerprint(output_file, page_size),
+        }
+
+    def save(self):
+        data = {
+            "version": SIDECAR_VERSION,
+            "database": self.database,
+            "wal": self.wal,
+            "schema_catalog": _pack_schema_catalog(self.schema_catalog) if self.schema_catalog is not None else None,
+            "role_map": _pack_role_map(self.role_map) if self.role_map is not None else None,
+            "wal_frame_table": None if self.frame_columns is None else {
+                name: _pack_array(self.frame_columns[name]) for name in FRAME_TABLE_COLUMNS
+            },
+            "extraction": self.extraction,
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as sidecar_file:
+            json.dump(data, sidecar_file)
+        os.replace(temp_path, self.path)
+
+def load_sidecar_index(output_folder, database, wal, rebuild=False):
+    """
+    Loads the sidecar index of the output folder for the evidence fingerprints database and wal (None without a WAL).
+    Parts that no longer match the evidence are dropped; returns an empty SidecarIndex if there is nothing to reuse
+    or rebuild is set.
+    """
+    sidecar = SidecarIndex(os.path.join(output_folder, SIDECAR_FILE_NAME), database, wal)
+    if not os.path.exists(sidecar.path):
+        return sidecar
+
+    try:
+        with open(sidecar.path) as sidecar_file:
+            data = json.load(sidecar_file)
+    except (OSError, ValueError) as e:
+        print(f"[!] Sidecar index could not be read, rebuilding: {e}")
+        return sidecar
+
+    if data.get("version") != SIDECAR_VERSION:
+        print(f"[!] Sidecar index version {data.get('version')} is not supported, rebuilding")
+        return sidecar
+
+    if rebuild:
+        return sidecar
+
+    if data["database"] != database:
+        print("[!] Main Database file changed since the sidecar index was written, rebuilding")
+        return sidecar
+
+    try:
+        if data["schema_catalog"] is not None:
+            sidecar.schema_catalog = _unpack_schema_catalog(data["schema_catalog"])
+        if data["role_map"] is not None:
+            sidecar.role_map = _unpack_role_map(data["role_map"])
+        if data["wal"] == wal:
+            if data["wal_frame_table"] is not None:
+                sidecar.frame_columns = {
+                    name: _unpack_array(data["wal_frame_table"][name], _FRAME_COLUMN_TYPES[name]) for name in FRAME_TABLE_COLUMNS
+                }
+            sidecar.extraction = data["extraction"]
+        else:
+            print("[!] WAL file differs from the one in the sidecar index, the WAL is parsed again")
+    except (KeyError, TypeError, ValueError) as e:
+        print(f"[!] Sidecar index is incomplete, rebuilding: {e}")
+        sidecar = SidecarIndex(sidecar.path, database, wal)
+
+    return sidecar
@@ -0,0 +1,123 @@
+import io
+import os
+from bisect import bisect_left
+from Modules.pagesource import PageSource
+from Modules.parsesqliteheader import parse_sqlite_header
+from Modules.walpagereader import WalPageReader
+from Modules.overflowreader import OverflowReader
+
+class SnapshotPageSource:
+    """
+    The database as it stood at a WAL commit, as a page source the existing parsers can run against.
+
+    Every page resolves to its newest WAL frame at or before the commit frame, or to the Main Database file
+    when the WAL holds no copy; nothing is copied or replayed. The page -> frame map of the snapshot is built
+    once from the WAL frame table, so page lookups are a single dict lookup. The database header, page count
+    and freelist are those of the snapshot (page 1 and the database size recorded in the commit frame).
+
+    Only commits of the current WAL generation are accepted (see WalTransactionIndex). Every frame up to such a
+    commit is valid and committed, so no invalid, uncommitted or previous generation frame is ever mapped.
+    transaction_index is the WalTransactionIndex of the WAL when it was already built.
+    """
+
+    def __init__(self, db_path, wal_path, commit_frame, frame_columns=None, transaction_index=None):
+        self.path = db_path
+        self.wal_path = wal_path
+        self.commit_frame = commit_frame
+        self.db_source = PageSource(db_path)
+        try:
+            self.wal_reader = WalPageReader(wal_path, frame_columns=frame_columns, transaction_index=transaction_index)
+        except Exception:
+            self.db_source.close()
+            raise
+
+        try:
+            frame_table = self.wal_reader.frame_table
+            if self.wal_reader.page_size != self.db_source.page_size:
+                raise ValueError(f"WAL page size {self.wal_reader.page_size} does not match the database page size {self.db_source.page_size}")
+            if commit_frame not in self.wal_reader.commit_frames:
+                raise ValueError(f"WAL frame {commit_frame} is not a commit frame of the current WAL generation")
+
+            # Later frames of a page overwrite earlier ones, leaving the newest frame at or before the commit
+            self.page_frames = dict(zip(frame_table.page_numbers[:commit_frame], range(1, commit_frame + 1)))
+            self._wal_pages = sorted(self.page_frames)
+
+            self.page_size = self.db_source.page_size
+            self.total_pages = frame_table.commit_sizes[commit_frame - 1]
+            self.header = parse_sqlite_header(io.BytesIO(bytes(self.page(1)[:100])))
+        except Exception:
+            self.close()
+            raise
+
+        self.overflow_reader = OverflowReader(self, self.page_size)
+
+    def page(self, page_number):
+        """
+        Returns a memoryview of the page (1-based) as of the commit. Pages outside the snapshot return an empty view.
+        """
+        if not 1 <= page_number <= self.total_pages:
+            return memoryview(b"")
+        frame_number = self.page_frames.get(page_number)
+        if frame_number is not None:
+            return self.wal_reader.frame_page(frame_number)
+        return self.db_source.page(page_number)
+
+    def page_origin(self, page_number):
+        """
+        Returns (source file, frame number or "N/A", physical file offset) of the copy of a page in the snapshot.
+        """
+        frame_number = self.page_frames.get(page_number)
+        if frame_number is not None:
+            return os.path.basename(self.wal_path), frame_number, self.wal_reader.frame_table.page_offset(frame_number)
+        return self.db_source.page_origin(page_number)
+
+    def page_offset(self, page_number):
+        return self.page_origin(page_number)[2]
+
+    def is_valid_page(self, page_number):
+        return 1 <= page_number <= self.total_pages
+
+    def readahead(self, page_numbers):
+        """
+        Advises the kernel to read ahead the given pages that come from the Main Database file.
+        """
+        self.db_source.readahead([page_number for page_number in page_numbers if page_number not in self.page_frames])
+
+    def next_data_page(self, page_number):
+        """
+        Returns the first page at or after page_number that is not in a sparse hole of the Main Database file
+        or is held by the WAL.
+        """
+        next_page = self.db_source.next_data_page(page_number)
+        if next_page > page_number:
+            index = bisect_left(self._wal_pages, page_number)
+            if index < len(self._wal_pages):
+                next_page = min(next_page, self._wal_pages[index])
+        return next_page
+
+    def read_overflow_chain(self, first_page, length):
+        """
+        Returns up to length bytes of the overflow chain starting at first_page as of the commit.
+        """
+        return self.overflow_reader.read_chain(first_page, length)
+
+    def close(self):
+        if hasattr(self, "overflow_reader"):
+            self.overflow_reader.clear()
+        if hasattr(self, "wal_reader"):
+            self.wal_reader.close()
+        self.db_source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def open_page_source(db_path, wal_path=None, snapshot_frame=None, transaction_index=None):
+    """
+    Opens the Main Database file, or the snapshot of the database as of a WAL commit frame when wal_path is given.
+    """
+    if wal_path is None:
+        return PageSource(db_path)
+    return SnapshotPageSource(db_path, wal_path, snapshot_frame, transaction_index=transaction_index)
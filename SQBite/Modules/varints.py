@@ -1,27 +1,49 @@
 def single_varint(data, index=0):
     """
-    Processes a single Varint and returns its value and length.
+    Processes a single Varint starting at data[index] and returns its value and length.
     """
     varint = 0
-    for i in range(9):
+    for i in range(8):
         byte = data[index + i]
         varint = (varint << 7) | (byte & 0x7F)
         if byte < 0x80:
             return varint, i + 1
-    raise ValueError("Invalid varint")
+    # The ninth byte contributes all 8 bits
+    return (varint << 8) | data[index + 8], 9
 
 
-def multi_varint(data):
+def multi_varint(data, start=0, end=None):
     """
-    Processes multiple Varints and returns a list of values and total length.
+    Processes the Varints in data[start:end] without copying and returns a list of values and total length.
+    Stops at the first Varint that would run past end.
     """
+    if end is None or end > len(data):
+        end = len(data)
     varints = []
-    index = 0
-    while index < len(data):
-        try:
-            varint, varint_length = single_varint(data, index)
-            varints.append(varint)
-            index += varint_length
-        except ValueError:
-            break
-    return varints, index
+    append = varints.append
+    index = start
+    while index < end:
+        byte = data[index]
+        if byte < 0x80:  # Single byte Varints are the common case for serial types
+            append(byte)
+            index += 1
+            continue
+
+        varint = 0
+        position = index
+        limit = min(index + 8, end)
+        while position < limit:
+            byte = data[position]
+            position += 1
+            varint = (varint << 7) | (byte & 0x7F)
+            if byte < 0x80:
+                break
+        else:
+            if position - index < 8 or position >= end:
+                break  # Truncated Varint
+            varint = (varint << 8) | data[position]
+            position += 1
+
+        append(varint)
+        index = position
+    return varints, index - start
@@ -0,0 +1,34 @@
+import struct
+
+MASK32 = 0xFFFFFFFF
+
+# Four word pairs are unpacked per step; values are masked once per step since they stay well within Python ints
+_WORDS_PER_STEP = 8
+_STEP_STRUCTS = {True: struct.Struct(">8I"), False: struct.Struct("<8I")}
+_PAIR_STRUCTS = {True: struct.Struct(">2I"), False: struct.Struct("<2I")}
+
+def wal_checksum(data, big_endian=True, s1=0, s2=0):
+    """
+    Computes the SQLite WAL checksum of data (a multiple of 8 bytes), continuing from (s1, s2).
+    Used for the WAL header, WAL frames and the WAL-index header. Returns (s1, s2).
+    """
+    data = memoryview(data)
+    bulk_length = len(data) - len(data) % (_WORDS_PER_STEP * 4)
+
+    for x0, x1, x2, x3, x4, x5, x6, x7 in _STEP_STRUCTS[big_endian].iter_unpack(data[:bulk_length]):
+        s1 += x0 + s2
+        s2 += x1 + s1
+        s1 += x2 + s2
+        s2 += x3 + s1
+        s1 += x4 + s2
+        s2 += x5 + s1
+        s1 += x6 + s2
+        s2 += x7 + s1
+        s1 &= MASK32
+        s2 &= MASK32
+
+    for x0, x1 in _PAIR_STRUCTS[big_endian].iter_unpack(data[bulk_length:]):
+        s1 = (s1 + x0 + s2) & MASK32
+        s2 = (s2 + x1 + s1) & MASK32
+
+    return s1, s2
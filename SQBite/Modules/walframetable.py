@@ -0,0 +1,123 @@
+import mmap
+import struct
+import sys
+from array import array
+
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+
+# Typecode for unsigned 32-bit array columns
+UINT32 = "I" if array("I").itemsize == 4 else "L"
+
+# Names of the array columns of a WalFrameTable
+FRAME_TABLE_COLUMNS = ("page_numbers", "commit_sizes", "salt1", "salt2", "checksum1", "checksum2", "offsets")
+
+class WalFrameTable:
+    """
+    Column-oriented table of every frame header in a WAL file, decoded in one pass over the mmapped WAL.
+    The WAL stays mapped so frame pages can be handed out as memoryview slices.
+    Frame numbers are 1-based; column index = frame_number - 1.
+
+    Columns (array-backed):
+        page_numbers  - database page number stored in the frame
+        commit_sizes  - database size in pages after a commit frame, 0 for non-commit frames
+        salt1, salt2  - salt values copied from the WAL header when the frame was written
+        checksum1, checksum2 - cumulative checksum up to and including the frame
+        offsets       - file offset of the frame header
+
+    columns can hand in the columns of an earlier decode of the same WAL (see FRAME_TABLE_COLUMNS),
+    in which case the frame headers are not decoded again.
+    """
+
+    def __init__(self, wal_file, page_size, columns=None):
+        self.page_size = page_size
+        self.frame_size = WAL_FRAME_HEADER_SIZE + page_size
+        self._mmap = mmap.mmap(wal_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = wal_view = memoryview(self._mmap)
+
+        if columns is not None:
+            for name in FRAME_TABLE_COLUMNS:
+                setattr(self, name, columns[name])
+            return
+
+        body_size = max(len(wal_view) - WAL_HEADER_SIZE, 0)
+        full_frames = body_size // self.frame_size
+
+        # Decode the six 32-bit header fields of all complete frames as strided slices of a word view
+        frame_words = wal_view[WAL_HEADER_SIZE:WAL_HEADER_SIZE + full_frames * self.frame_size].cast(UINT32)
+        stride = self.frame_size // 4
+        columns = []
+        for field in range(6):
+            column = array(UINT32)
+            column.frombytes(frame_words[field::stride].tobytes())
+            if sys.byteorder == "little":
+                column.byteswap()
+            columns.append(column)
+        frame_words.release()
+
+        self.page_numbers, self.commit_sizes, self.salt1, self.salt2, self.checksum1, self.checksum2 = columns
+        self.offsets = array("Q", range(WAL_HEADER_SIZE, WAL_HEADER_SIZE + full_frames * self.frame_size, self.frame_size))
+
+        # A trailing frame with a complete header but a truncated page is still recorded
+        tail_offset = WAL_HEADER_SIZE + full_frames * self.frame_size
+        if len(wal_view) - tail_offset > WAL_FRAME_HEADER_SIZE:
+            for column, value in zip(columns, struct.unpack_from(">6I", wal_view, tail_offset)):
+                column.append(value)
+            self.offsets.append(tail_offset)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def columns(self):
+        """
+        Returns the array columns by name, e.g. to persist them and hand them back in later.
+        """
+        return {name: getattr(self, name) for name in FRAME_TABLE_COLUMNS}
+
+    def frame_header(self, frame_number):
+        """
+        Returns (page_number, commit_size, salt1, salt2, checksum1, checksum2) for a frame.
+        """
+        i = frame_number - 1
+        return (self.page_numbers[i], self.commit_sizes[i], self.salt1[i], self.salt2[i], self.checksum1[i], self.checksum2[i])
+
+    def header_data(self):
+        """
+        Returns a memoryview of the 32-byte WAL header.
+        """
+        return self._view[:WAL_HEADER_SIZE]
+
+    def checksummed_header_data(self, frame_number):
+        """
+        Returns a memoryview of the first 8 bytes of a frame header (page number and commit size),
+        the part of the frame header covered by the frame checksum.
+        """
+        offset = self.offsets[frame_number - 1]
+        return self._view[offset:offset + 8]
+
+    def page_offset(self, frame_number):
+        """
+        Returns the file offset of the page stored in a frame.
+        """
+        return self.offsets[frame_number - 1] + WAL_FRAME_HEADER_SIZE
+
+    def page_data(self, frame_number):
+        """
+        Returns a memoryview of the page stored in a frame.
+        """
+        page_offset = self.page_offset(frame_number)
+        return self._view[page_offset:page_offset + self.page_size]
+
+    def close(self):
+        self._view.release()
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Slices handed out are still referenced; the map is released once they are collected
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
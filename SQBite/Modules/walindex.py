@@ -0,0 +1,150 @@
+import struct
+import sys
+from array import array
+from Modules.walchecksum import wal_checksum
+from Modules.walframetable import UINT32
+
+# WAL-index (-shm) layout
+WALINDEX_VERSION = 3007000
+WALINDEX_HEADER_SIZE = 136       # Two copies of the 48-byte index header followed by the 40-byte checkpoint info
+WALINDEX_HEADER_COPY_SIZE = 48
+WALINDEX_BLOCK_SIZE = 32768      # Each block holds a page number array and a hash table
+HASHTABLE_NPAGE = 4096           # Page numbers per block
+HASHTABLE_NPAGE_ONE = HASHTABLE_NPAGE - WALINDEX_HEADER_SIZE // 4  # Page numbers in the first block (4062)
+HASHTABLE_NSLOT = 2 * HASHTABLE_NPAGE  # Hash slots per block (8192)
+HASHTABLE_HASH_1 = 383
+
+# iVersion, unused, iChange, isInit, bigEndCksum, szPage, mxFrame, nPage, aFrameCksum[2], aSalt[2], aCksum[2]
+_HEADER_FIELDS = "IIIBBHIIIIIIII"
+_HEADER_SALT_OFFSET = 32
+_HEADER_CHECKSUM_OFFSET = 40
+
+def _hash_slot(page_number):
+    return (page_number * HASHTABLE_HASH_1) & (HASHTABLE_NSLOT - 1)
+
+class WalIndex:
+    """
+    The WAL-index (-shm file) of a WAL: the index header and the per-block page number arrays and hash tables
+    SQLite uses to find the newest frame of a page without reading the WAL.
+
+    The -shm file is written in the byte order of the machine that wrote it, which is detected from the version field.
+    """
+
+    def __init__(self, shm_path):
+        self.path = shm_path
+        with open(shm_path, "rb") as shm_file:
+            data = shm_file.read()
+        if len(data) < WALINDEX_HEADER_SIZE:
+            raise ValueError(f"WAL-index is too small ({len(data)} bytes)")
+
+        self.byte_order = "<" if struct.unpack_from("<I", data, 0)[0] == WALINDEX_VERSION else ">"
+        header = struct.unpack_from(self.byte_order + _HEADER_FIELDS, data, 0)
+        (self.version, _, self.change_counter, self.is_init, self.big_endian_checksum, page_size,
+         self.max_frame, self.page_count, _, _, _, _, checksum1, checksum2) = header
+        self.page_size = (page_size & 0xFE00) + ((page_size & 0x0001) << 16)  # 65536 is stored as 1
+        self.header_checksum = (checksum1, checksum2)
+        # The salts are a byte copy of the WAL header salts, so they are big-endian whatever the byte order
+        self.salt1, self.salt2 = struct.unpack_from(">II", data, _HEADER_SALT_OFFSET)
+        self.backfilled_frames = struct.unpack_from(self.byte_order + "I", data, 2 * WALINDEX_HEADER_COPY_SIZE)[0]
+
+        self._header_copies_match = data[:WALINDEX_HEADER_COPY_SIZE] == data[WALINDEX_HEADER_COPY_SIZE:2 * WALINDEX_HEADER_COPY_SIZE]
+        self._computed_header_checksum = wal_checksum(data[:_HEADER_CHECKSUM_OFFSET], self.byte_order == ">")
+
+        # Page number arrays and hash tables of every block: (first frame - 1, page numbers, hash slots)
+        self.blocks = []
+        block_count = (len(data) + WALINDEX_BLOCK_SIZE - 1) // WALINDEX_BLOCK_SIZE
+        for block in range(block_count):
+            block_offset = block * WALINDEX_BLOCK_SIZE
+            if block == 0:
+                pages_offset, page_slots, zero_frame = WALINDEX_HEADER_SIZE, HASHTABLE_NPAGE_ONE, 0
+            else:
+                pages_offset, page_slots, zero_frame = 0, HASHTABLE_NPAGE, HASHTABLE_NPAGE_ONE + (block - 1) * HASHTABLE_NPAGE
+            hash_offset = block_offset + pages_offset + page_slots * 4
+            if hash_offset + HASHTABLE_NSLOT * 2 > len(data):
+                break
+            page_numbers = self._array(UINT32, data[block_offset + pages_offset:hash_offset])
+            hash_slots = self._array("H", data[hash_offset:hash_offset + HASHTABLE_NSLOT * 2])
+            self.blocks.append((zero_frame, page_numbers, hash_slots))
+
+    def _array(self, typecode, data):
+        values = array(typecode)
+        values.frombytes(data)
+        if (self.byte_order == ">") != (sys.byteorder == "big"):
+            values.byteswap()
+        return values
+
+    def frame_page_numbers(self):
+        """
+        Returns the page number of every frame up to max_frame as recorded in the page number arrays.
+        """
+        page_numbers = array(UINT32)
+        for _, block_pages, _ in self.blocks:
+            page_numbers.extend(block_pages[:self.max_frame - len(page_numbers)])
+            if len(page_numbers) >= self.max_frame:
+                break
+        return page_numbers
+
+    def check(self, wal_header, frame_table):
+        """
+        Checks the WAL-index against the WAL. Returns None if it can be used for frame lookups, or the reason it cannot.
+        """
+        if self.version != WALINDEX_VERSION:
+            return f"unsupported version {self.version}"
+        if not self.is_init or not self._header_copies_match:
+            return "the index header is not initialised or is being written"
+        if self._computed_header_checksum != self.header_checksum:
+            return "the index header checksum is invalid"
+        if self.page_size != wal_header["page_size"]:
+            return f"page size {self.page_size} does not match the WAL page size {wal_header['page_size']}"
+        if (self.salt1, self.salt2) != (wal_header["salt1"], wal_header["salt2"]):
+            return "the salts do not match the WAL header (the WAL was reset or checkpointed since)"
+        if self.max_frame > len(frame_table):
+            return f"it indexes {self.max_frame} frames but the WAL has {len(frame_table)}"
+        if self.frame_page_numbers() != frame_table.page_numbers[:self.max_frame]:
+            return "the indexed page numbers do not match the WAL frames"
+        return None
+
+    def latest_frame(self, page_number, max_frame=None):
+        """
+        Returns the newest frame number holding the page at or before max_frame (and max_frame of the index),
+        or None if the indexed frames have no copy. Each block is searched with a hash probe, newest block first.
+        """
+        if max_frame is None or max_frame > self.max_frame:
+            max_frame = self.max_frame
+        slot = _hash_slot(page_number)
+
+        for zero_frame, page_numbers, hash_slots in reversed(self.blocks):
+            if zero_frame >= max_frame:
+                continue
+            found_frame = None
+            key = slot
+            for _ in range(HASHTABLE_NSLOT):
+                frame_index = hash_slots[key]
+                if not frame_index:
+                    break
+                frame_number = zero_frame + frame_index
+                if frame_number <= max_frame and page_numbers[frame_index - 1] == page_number:
+                    found_frame = frame_number
+                key = (key + 1) & (HASHTABLE_NSLOT - 1)
+            if found_frame is not None:
+                return found_frame
+        return None
+
+def load_wal_index(shm_path, wal_header, frame_table):
+    """
+    Loads the WAL-index of a WAL and checks it against the WAL.
+    Returns the WalIndex, or None (after printing why) if it is missing, stale or does not match.
+    """
+    try:
+        wal_index = WalIndex(shm_path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"[!] WAL-index could not be read, using the WAL frame table: {e}")
+        return None
+
+    reason = wal_index.check(wal_header, frame_table)
+    if reason is not None:
+        print(f"[!] WAL-index is stale or does not match the WAL ({reason}), using the WAL frame table")
+        return None
+
+    print(f"[+] WAL-index loaded: {wal_index.max_frame} of {len(frame_table)} frames indexed")
+    return wal_index
@@ -0,0 +1,179 @@
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from array import array
+from Modules.parsewalheader import parse_wal_header
+from Modules.walframetable import WalFrameTable, UINT32
+from Modules.overflowreader import OverflowReader
+from Modules.walindex import load_wal_index
+from Modules.waltransactions import WalTransactionIndex
+
+# Number of decoded pages kept in the LRU cache
+WAL_PAGE_CACHE_SIZE = 1024
+
+class WalPageReader:
+    """
+    Reads WAL pages by frame number over a single open handle and mmap.
+
+    Pages can be addressed directly by frame number, or as "the newest frame of page P at or before frame F".
+    Decoded pages (e.g. parsed interior pages) are kept in a bounded LRU cache keyed by frame number.
+    frame_columns are the frame table columns of an earlier run on the same WAL (see WalFrameTable).
+    With the WAL-index (-shm file) of the WAL, page lookups within its indexed frames are hash probes
+    and the per-page frame lists are only built for frames it does not cover.
+
+    Page lookups only consider frames of committed transactions of the current WAL generation (see
+    WalTransactionIndex). Those frames are a prefix of the WAL that ends at the last commit frame, so invalid,
+    uncommitted and previous generation frames are excluded by never looking past last_commit_frame.
+    transaction_index is the WalTransactionIndex of an earlier reader on the same WAL; it is built otherwise.
+    """
+
+    def __init__(self, wal_path, cache_size=WAL_PAGE_CACHE_SIZE, frame_columns=None, shm_path=None, transaction_index=None):
+        self.path = wal_path
+        self._file = open(wal_path, "rb")
+        try:
+            self.header = parse_wal_header(self._file)
+            self.page_size = self.header["page_size"]
+            self.frame_table = WalFrameTable(self._file, self.page_size, frame_columns)
+        except Exception:
+            self._file.close()
+            raise
+
+        self.wal_index = load_wal_index(shm_path, self.header, self.frame_table) if shm_path else None
+        self._page_frames = None
+
+        if transaction_index is None:
+            transaction_index = WalTransactionIndex(self.frame_table, self.header)
+        self.transaction_index = transaction_index
+
+        # Frame numbers of the commit frames of the current WAL generation
+        self.commit_frames = array(UINT32, transaction_index.current_commit_frames())
+        self.last_commit_frame = self.commit_frames[-1] if self.commit_frames else 0
+
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.overflow_reader = OverflowReader(None, self.page_size)
+
+    @property
+    def frame_count(self):
+        return len(self.frame_table)
+
+    @property
+    def page_frames(self):
+        """
+        Frame numbers of every page in ascending order, built from the frame table in one pass on first use.
+        """
+        if self._page_frames is None:
+            self._page_frames = {}
+            for frame_number, page_number in enumerate(self.frame_table.page_numbers, 1):
+                frames = self._page_frames.get(page_number)
+                if frames is None:
+                    frames = self._page_frames[page_number] = array(UINT32)
+                frames.append(frame_number)
+        return self._page_frames
+
+    def frame_page(self, frame_number):
+        """
+        Returns a memoryview of the page stored in a frame (1-based).
+        """
+        return self.frame_table.page_data(frame_number)
+
+    def latest_frame(self, page_number, max_frame=None):
+        """
+        Returns the newest committed frame number holding the page at or before max_frame (and the last commit
+        frame), or None if the WAL has no committed copy.
+        """
+        if max_frame is None or max_frame > self.last_commit_frame:
+            max_frame = self.last_commit_frame
+        if not max_frame:
+            return None
+
+        wal_index = self.wal_index
+        if wal_index is not None and max_frame <= wal_index.max_frame:
+            return wal_index.latest_frame(page_number, max_frame)
+
+        frames = self.page_frames.get(page_number)
+        if not frames:
+            return None
+        index = bisect_right(frames, max_frame)
+        return frames[index - 1] if index else None
+
+    def page_at(self, page_number, max_frame=None):
+        """
+        Returns (frame_number, page_data) for the newest committed copy of a page at or before max_frame, or (None, None).
+        """
+        frame_number = self.latest_frame(page_number, max_frame)
+        if frame_number is None:
+            return None, None
+        return frame_number, self.frame_page(frame_number)
+
+    def commit_frame(self, frame_number):
+        """
+        Returns the commit frame of the transaction a frame belongs to.
+        Frames after the last commit of the current generation (uncommitted, invalid or left over from a previous
+        generation) use the last commit frame, so their overflow pages resolve to the last committed state.
+        """
+        index = bisect_left(self.commit_frames, frame_number)
+        if index < len(self.commit_frames):
+            return self.commit_frames[index]
+        return self.last_commit_frame
+
+    def page_view(self, frame_number, db_source=None):
+        """
+        Returns a WalPageView of the database as of the commit of the transaction holding frame_number.
+        """
+        return WalPageView(self, self.commit_frame(frame_number), db_source)
+
+    def decoded_page(self, frame_number, decoder):
+        """
+        Returns decoder(page_data) for a frame, caching the result in the LRU cache.
+        """
+        key = (frame_number, decoder)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        decoded = decoder(self.frame_page(frame_number))
+        self._cache[key] = decoded
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return decoded
+
+    def close(self):
+        self._cache.clear()
+        self.overflow_reader.clear()
+        self.frame_table.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class WalPageView:
+    """
+    The database pages visible at a WAL frame: each page resolves to its newest committed WAL frame at or before
+    max_frame and falls back to the main database file (db_source) when the WAL holds no copy.
+    Used to follow overflow chains of WAL records.
+    """
+
+    def __init__(self, wal_reader, max_frame, db_source=None):
+        self.wal_reader = wal_reader
+        self.max_frame = max_frame
+        self.db_source = db_source
+
+    def page(self, page_number):
+        frame_number = self.wal_reader.latest_frame(page_number, self.max_frame)
+        if frame_number is not None:
+            return self.wal_reader.frame_page(frame_number)
+        if self.db_source is not None:
+            return self.db_source.page(page_number)
+        return memoryview(b"")
+
+    def read_overflow_chain(self, first_page, length):
+        """
+        Returns up to length bytes of the overflow chain starting at first_page as of max_frame.
+        """
+        return self.wal_reader.overflow_reader.read_chain(
+            first_page, length, cache_key=(self.max_frame, first_page), page_source=self
+        )
@@ -0,0 +1,108 @@
+from functools import partial
+from Modules.btreeinteriorpage_processing import parse_interior_page
+from Modules.pointermap import decode_pointer_map_page, PTRMAP_BTREE
+
+# Guards against cycles in corrupt or mixed-generation parent maps
+MAX_BTREE_DEPTH = 64
+
+class WalTableMapper:
+    """
+    Maps WAL table and index leaf pages to their table or index with a child-to-parent page map.
+
+    The map starts from the interior pages of the main database b-trees and is updated as interior
+    frames are seen in the WAL, so resolving a leaf is a walk up the tree to a root page.
+    Resolved pages are cached until a WAL interior frame changes the parent of a page.
+    For auto_vacuum databases, pointer map frames in the WAL also supply parent pages, and the main
+    database pointer map resolves pages no walk can reach.
+    """
+
+    def __init__(self, wal_reader, schema_catalog):
+        self.wal_reader = wal_reader
+        self._decode_interior = partial(parse_interior_page, page_size=wal_reader.page_size)
+        self.db_parents = schema_catalog.parent_map
+        self.wal_parents = {}
+        self.wal_children = {}
+        self.ptrmap_parents = {}
+        self.pointer_map = schema_catalog.pointer_map
+        self.root_owners = schema_catalog.root_owners()
+        self._cache = {}
+
+    def add_interior_frame(self, frame_number):
+        """
+        Records the children of a WAL table or index interior frame. The newest frame of a page wins.
+        """
+        page_number = self.wal_reader.frame_table.page_numbers[frame_number - 1]
+        child_pages = self.wal_reader.decoded_page(frame_number, self._decode_interior)
+        previous_children = self.wal_children.get(page_number, [])
+        affected_pages = set(previous_children) | set(child_pages)
+        previous_parents = {child_page: self.parent_page(child_page) for child_page in affected_pages}
+
+        for child_page in previous_children:
+            if self.wal_parents.get(child_page) == page_number:
+                del self.wal_parents[child_page]
+        for child_page in child_pages:
+            self.wal_parents[child_page] = page_number
+        self.wal_children[page_number] = child_pages
+
+        # Cached results are only stale if the frame moved a page to a different parent
+        if any(self.parent_page(child_page) != parent for child_page, parent in previous_parents.items()):
+            self._cache.clear()
+
+    def add_pointer_map_frame(self, frame_number):
+        """
+        Records the b-tree parent pages listed in a WAL pointer map frame. The newest frame of a page wins.
+        """
+        page_number = self.wal_reader.frame_table.page_numbers[frame_number - 1]
+        entries = decode_pointer_map_page(self.wal_reader.frame_page(frame_number), page_number, self.wal_reader.page_size)
+
+        changed = False
+        for child_page, entry_type, parent_page in entries:
+            if entry_type != PTRMAP_BTREE:
+                continue
+            if self.ptrmap_parents.get(child_page) != parent_page:
+                self.ptrmap_parents[child_page] = parent_page
+                changed = True
+
+        if changed:
+            self._cache.clear()
+
+    def parent_page(self, page_number):
+        """
+        Returns the parent of a page, preferring the newest WAL interior frame, then WAL pointer map frames,
+        over the main database.
+        """
+        parent_page = self.wal_parents.get(page_number)
+        if parent_page is None:
+            parent_page = self.ptrmap_parents.get(page_number)
+        if parent_page is None:
+            parent_page = self.db_parents.get(page_number)
+        return parent_page
+
+    def resolve(self, page_number):
+        """
+        Returns the table or index name for a page, or "Unknown" if no root page can be reached.
+        """
+        table_name = self._cache.get(page_number)
+        if table_name is not None:
+            return table_name
+
+        current_page = page_number
+        table_name = "Unknown"
+        for _ in range(MAX_BTREE_DEPTH):
+            if current_page in self.root_owners:
+                table_name = self.root_owners[current_page]
+                break
+            cached = self._cache.get(current_page)
+            if cached is not None:
+                table_name = cached
+                break
+            parent_page = self.parent_page(current_page)
+            if parent_page is None:
+                # Fall back to the main database pointer map (auto_vacuum databases)
+                if self.pointer_map is not None:
+                    table_name = self.root_owners.get(self.pointer_map.root_page(current_page), "Unknown")
+                break
+            current_page = parent_page
+
+        self._cache[page_number] = table_name
+        return table_name
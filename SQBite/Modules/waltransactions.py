@@ -0,0 +1,176 @@
+from array import array
+from Modules.walchecksum import wal_checksum
+from Modules.walframetable import UINT32
+
+# Frame status codes
+FRAME_INVALID = 0         # Salt or checksum mismatch (torn write, corruption or an unverifiable leftover frame)
+FRAME_VALID_CURRENT = 1   # Part of a committed transaction of the current WAL generation (what SQLite reads)
+FRAME_VALID_PREVIOUS = 2  # Checksum chain valid, left over from a WAL generation before the last reset
+FRAME_UNCOMMITTED = 3     # Checksum chain valid, written after the last commit of the current generation
+
+FRAME_STATUS_LABELS = {
+    FRAME_INVALID: "Invalid",
+    FRAME_VALID_CURRENT: "Valid (Current)",
+    FRAME_VALID_PREVIOUS: "Valid (Previous Generation)",
+    FRAME_UNCOMMITTED: "Valid (Uncommitted)",
+}
+
+# Checksum seed and checksum of the WAL header (the first 24 bytes are checksummed)
+_WAL_HEADER_CHECKSUMMED_SIZE = 24
+
+class WalTransactionIndex:
+    """
+    Groups the frames of a WAL into transactions and validates their salts and checksum chains.
+
+    The current generation is the chain SQLite itself recovers: it is seeded with the WAL header checksum,
+    every frame must carry the header salts and its cumulative checksum (first 8 bytes of the frame header
+    plus the page) must match, and the chain ends at the first frame that does not. Frames up to the last
+    commit frame of the chain are current, the ones after it are uncommitted.
+
+    Frames after the chain with other salts are leftovers of earlier generations. Their WAL header is gone,
+    so each one is checked against the stored checksum of the frame before it with the same salts; the first
+    frame of such a run is only accepted when the frame after it checks out.
+
+    Columns (index = frame_number - 1):
+        status    - FRAME_* code of the frame
+        commit_of - commit frame of the transaction the frame belongs to, 0 if it was never committed
+    transactions lists (first_frame, last_frame, status) for every transaction; for committed ones
+    last_frame is the commit frame.
+    """
+
+    def __init__(self, frame_table, wal_header):
+        self.page_size = frame_table.page_size
+        self.big_endian = wal_header["big_endian_checksum"]
+        self.salts = (wal_header["salt1"], wal_header["salt2"])
+        self.page_numbers = frame_table.page_numbers
+        self.salt1 = frame_table.salt1
+        self.salt2 = frame_table.salt2
+        self.frame_count = len(frame_table)
+        self.status = bytearray(self.frame_count)
+        self.commit_of = array(UINT32, [0]) * self.frame_count
+        self.transactions = []
+
+        header_checksum = (wal_header["checksum1"], wal_header["checksum2"])
+        computed = wal_checksum(frame_table.header_data()[:_WAL_HEADER_CHECKSUMMED_SIZE], self.big_endian)
+        self.header_valid = computed == header_checksum
+
+        chain_end = self._current_chain(frame_table, header_checksum) if self.header_valid else 1
+        self._previous_generations(frame_table, chain_end)
+
+    def _frame_checksum(self, frame_table, frame_number, s1, s2):
+        """
+        Returns the cumulative checksum of a frame continuing from (s1, s2), or None for a truncated frame.
+        """
+        page_data = frame_table.page_data(frame_number)
+        if len(page_data) != self.page_size:
+            return None
+        s1, s2 = wal_checksum(frame_table.checksummed_header_data(frame_number), self.big_endian, s1, s2)
+        return wal_checksum(page_data, self.big_endian, s1, s2)
+
+    def _mark_transaction(self, first_frame, last_frame, status, committed):
+        for frame_number in range(first_frame, last_frame + 1):
+            self.status[frame_number - 1] = status
+            if committed:
+                self.commit_of[frame_number - 1] = last_frame
+        self.transactions.append((first_frame, last_frame, status))
+
+    def _current_chain(self, frame_table, checksum):
+        """
+        Validates the current generation from the WAL header. Returns the first frame after the chain.
+        """
+        commit_sizes = frame_table.commit_sizes
+        transaction_start = 1
+        frame_number = 1
+        while frame_number <= self.frame_count:
+            i = frame_number - 1
+            if (self.salt1[i], self.salt2[i]) != self.salts:
+                break
+            checksum = self._frame_checksum(frame_table, frame_number, *checksum)
+            if checksum != (frame_table.checksum1[i], frame_table.checksum2[i]):
+                break
+            if commit_sizes[i]:
+                self._mark_transaction(transaction_start, frame_number, FRAME_VALID_CURRENT, True)
+                transaction_start = frame_number + 1
+            frame_number += 1
+
+        if transaction_start < frame_number:
+            self._mark_transaction(transaction_start, frame_number - 1, FRAME_UNCOMMITTED, False)
+        return frame_number
+
+    def _previous_generations(self, frame_table, first_frame):
+        """
+        Validates the runs of frames after the current chain that carry salts of an earlier generation
+        (every run when the WAL header itself is invalid).
+        """
+        commit_sizes = frame_table.commit_sizes
+        frame_number = first_frame
+        while frame_number <= self.frame_count:
+            salts = (self.salt1[frame_number - 1], self.salt2[frame_number - 1])
+            run_end = frame_number
+            while run_end < self.frame_count and (self.salt1[run_end], self.salt2[run_end]) == salts:
+                run_end += 1
+            if salts == self.salts and self.header_valid:
+                # Frames of the current generation after the end of its chain are ignored by SQLite
+                frame_number = run_end + 1
+                continue
+
+            valid = [False] * (run_end - frame_number + 1)
+            for k in range(frame_number + 1, run_end + 1):
+                previous = (frame_table.checksum1[k - 2], frame_table.checksum2[k - 2])
+                valid[k - frame_number] = self._frame_checksum(frame_table, k, *previous) == (frame_table.checksum1[k - 1], frame_table.checksum2[k - 1])
+            if len(valid) > 1:
+                valid[0] = valid[1]
+
+            transaction_start = None
+            for k in range(frame_number, run_end + 1):
+                if not valid[k - frame_number]:
+                    transaction_start = None
+                    continue
+                self.status[k - 1] = FRAME_VALID_PREVIOUS
+                if transaction_start is None:
+                    transaction_start = k
+                if commit_sizes[k - 1]:
+                    self._mark_transaction(transaction_start, k, FRAME_VALID_PREVIOUS, True)
+                    transaction_start = None
+
+            frame_number = run_end + 1
+
+    def frame_status(self, frame_number):
+        return self.status[frame_number - 1]
+
+    def is_current(self, frame_number):
+        """
+        Returns True if the frame is part of a committed transaction of the current generation.
+        """
+        return self.status[frame_number - 1] == FRAME_VALID_CURRENT
+
+    def current_commit_frames(self):
+        """
+        Returns the commit frames of the committed transactions of the current generation, oldest first.
+        """
+        return [last_frame for _, last_frame, status in self.transactions if status == FRAME_VALID_CURRENT]
+
+    def frame_rows(self):
+        """
+        Yields (frame_number, page_number, commit_frame, salt1, salt2, status label) for every frame.
+        commit_frame is None for frames that were never committed.
+        """
+        for i in range(self.frame_count):
+            yield (i + 1, self.page_numbers[i], self.commit_of[i] or None, self.salt1[i], self.salt2[i], FRAME_STATUS_LABELS[self.status[i]])
+
+    def summary(self):
+        counts = {status: self.status.count(status) for status in FRAME_STATUS_LABELS}
+        committed = sum(1 for _, _, status in self.transactions if status == FRAME_VALID_CURRENT)
+        return (f"{committed} committed transactions ({counts[FRAME_VALID_CURRENT]} frames) in the current generation, "
+                f"{counts[FRAME_UNCOMMITTED]} uncommitted frames, {counts[FRAME_VALID_PREVIOUS]} frames from previous generations, "
+                f"{counts[FRAME_INVALID]} invalid frames")
+
+def build_transaction_index(wal_reader):
+    """
+    Returns the WalTransactionIndex of the WAL opened by a WalPageReader and prints a summary.
+    """
+    transaction_index = wal_reader.transaction_index
+    if not transaction_index.header_valid:
+        print("[!] WAL header checksum is invalid: SQLite would ignore every frame of this WAL")
+    print(f"[+] WAL Transactions: {transaction_index.summary()}")
+    return transaction_index
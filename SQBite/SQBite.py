@@ -26,13 +26,61 @@
 import os
 import argparse
 import datetime
+import itertools
+from Modules.pagesource import PageSource
+from Modules.pointermap import parse_pointer_map
+from Modules.schemacatalog import build_schema_catalog
+from Modules.pagerolemap import build_page_role_map
+from Modules.sidecarindex import load_sidecar_index, file_fingerprint
 from Modules.parse_sqlite_file import parse_sqlite_file
 from Modules.parse_wal_file import parse_wal_file
-from Modules.output_sqlite import write_to_sqlite
+from Modules.walpagereader import WalPageReader
+from Modules.snapshotpagesource import SnapshotPageSource
+from Modules.waltransactions import build_transaction_index
+from Modules.output_sqlite import write_to_sqlite, write_wal_frames, load_completed
+from Modules.outputindexes import build_output_indexes, parse_index_columns, DEFAULT_INDEX_COLUMNS, INDEX_COLUMNS
 from Modules.recordclassify import classify_records
 from Modules.instasearch import insta_search
 
-def _main(db_file, wal_file, output_folder, search_term):
+def _extract_snapshot(db_file, wal_file, output_folder, snapshot, workers=1):
+    """
+    Extracts the records of the database as it stood at a WAL commit frame ("last" for the last commit) into
+    SQBite_Snapshot_Frame_<commit frame>.sqlite. Only commits of the current WAL generation can be reconstructed.
+    Returns (output file, schema catalog, record count); the output file is None if the commit frame is not valid.
+    """
+    print(f"\n[+] Validating WAL Frames")
+    with WalPageReader(wal_file) as wal_reader:
+        frame_columns = wal_reader.frame_table.columns()
+        transaction_index = build_transaction_index(wal_reader)
+
+    commit_frames = transaction_index.current_commit_frames()
+    if not commit_frames:
+        print("[-] The WAL has no committed transactions to build a snapshot from")
+        return None, None, 0
+    commit_frame = commit_frames[-1] if snapshot == "last" else int(snapshot)
+    if commit_frame not in commit_frames:
+        print(f"[-] WAL frame {commit_frame} is not a commit frame of the current WAL generation (commit frames: {commit_frames[0]}..{commit_frames[-1]}, see the WAL_Frames table)")
+        return None, None, 0
+
+    # The schema, pointer map and page roles are those of the snapshot, not of the Main Database file
+    print(f"\n[+] Processing Database Schema as of Commit Frame {commit_frame}")
+    with SnapshotPageSource(db_file, wal_file, commit_frame, frame_columns, transaction_index) as snapshot_source:
+        pointer_map = parse_pointer_map(snapshot_source)
+        if pointer_map is not None:
+            print(f"[+] Pointer Map Pages Parsed (auto_vacuum)")
+        schema_catalog = build_schema_catalog(snapshot_source, pointer_map)
+        role_map = build_page_role_map(snapshot_source, schema_catalog)
+    print(f"[+] Finished Processing Database Schema")
+
+    output_file = os.path.join(output_folder, f"SQBite_Snapshot_Frame_{commit_frame}.sqlite")
+    if os.path.exists(output_file):
+        print(f"\n[!] Replacing the previous snapshot extraction in {os.path.basename(output_file)}")
+        os.remove(output_file)
+
+    record_batches = parse_sqlite_file(db_file, schema_catalog, workers, role_map, wal_file, commit_frame, transaction_index)
+    return output_file, schema_catalog, write_to_sqlite(output_file, schema_catalog, record_batches)
+
+def _main(db_file, wal_file, output_folder, search_term, workers=1, rebuild_index=False, shm_file=None, snapshot=None, index_columns=DEFAULT_INDEX_COLUMNS):
     print(r"""
                                                     \_______/
   _____    ____    ____    _   _                `.,-'\_____/`-.,'
@@ -56,6 +104,9 @@ Note: Table Assignments from the WAL file should be verified
 Now Supported
 
 - Parsing Freelist Pages
+- Parsing Pointer Map Pages (auto_vacuum databases)
+- Parsing Index B-trees and WITHOUT ROWID Tables
+- WAL Transaction and Checksum Validation
 - Output SQLite Database
 - Basic Record Recovery from Freeblocks and Page Unallocated Space (All Pages)
 - Record Classification (Experimental)
@@ -63,45 +114,100 @@ Now Supported
 
 Not Currently Supported: 
 
-- Parsing of Index B-trees (Including WITHOUT ROWID Tables as they use Index B-trees)
-- Parsing of Pointer Map Pages
 - Freelist page identification in the WAL
 
 Known Issues:
 
-- Overflow Records in the WAL are not completely reconstructed
+- WAL records whose overflow pages are in neither the WAL nor the main database are only partially reconstructed
 """)
 
     start_time = datetime.datetime.now()
       
     print(f"Database Analysis Started: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
-    db_records, db_recoveredrecords = parse_sqlite_file(db_file)
-
-    if wal_file:
-        wal_records, wal_recoveredrecords = parse_wal_file(wal_file, db_file)
-        combined_records = db_records + wal_records
-        combined_recoveredrecords = db_recoveredrecords + wal_recoveredrecords
-    else:
-        combined_records = db_records
-        combined_recoveredrecords = db_recoveredrecords
-
-    if not combined_records:
-        print("[!] No Records Extracted!")
-        return
-    
     # Create the output folder 
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
     
-    output_file = os.path.join(output_folder, "SQBite_Extraction.sqlite")  
-   
-    # Write records to SQLite Database
-    write_to_sqlite(output_file, db_file, combined_records, combined_recoveredrecords)
+    # A snapshot run parses the database as it stood at a WAL commit instead of the evidence files as they are
+    if snapshot is not None:
+        output_file, schema_catalog, record_count = _extract_snapshot(db_file, wal_file, output_folder, snapshot, workers)
+        sidecar = None
+    else:
+        output_file = os.path.join(output_folder, "SQBite_Extraction.sqlite")  
+
+        # The schema is parsed once and shared by every stage
+        # The sidecar index in the output folder holds it from an earlier run on the same evidence
+        print(f"\n[+] Processing Database Schema")
+        with PageSource(db_file) as page_source:
+            page_size = page_source.page_size
+            sidecar = load_sidecar_index(
+                output_folder,
+                file_fingerprint(db_file, page_size),
+                file_fingerprint(wal_file, page_size) if wal_file else None,
+                rebuild_index,
+            )
+
+            if sidecar.schema_catalog is not None and sidecar.role_map is not None:
+                print(f"[+] Schema and Page Roles Loaded from the Sidecar Index")
+            else:
+                pointer_map = parse_pointer_map(page_source)
+                if pointer_map is not None:
+                    print(f"[+] Pointer Map Pages Parsed (auto_vacuum)")
+                sidecar.schema_catalog = build_schema_catalog(page_source, pointer_map)
+                sidecar.role_map = build_page_role_map(page_source, sidecar.schema_catalog)
+        schema_catalog = sidecar.schema_catalog
+        print(f"[+] Finished Processing Database Schema")
+
+        if sidecar.extraction_matches(output_file, args.c):
+            record_count = sidecar.extraction["record_count"]
+            print(f"\n[+] Evidence and Output Database unchanged since the last run: Reusing {record_count} Extracted Records")
+        else:
+            # An extraction written by an earlier run is replaced rather than appended to, and so is
+            # the partial output of a run that failed before its load was committed
+            if os.path.exists(output_file):
+                if load_completed(output_file):
+                    print(f"\n[!] Replacing the previous extraction in {os.path.basename(output_file)}")
+                else:
+                    print(f"\n[!] Replacing the incomplete extraction in {os.path.basename(output_file)}")
+                os.remove(output_file)
+
+            # Record batches are streamed from the parsers straight into the output writer
+            record_batches = parse_sqlite_file(db_file, schema_catalog, workers, sidecar.role_map)
+
+            # The WAL frames are grouped into transactions and their salts and checksums validated before parsing
+            transaction_index = None
+            if wal_file:
+                print(f"\n[+] Validating WAL Frames")
+                with WalPageReader(wal_file, frame_columns=sidecar.frame_columns) as wal_reader:
+                    sidecar.frame_columns = wal_reader.frame_table.columns()
+                    transaction_index = build_transaction_index(wal_reader)
+                record_batches = itertools.chain(record_batches, parse_wal_file(wal_file, db_file, schema_catalog, sidecar, shm_file, transaction_index))
+       
+            # Write records to SQLite Database
+            record_count = write_to_sqlite(output_file, schema_catalog, record_batches)
+            if transaction_index is not None:
+                write_wal_frames(output_file, os.path.basename(wal_file), transaction_index)
+
+    # The sidecar is only saved below, once the load has been committed; a failed run leaves the last one in place
+    if not record_count:
+        if sidecar is not None:
+            sidecar.save()
+        print("[!] No Records Extracted!")
+        return
     
+    # Index the output tables once the bulk load is done, before classification and searches query them
+    build_output_indexes(output_file, index_columns)
+
     #Classify the Record Status
     if args.c: 
-        classify_records(output_file) 
+        classify_records(output_file, schema_catalog.record_keys()) 
+
+    # The extraction is recorded once the output database is final
+    if sidecar is not None:
+        sidecar.set_extraction(output_file, record_count, args.c, page_size)
+        sidecar.save()
+        print(f"[+] Sidecar Index saved to {os.path.basename(sidecar.path)}")
         
     # Insta Search 
     if search_term:
@@ -138,12 +244,28 @@ if __name__ == "__main__":
     
     parser.add_argument('-i', dest="db_file", metavar='db_path', required=True, help="Path to the SQLite main database file.")
     parser.add_argument('-w', dest="wal_file", metavar='wal_path', required=False, help="(Optional) Path to the SQLite WAL file.")
+    parser.add_argument('-m', dest="shm_file", metavar='shm_path', required=False, help="(Optional) Path to the SQLite WAL-index (-shm) file, used for page to frame lookups in the WAL.")
     parser.add_argument('-c', action='store_true', required=False, help="(Optional) Classify Record Status i.e Active, Duplicate, Modified/RowID Reuse, Deleted")
     parser.add_argument('-s', dest="search_term", metavar='search_term', required=False, help="(Optional) Insta Search a keyword across the database")
     parser.add_argument('-o', dest="output_folder", metavar='output_folder', required=True, help="Specify the location to output results")
+    parser.add_argument('--workers', dest="workers", metavar='N', type=int, default=1, required=False, help="(Optional) Number of worker processes used to scan the main database file (Default: 1)")
+    parser.add_argument('--rebuild-index', dest="rebuild_index", action='store_true', required=False, help="(Optional) Ignore the sidecar index in the output folder and parse the evidence again")
+    parser.add_argument('--indexes', dest="indexes", metavar='columns', default="all", required=False, help=f"(Optional) Output database columns to index after loading: all, none or a comma separated list of {', '.join(INDEX_COLUMNS)} (Default: all)")
+    parser.add_argument('--snapshot', dest="snapshot", metavar='commit_frame', required=False, help="(Optional) Extract the database as it stood at a WAL commit frame, or 'last' for the last commit (requires -w)")
     
     args = parser.parse_args()
+
+    if args.snapshot is not None:
+        if not args.wal_file:
+            parser.error("--snapshot requires the WAL file (-w)")
+        if args.snapshot != "last" and not args.snapshot.isdigit():
+            parser.error("--snapshot takes a WAL commit frame number or 'last'")
+
+    try:
+        index_columns = parse_index_columns(args.indexes)
+    except ValueError as e:
+        parser.error(f"--indexes: {e}")
     
-    _main(args.db_file, args.wal_file, args.output_folder, args.search_term)
+    _main(args.db_file, args.wal_file, args.output_folder, args.search_term, args.workers, args.rebuild_index, args.shm_file, args.snapshot, index_columns)
 
 
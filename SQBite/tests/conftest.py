@@ -0,0 +1,75 @@
+import os
+import shutil
+import sqlite3
+import sys
+
+import pytest
+
+# The SQBite modules are imported as "Modules.<name>", relative to the SQBite directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PAGE_SIZE = 1024
+
+def build_database(db_path, statements, page_size=PAGE_SIZE):
+    """
+    Creates a rollback journal database at db_path and runs the statements in one transaction.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA page_size = {page_size}")
+    for statement, *parameters in statements:
+        conn.execute(statement, *parameters)
+    conn.commit()
+    conn.close()
+    return db_path
+
+def root_page(db_path, table_name):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT rootpage FROM sqlite_master WHERE name = ?", (table_name,)).fetchone()[0]
+    finally:
+        conn.close()
+
+# Statements of the wal_database fixture checkpointed into the Main Database file before the WAL is written
+MAIN_DATABASE_STATEMENTS = [
+    "CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)",
+    *[f"INSERT INTO notes (body) VALUES (printf('%.100c', '{chr(97 + i % 26)}'))" for i in range(30)],
+]
+
+# Committed transactions of the wal_database fixture, in order
+WAL_TRANSACTIONS = [
+    ["CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT, qty INTEGER)"],
+    [f"INSERT INTO items (name, qty) VALUES ('item {i}', {i})" for i in range(1, 41)],
+    ["UPDATE items SET qty = qty * 10 WHERE id % 4 = 0"],
+    ["DELETE FROM items WHERE id > 30"],
+    ["INSERT INTO items (name, qty) VALUES (printf('%.3000c', 'x'), 99)"],
+]
+
+@pytest.fixture
+def wal_database(tmp_path):
+    """
+    Builds a WAL mode database from MAIN_DATABASE_STATEMENTS (checkpointed) and WAL_TRANSACTIONS and returns
+    (db_path, wal_path), copies of the Main Database file and the WAL taken before the WAL was checkpointed.
+    """
+    live_path = str(tmp_path / "live.sqlite")
+    conn = sqlite3.connect(live_path, isolation_level=None)
+    conn.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA wal_autocheckpoint = 0")
+    conn.execute("BEGIN")
+    for statement in MAIN_DATABASE_STATEMENTS:
+        conn.execute(statement)
+    conn.execute("COMMIT")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    for transaction in WAL_TRANSACTIONS:
+        conn.execute("BEGIN")
+        for statement in transaction:
+            conn.execute(statement)
+        conn.execute("COMMIT")
+
+    evidence = tmp_path / "evidence"
+    evidence.mkdir()
+    db_path = str(evidence / "db.sqlite")
+    shutil.copyfile(live_path, db_path)
+    shutil.copyfile(live_path + "-wal", db_path + "-wal")
+    conn.close()
+    return db_path, db_path + "-wal"
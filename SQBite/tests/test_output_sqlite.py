@@ -0,0 +1,29 @@
+import os
+import sqlite3
+import subprocess
+import sys
+
+from conftest import build_database
+from Modules.output_sqlite import clean_row
+
+SQBITE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "SQBite.py")
+
+def test_clean_row_keeps_bytes():
+    assert clean_row(("db.sqlite", "N/A", 2, b"hello", "text", b"\xff")) == ["db.sqlite", "N/A", 2, b"hello", "text", b"\xff"]
+
+def test_utf8_valid_blobs_stay_blobs(tmp_path):
+    db_path = build_database(str(tmp_path / "blobs.sqlite"), [
+        ("CREATE TABLE files (name TEXT, data BLOB)",),
+        ("INSERT INTO files VALUES (?, ?)", ("readme", b"hello world")),
+        ("INSERT INTO files VALUES (?, ?)", ("image", b"\x89PNG\r\n")),
+    ])
+    output_folder = str(tmp_path / "output")
+    subprocess.run([sys.executable, SQBITE, "-i", db_path, "-o", output_folder], check=True, capture_output=True)
+
+    conn = sqlite3.connect(os.path.join(output_folder, "SQBite_Extraction.sqlite"))
+    rows = conn.execute('SELECT name, data, typeof(name), typeof(data) FROM "files" ORDER BY "Row_ID"').fetchall()
+    conn.close()
+    assert rows == [
+        ("readme", b"hello world", "text", "blob"),
+        ("image", b"\x89PNG\r\n", "text", "blob"),
+    ]
@@ -0,0 +1,11 @@
+from Modules.pagesource import is_zero_page
+
+def test_is_zero_page():
+    page = bytearray(4096)
+    assert is_zero_page(memoryview(page))
+    assert is_zero_page(bytes(page))
+    assert is_zero_page(b"")
+    page[-1] = 1
+    assert not is_zero_page(memoryview(page))
+    assert not is_zero_page(memoryview(page)[100:])
+    assert is_zero_page(memoryview(page)[:-1])
@@ -0,0 +1,113 @@
+import sqlite3
+
+from conftest import build_database
+from Modules.output_sqlite import BASE_HEADERS, WAL_FRAMES_COLUMN_DEFS
+from Modules.pagesource import PageSource
+from Modules.recordclassify import classify_records
+from Modules.schemacatalog import build_schema_catalog
+
+def build_extraction(output_file, tables, wal_frames=None):
+    """
+    Writes an extraction database with the SQBite record layout. tables maps table name -> (record columns, rows),
+    rows are (Frame_Number, Page_Number, Row_ID, *record values) with "N/A" frames for the Main Database file.
+    wal_frames lists (Frame_Number, Page_Number, Frame_Status) rows of the WAL_Frames table.
+    """
+    conn = sqlite3.connect(output_file)
+    for table_name, (record_columns, rows) in tables.items():
+        column_definitions = ['"Record_ID" INTEGER PRIMARY KEY'] + [f'"{column}"' for column in BASE_HEADERS[1:] + record_columns]
+        conn.execute(f'CREATE TABLE "{table_name}" ({", ".join(column_definitions)})')
+        insert_columns = ", ".join(f'"{column}"' for column in BASE_HEADERS[1:] + record_columns)
+        placeholders = ", ".join("?" * (len(BASE_HEADERS) - 1 + len(record_columns)))
+        conn.executemany(
+            f'INSERT INTO "{table_name}" ({insert_columns}) VALUES ({placeholders})',
+            [("db.sqlite", frame, page, "", table_name, 0, row_id, *values) for frame, page, row_id, *values in rows],
+        )
+    if wal_frames is not None:
+        conn.execute(f'CREATE TABLE "WAL_Frames" ({", ".join(WAL_FRAMES_COLUMN_DEFS)})')
+        conn.executemany(
+            'INSERT INTO "WAL_Frames" ("Frame_Number", "Page_Number", "Frame_Status") VALUES (?, ?, ?)', wal_frames
+        )
+    conn.commit()
+    conn.close()
+
+def record_statuses(output_file, table_name):
+    conn = sqlite3.connect(output_file)
+    try:
+        return [row[0] for row in conn.execute(f'SELECT "Record_Status" FROM "{table_name}" ORDER BY "Record_ID"')]
+    finally:
+        conn.close()
+
+def test_rowid_records_are_classified_against_the_highest_frame(tmp_path):
+    output_file = str(tmp_path / "extraction.sqlite")
+    build_extraction(output_file, {
+        "items": (["id", "name"], [
+            (5, 2, 1, None, "apple"),         # Newest frame of page 2
+            (5, 2, 2, None, "banana v2"),
+            ("N/A", 2, 1, None, "apple"),     # Same payload as the Active copy
+            ("N/A", 2, 2, None, "banana"),    # Same Row_ID, other payload
+            (3, 2, 3, None, "cherry"),        # Row_ID gone from the newest frame
+            ("N/A", 3, 10, None, "date"),     # Only copy of page 3
+        ]),
+    })
+    classify_records(output_file)
+
+    assert record_statuses(output_file, "items") == [
+        "Active", "Active", "Duplicate (Active)", "Modified/Reused ID", "Deleted", "Active",
+    ]
+
+def test_frames_outside_the_current_transactions_are_not_active(tmp_path):
+    output_file = str(tmp_path / "extraction.sqlite")
+    build_extraction(output_file, {
+        "items": (["id", "name"], [
+            (5, 2, 1, None, "apple"),
+            (7, 2, 1, None, "torn write"),    # Frame 7 failed checksum validation
+            (8, 2, 1, None, "uncommitted"),
+        ]),
+    }, wal_frames=[(5, 2, "Valid (Current)"), (7, 2, "Invalid"), (8, 2, "Valid (Uncommitted)")])
+    classify_records(output_file)
+
+    assert record_statuses(output_file, "items") == ["Active", "Modified/Reused ID", "Modified/Reused ID"]
+
+def test_without_rowid_records_are_matched_on_the_primary_key(tmp_path):
+    output_file = str(tmp_path / "extraction.sqlite")
+    rows = [
+        (4, 5, None, "x", 1),
+        (4, 5, None, "z", 3),
+        ("N/A", 5, None, "x", 1),     # Duplicate of the Active "x"
+        ("N/A", 5, None, "z", 2),     # "z" with another value
+        ("N/A", 5, None, "y", 9),     # "y" is no longer in the table
+    ]
+    build_extraction(output_file, {"kv": (["k", "v"], rows), "kv_rowid": (["k", "v"], rows)})
+    classify_records(output_file, {"kv": ["k"]})
+
+    assert record_statuses(output_file, "kv") == [
+        "Active", "Active", "Duplicate (Active)", "Modified/Reused ID", "Deleted",
+    ]
+    # Without a key every record has the same NULL Row_ID and is compared with the first Active record
+    assert record_statuses(output_file, "kv_rowid") == [
+        "Active", "Active", "Duplicate (Active)", "Modified/Reused ID", "Modified/Reused ID",
+    ]
+
+def test_main_database_placeholders_compare_as_zero(tmp_path):
+    output_file = str(tmp_path / "extraction.sqlite")
+    build_extraction(output_file, {
+        "items": (["id", "qty"], [
+            (5, 2, 1, None, 0),
+            ("N/A", 2, 1, None, "N/A"),
+            ("N/A", 2, 1, None, None),
+        ]),
+    })
+    classify_records(output_file)
+
+    assert record_statuses(output_file, "items") == ["Active", "Duplicate (Active)", "Modified/Reused ID"]
+
+def test_record_keys_of_without_rowid_tables(tmp_path):
+    db_path = build_database(str(tmp_path / "keys.sqlite"), [
+        ("CREATE TABLE plain (a TEXT PRIMARY KEY, b)",),
+        ("CREATE TABLE kv (k TEXT, n INTEGER, v, PRIMARY KEY (n, k)) WITHOUT ROWID",),
+        ("CREATE INDEX kv_v ON kv (v)",),
+    ])
+    with PageSource(db_path) as page_source:
+        schema_catalog = build_schema_catalog(page_source)
+
+    assert schema_catalog.record_keys() == {"kv": ["n", "k"], "kv_v": ["n", "k"]}
@@ -0,0 +1,73 @@
+import struct
+
+import pytest
+
+from Modules.recorddecoder import (
+    decode_available_columns, decode_column_value, decode_record, local_payload_size, overflow_thresholds,
+)
+
+def test_text_serial_types_decode_as_text():
+    # Odd serial types >= 13 are TEXT, even ones >= 12 are BLOB
+    assert decode_column_value(13 + 2 * 5, b"hello", 0) == ("hello", 5)
+    assert decode_column_value(12 + 2 * 5, b"hello", 0) == (b"hello", 5)
+    assert decode_column_value(13, b"", 0) == ("", 0)
+    assert decode_column_value(12, b"", 0) == (b"", 0)
+
+def test_invalid_utf8_text_is_kept_as_bytes():
+    assert decode_column_value(13 + 2 * 2, b"\xff\xfe", 0) == (b"\xff\xfe", 2)
+
+def test_fixed_width_integers_are_signed():
+    assert decode_column_value(1, b"\xff", 0) == (-1, 1)
+    assert decode_column_value(2, b"\x80\x00", 0) == (-32768, 2)
+    assert decode_column_value(3, b"\xff\xff\xfe", 0) == (-2, 3)
+    assert decode_column_value(4, struct.pack(">i", -123456), 0) == (-123456, 4)
+    assert decode_column_value(5, (-(2 ** 40)).to_bytes(6, "big", signed=True), 0) == (-(2 ** 40), 6)
+    assert decode_column_value(6, struct.pack(">q", 2 ** 62), 0) == (2 ** 62, 8)
+    assert decode_column_value(7, struct.pack(">d", 1.5), 0) == (1.5, 8)
+
+def test_zero_width_serial_types():
+    assert decode_column_value(0, b"", 0) == (None, 0)
+    assert decode_column_value(8, b"", 0) == (0, 0)
+    assert decode_column_value(9, b"", 0) == (1, 0)
+
+def test_reserved_serial_types_are_rejected():
+    for col_type in (10, 11):
+        with pytest.raises(ValueError):
+            decode_column_value(col_type, b"\x00" * 8, 0)
+
+def test_fixed_record_fast_path_matches_column_decoder():
+    column_types = [1, 0, 2, 8, 4, 9, 6, 7]
+    data = b"\x00\x00" + struct.pack(">bhiqd", -5, 300, -70000, 2 ** 40, 2.25)
+    expected = []
+    offset = 2
+    for col_type in column_types:
+        value, length = decode_column_value(col_type, data, offset)
+        expected.append(value)
+        offset += length
+    assert decode_record(column_types, data, 2) == expected == [-5, None, 300, 0, -70000, 1, 2 ** 40, 2.25]
+
+def test_mixed_record_uses_general_decoder():
+    column_types = [3, 13 + 2 * 3, 12 + 2 * 2, 5]
+    data = b"\x00\x00\x01" + b"abc" + b"\x01\x02" + (7).to_bytes(6, "big")
+    assert decode_record(column_types, data, 0) == [1, "abc", b"\x01\x02", 7]
+
+@pytest.mark.parametrize("page_size", [512, 1024, 4096, 65536])
+def test_overflow_thresholds_match_the_file_format(page_size):
+    U = page_size
+    assert overflow_thresholds(page_size) == (U - 35, ((U - 12) * 32 // 255) - 23, U - 4)
+    assert overflow_thresholds(page_size, True)[0] == ((U - 12) * 64 // 255) - 23
+
+def test_local_payload_size():
+    X, M, overflow_usable = overflow_thresholds(4096)
+    assert local_payload_size(X, 4096) == X
+    # K = M + ((P - M) % (U - 4)) is kept on the page when it fits, otherwise only M bytes are
+    assert local_payload_size(X + 1, 4096) == M
+    assert local_payload_size(M + overflow_usable + 10, 4096) == M + 10
+    assert local_payload_size(5000, 4096, index_page=True) == M + ((5000 - M) % overflow_usable)
+
+def test_available_columns_of_a_truncated_record():
+    column_types = [1, 13 + 2 * 10, 4]
+    data = b"\x07" + b"abcd"  # The TEXT value is cut off after 4 of its 10 bytes
+    assert decode_available_columns(column_types, data, 0) == [7, "abcd"]
+    assert decode_available_columns(column_types, b"\x07", 0) == [7]
+    assert decode_available_columns([1, 0, 8, 4], b"\x07", 0) == [7, None, 0]
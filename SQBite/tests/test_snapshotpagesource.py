@@ -0,0 +1,97 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from conftest import PAGE_SIZE, WAL_TRANSACTIONS
+from Modules.btreeleafpage_processing import mainparse_leaf_page
+from Modules.snapshotpagesource import SnapshotPageSource
+from Modules.walframetable import WAL_FRAME_HEADER_SIZE, WAL_HEADER_SIZE
+from Modules.walpagereader import WalPageReader
+
+def replay_to_commit(db_path, wal_path, commit_frame, replay_dir):
+    """
+    The way examiners see a past state without SQBite: copy the database, cut the WAL after the commit frame
+    and let sqlite3 recover and checkpoint it. Returns the path of the replayed database.
+    """
+    os.makedirs(replay_dir)
+    replay_path = os.path.join(replay_dir, "replay.sqlite")
+    shutil.copyfile(db_path, replay_path)
+    shutil.copyfile(wal_path, replay_path + "-wal")
+    with open(replay_path + "-wal", "r+b") as wal_file:
+        wal_file.truncate(WAL_HEADER_SIZE + commit_frame * (WAL_FRAME_HEADER_SIZE + PAGE_SIZE))
+    conn = sqlite3.connect(replay_path)
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return replay_path
+
+def commit_frames(wal_path):
+    with WalPageReader(wal_path) as wal_reader:
+        return list(wal_reader.commit_frames)
+
+def test_snapshot_pages_match_a_sqlite_replay(wal_database, tmp_path):
+    db_path, wal_path = wal_database
+    commits = commit_frames(wal_path)
+    assert len(commits) == len(WAL_TRANSACTIONS)
+
+    for commit_frame in commits:
+        replay_path = replay_to_commit(db_path, wal_path, commit_frame, str(tmp_path / f"replay_{commit_frame}"))
+        with open(replay_path, "rb") as replay_file:
+            replay = replay_file.read()
+
+        with SnapshotPageSource(db_path, wal_path, commit_frame) as snapshot:
+            assert snapshot.total_pages == len(replay) // PAGE_SIZE
+            assert snapshot.header["page_size"] == PAGE_SIZE
+            for page_number in range(1, snapshot.total_pages + 1):
+                expected = replay[(page_number - 1) * PAGE_SIZE:page_number * PAGE_SIZE]
+                assert bytes(snapshot.page(page_number)) == expected, f"page {page_number} at commit frame {commit_frame}"
+            assert len(snapshot.page(snapshot.total_pages + 1)) == 0
+
+def test_snapshot_records_match_a_sqlite_replay(wal_database, tmp_path):
+    db_path, wal_path = wal_database
+    commits = commit_frames(wal_path)
+
+    # After the inserts, and after the update of every fourth row: both fit on the table's root leaf page
+    for commit_frame in commits[1:3]:
+        replay_path = replay_to_commit(db_path, wal_path, commit_frame, str(tmp_path / f"replay_{commit_frame}"))
+        conn = sqlite3.connect(replay_path)
+        root_page = conn.execute("SELECT rootpage FROM sqlite_master WHERE name = 'items'").fetchone()[0]
+        expected = [[row_id, None, name, qty] for row_id, name, qty in conn.execute("SELECT id, name, qty FROM items ORDER BY id")]
+        conn.close()
+
+        with SnapshotPageSource(db_path, wal_path, commit_frame) as snapshot:
+            rows = mainparse_leaf_page(snapshot, snapshot.page(root_page), root_page, PAGE_SIZE)
+        assert [row[1:] for row in rows] == expected
+
+def test_page_origin_points_at_the_newest_frame(wal_database):
+    db_path, wal_path = wal_database
+    commits = commit_frames(wal_path)
+
+    with SnapshotPageSource(db_path, wal_path, commits[-1]) as snapshot:
+        page_numbers = snapshot.wal_reader.frame_table.page_numbers
+        sources = set()
+        for page_number in range(1, snapshot.total_pages + 1):
+            source_file, frame_number, offset = snapshot.page_origin(page_number)
+            sources.add(source_file)
+            if frame_number == "N/A":
+                assert source_file == os.path.basename(db_path)
+                assert page_number not in page_numbers[:commits[-1]]
+                assert offset == (page_number - 1) * PAGE_SIZE
+                continue
+            assert source_file == os.path.basename(wal_path)
+            assert page_numbers[frame_number - 1] == page_number
+            assert page_number not in page_numbers[frame_number:commits[-1]]
+            assert offset == WAL_HEADER_SIZE + (frame_number - 1) * (WAL_FRAME_HEADER_SIZE + PAGE_SIZE) + WAL_FRAME_HEADER_SIZE
+
+    # The notes table was checkpointed into the Main Database file and is never rewritten in the WAL
+    assert sources == {os.path.basename(db_path), os.path.basename(wal_path)}
+
+def test_snapshot_requires_a_commit_frame(wal_database):
+    db_path, wal_path = wal_database
+    commits = commit_frames(wal_path)
+    assert commits[-1] - commits[-2] > 1
+
+    for frame_number in (0, commits[-2] + 1, commits[-1] + 1):
+        with pytest.raises(ValueError):
+            SnapshotPageSource(db_path, wal_path, frame_number)
@@ -0,0 +1,67 @@
+import pytest
+
+from conftest import PAGE_SIZE, build_database, root_page
+from Modules.btreeleafpage_processing import mainparse_leaf_page
+from Modules.pagesource import PageSource
+from Modules.varints import multi_varint, single_varint
+
+def encode_varint(value):
+    """
+    Encodes value as an SQLite varint (big-endian, 7 bits per byte, the ninth byte holds 8 bits).
+    """
+    if value > 0x00FFFFFFFFFFFFFF:
+        encoded = [value & 0xFF]
+        value >>= 8
+        for _ in range(8):
+            encoded.append((value & 0x7F) | 0x80)
+            value >>= 7
+        return bytes(reversed(encoded))
+    encoded = [value & 0x7F]
+    value >>= 7
+    while value:
+        encoded.append((value & 0x7F) | 0x80)
+        value >>= 7
+    return bytes(reversed(encoded))
+
+VARINT_VALUES = [0, 1, 127, 128, 240, 2287, 16383, 16384, 2 ** 32, 2 ** 56 - 1, 2 ** 56, 2 ** 64 - 1]
+
+@pytest.mark.parametrize("value", VARINT_VALUES)
+def test_single_varint_at_offset(value):
+    encoded = encode_varint(value)
+    buffer = memoryview(b"\xff\xff" + encoded + b"\x81")
+    assert single_varint(buffer, 2) == (value, len(encoded))
+
+def test_nine_byte_varint():
+    assert len(encode_varint(2 ** 64 - 1)) == 9
+    assert single_varint(b"\xff" * 9) == (2 ** 64 - 1, 9)
+
+def test_multi_varint_decodes_a_range_without_copying():
+    encoded = b"".join(encode_varint(value) for value in VARINT_VALUES)
+    buffer = memoryview(b"\x05" + encoded + b"\x07\x09")
+    assert multi_varint(buffer, 1, 1 + len(encoded)) == (VARINT_VALUES, len(encoded))
+    assert multi_varint(buffer, 1) == (VARINT_VALUES + [7, 9], len(encoded) + 2)
+
+def test_multi_varint_stops_at_a_truncated_varint():
+    data = b"\x01" + encode_varint(16384)
+    assert multi_varint(data, 0, len(data) - 1) == ([1], 1)
+    assert multi_varint(data, 0, len(data) + 10) == ([1, 16384], len(data))
+
+def test_leaf_page_cells_decode_in_place(tmp_path):
+    long_text = "overflow " * 400
+    rows = [
+        ("short", 7, 1.5, b"\x00\x01", None),
+        ("ünïcode", -300000, -0.25, b"", 2 ** 40),
+        (long_text, 1, 0.0, b"\xff" * 10, 0),
+    ]
+    db_path = build_database(str(tmp_path / "cells.sqlite"), [
+        ("CREATE TABLE t (a TEXT, b INTEGER, c REAL, d BLOB, e INTEGER)",),
+        *[("INSERT INTO t VALUES (?, ?, ?, ?, ?)", row) for row in rows],
+    ])
+
+    with PageSource(db_path) as page_source:
+        page_number = root_page(db_path, "t")
+        page_data = page_source.page(page_number)
+        parsed = mainparse_leaf_page(page_source, page_data, page_number, PAGE_SIZE)
+
+    assert [row[1:] for row in parsed] == [[row_id, *row] for row_id, row in enumerate(rows, 1)]
+    assert all(isinstance(row[2], str) for row in parsed)
@@ -0,0 +1,92 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from conftest import PAGE_SIZE
+from Modules.pagesource import PageSource
+from Modules.snapshotpagesource import SnapshotPageSource
+from Modules.walframetable import WAL_FRAME_HEADER_SIZE, WAL_HEADER_SIZE
+from Modules.walpagereader import WalPageReader
+from Modules.waltransactions import FRAME_VALID_CURRENT, FRAME_VALID_PREVIOUS
+
+FRAME_SIZE = WAL_FRAME_HEADER_SIZE + PAGE_SIZE
+
+def newest_frames(page_numbers, last_frame):
+    """
+    Page number -> newest frame number among frames 1..last_frame.
+    """
+    return dict(zip(page_numbers[:last_frame], range(1, last_frame + 1)))
+
+def test_lookups_skip_frames_after_a_checksum_mismatch(wal_database):
+    db_path, wal_path = wal_database
+    with WalPageReader(wal_path) as wal_reader:
+        commits = list(wal_reader.commit_frames)
+    corrupt_frame = commits[-2] + 2
+
+    with open(wal_path, "r+b") as wal_file:
+        wal_file.seek(WAL_HEADER_SIZE + (corrupt_frame - 1) * FRAME_SIZE + WAL_FRAME_HEADER_SIZE + 100)
+        byte = wal_file.read(1)
+        wal_file.seek(-1, os.SEEK_CUR)
+        wal_file.write(bytes([byte[0] ^ 0xFF]))
+
+    with WalPageReader(wal_path) as wal_reader, PageSource(db_path) as db_source:
+        page_numbers = wal_reader.frame_table.page_numbers
+        assert list(wal_reader.commit_frames) == commits[:-1]
+        assert wal_reader.last_commit_frame == commits[-2]
+
+        # The pages of the last transaction have higher numbered frames that are uncommitted or invalid
+        stale_pages = set(page_numbers[commits[-2]:])
+        assert stale_pages
+        expected = newest_frames(page_numbers, commits[-2])
+        for page_number in stale_pages:
+            assert wal_reader.latest_frame(page_number) == expected.get(page_number)
+            assert wal_reader.latest_frame(page_number, wal_reader.frame_count) == expected.get(page_number)
+
+        # Overflow chains of the stale frames resolve against the last committed state
+        page_view = wal_reader.page_view(wal_reader.frame_count, db_source)
+        assert page_view.max_frame == commits[-2]
+        for page_number in stale_pages:
+            frame_number = expected.get(page_number)
+            page_data = wal_reader.frame_page(frame_number) if frame_number else db_source.page(page_number)
+            assert bytes(page_view.page(page_number)) == bytes(page_data)
+
+    # The last commit is no longer a valid snapshot
+    with pytest.raises(ValueError):
+        SnapshotPageSource(db_path, wal_path, commits[-1])
+
+def test_lookups_skip_frames_of_a_previous_generation(tmp_path):
+    live_path = str(tmp_path / "live.sqlite")
+    conn = sqlite3.connect(live_path, isolation_level=None)
+    conn.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA wal_autocheckpoint = 0")
+    conn.execute("CREATE TABLE t (value)")
+    for _ in range(10):
+        conn.execute("INSERT INTO t VALUES (printf('%.500c', 'y'))")
+    conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+    # The WAL restarts with new salts and only overwrites its first frames
+    conn.execute("INSERT INTO t VALUES (1)")
+    db_path = str(tmp_path / "copy.sqlite")
+    shutil.copyfile(live_path, db_path)
+    shutil.copyfile(live_path + "-wal", db_path + "-wal")
+    conn.close()
+
+    with WalPageReader(db_path + "-wal") as wal_reader:
+        status = wal_reader.transaction_index.status
+        page_numbers = wal_reader.frame_table.page_numbers
+        last_commit_frame = wal_reader.last_commit_frame
+        assert set(status[:last_commit_frame]) == {FRAME_VALID_CURRENT}
+        assert set(status[last_commit_frame:]) == {FRAME_VALID_PREVIOUS}
+
+        expected = newest_frames(page_numbers, last_commit_frame)
+        stale_pages = {
+            page_number for frame_number, page_number in enumerate(page_numbers, 1)
+            if frame_number > expected.get(page_number, 0)
+        }
+        assert stale_pages
+        for page_number in stale_pages:
+            assert wal_reader.latest_frame(page_number) == expected.get(page_number)
+            frame_number, _ = wal_reader.page_at(page_number)
+            assert frame_number == expected.get(page_number)
@@ -0,0 +1,127 @@
+import os
+import random
+import shutil
+import sqlite3
+import struct
+
+import pytest
+
+from conftest import PAGE_SIZE, WAL_TRANSACTIONS
+from Modules.walchecksum import wal_checksum
+from Modules.walframetable import WAL_FRAME_HEADER_SIZE, WAL_HEADER_SIZE
+from Modules.walpagereader import WalPageReader
+from Modules.waltransactions import (
+    FRAME_INVALID, FRAME_UNCOMMITTED, FRAME_VALID_CURRENT, FRAME_VALID_PREVIOUS, WalTransactionIndex,
+)
+
+FRAME_SIZE = WAL_FRAME_HEADER_SIZE + PAGE_SIZE
+
+def reference_checksum(data, big_endian, s1=0, s2=0):
+    """
+    The WAL checksum one word pair at a time, as written in the SQLite file format documentation.
+    """
+    word = struct.Struct(">I" if big_endian else "<I")
+    for i in range(0, len(data), 8):
+        s1 = (s1 + word.unpack_from(data, i)[0] + s2) & 0xFFFFFFFF
+        s2 = (s2 + word.unpack_from(data, i + 4)[0] + s1) & 0xFFFFFFFF
+    return s1, s2
+
+def transaction_index(wal_path):
+    with WalPageReader(wal_path) as wal_reader:
+        return WalTransactionIndex(wal_reader.frame_table, wal_reader.header)
+
+def commit_frames(wal_path):
+    with open(wal_path, "rb") as wal_file:
+        wal = wal_file.read()
+    return [
+        frame_number for frame_number, offset in enumerate(range(WAL_HEADER_SIZE, len(wal), FRAME_SIZE), 1)
+        if struct.unpack_from(">I", wal, offset + 4)[0]
+    ]
+
+@pytest.mark.parametrize("big_endian", [True, False])
+@pytest.mark.parametrize("length", [0, 8, 24, 32, 40, PAGE_SIZE + 8])
+def test_wal_checksum_matches_the_reference(big_endian, length):
+    data = random.Random(length).randbytes(length)
+    assert wal_checksum(data, big_endian) == reference_checksum(data, big_endian)
+    assert wal_checksum(data, big_endian, 0xFFFFFFFF, 12345) == reference_checksum(data, big_endian, 0xFFFFFFFF, 12345)
+
+def test_committed_wal_is_current(wal_database):
+    _, wal_path = wal_database
+    index = transaction_index(wal_path)
+
+    assert index.header_valid
+    assert set(index.status) == {FRAME_VALID_CURRENT}
+    assert index.current_commit_frames() == commit_frames(wal_path)
+    assert len(index.current_commit_frames()) == len(WAL_TRANSACTIONS)
+    assert all(index.commit_of[i] >= i + 1 for i in range(index.frame_count))
+
+def test_frames_after_the_last_commit_are_uncommitted(wal_database):
+    _, wal_path = wal_database
+    commits = commit_frames(wal_path)
+    last_commit, previous_commit = commits[-1], commits[-2]
+    assert last_commit - previous_commit > 1
+
+    # Drop the commit frame of the last transaction, leaving the frames written before it
+    with open(wal_path, "r+b") as wal_file:
+        wal_file.truncate(WAL_HEADER_SIZE + (last_commit - 1) * FRAME_SIZE)
+    index = transaction_index(wal_path)
+
+    assert index.current_commit_frames() == commits[:-1]
+    assert set(index.status[:previous_commit]) == {FRAME_VALID_CURRENT}
+    assert set(index.status[previous_commit:]) == {FRAME_UNCOMMITTED}
+    assert set(index.commit_of[previous_commit:]) == {0}
+
+def test_checksum_mismatch_ends_the_chain(wal_database):
+    _, wal_path = wal_database
+    commits = commit_frames(wal_path)
+    corrupt_frame = commits[-2] + 2
+    assert corrupt_frame < commits[-1]
+
+    with open(wal_path, "r+b") as wal_file:
+        wal_file.seek(WAL_HEADER_SIZE + (corrupt_frame - 1) * FRAME_SIZE + WAL_FRAME_HEADER_SIZE + 100)
+        byte = wal_file.read(1)
+        wal_file.seek(-1, os.SEEK_CUR)
+        wal_file.write(bytes([byte[0] ^ 0xFF]))
+    index = transaction_index(wal_path)
+
+    # SQLite stops reading at the corrupted frame: only the transactions committed before it remain current
+    assert index.current_commit_frames() == commits[:-1]
+    assert set(index.status[:commits[-2]]) == {FRAME_VALID_CURRENT}
+    assert set(index.status[commits[-2]:corrupt_frame - 1]) == {FRAME_UNCOMMITTED}
+    assert set(index.status[corrupt_frame - 1:]) == {FRAME_INVALID}
+
+def test_invalid_header_checksum_invalidates_the_generation(wal_database):
+    _, wal_path = wal_database
+    with open(wal_path, "r+b") as wal_file:
+        wal_file.seek(24)
+        wal_file.write(b"\x00" * 8)
+    index = transaction_index(wal_path)
+
+    assert not index.header_valid
+    assert index.current_commit_frames() == []
+    assert FRAME_VALID_CURRENT not in index.status
+
+def test_frames_of_a_previous_generation(tmp_path):
+    live_path = str(tmp_path / "live.sqlite")
+    conn = sqlite3.connect(live_path, isolation_level=None)
+    conn.execute(f"PRAGMA page_size = {PAGE_SIZE}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA wal_autocheckpoint = 0")
+    conn.execute("CREATE TABLE t (value)")
+    for _ in range(10):
+        conn.execute("INSERT INTO t VALUES (printf('%.500c', 'y'))")
+    old_frame_count = conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()[1]
+    # Once every frame is checkpointed the next writer restarts the WAL with new salts
+    conn.execute("INSERT INTO t VALUES (1)")
+    wal_path = str(tmp_path / "copy.sqlite-wal")
+    shutil.copyfile(live_path + "-wal", wal_path)
+    conn.close()
+
+    index = transaction_index(wal_path)
+    current_frames = index.status.count(FRAME_VALID_CURRENT)
+
+    assert index.frame_count == old_frame_count
+    assert len(index.current_commit_frames()) == 1
+    assert set(index.status[:current_frames]) == {FRAME_VALID_CURRENT}
+    assert set(index.status[current_frames:]) == {FRAME_VALID_PREVIOUS}
+    assert all(salts != index.salts for salts in zip(index.salt1[current_frames:], index.salt2[current_frames:]))